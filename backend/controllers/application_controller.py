@@ -3,21 +3,51 @@ Application Controller - Handles job applications
 """
 from datetime import datetime, timezone
 from typing import Optional, List
+import asyncio
 import logging
 
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+
 from schemas.application import (
-    ApplicationCreate, ApplicationUpdate, ApplicationResponse,
-    ApplicationListResponse, ApplicationStatus, generate_application_id
+    ApplicationCreate, ApplicationUpdate, ApplicationBulkUpdate, ApplicationResponse,
+    ApplicationBulkUpdateResponse, ApplicationListResponse, ApplicationStatus,
+    generate_application_id
 )
+from services.batch_loader import EntityLoaders, count_by
+from services.notification_service import NotificationService
+from services.pagination import count_total
+from services.query_builder import ListSpec
 
 logger = logging.getLogger(__name__)
 
+# Fields ApplicationResponse is built from
+APPLICATION_FIELDS = (
+    "application_id", "role_id", "engineer_id", "startup_id", "cover_letter", "status",
+    "match_score", "feedback", "interview_date", "applied_at", "updated_at"
+)
+
+APPLICATION_LIST = ListSpec(
+    "applications", "applied_at", "application_id",
+    fields=APPLICATION_FIELDS,
+    hints=[
+        (("role_id",), "role_id_1_applied_at_-1_application_id_-1"),
+        (("engineer_id",), "engineer_id_1_applied_at_-1_application_id_-1"),
+    ],
+    filter_fields=("status",)
+)
+
+# Applications counted in a role's applications_count. Roles created before the
+# counter existed have no such field and are counted by aggregation instead.
+COUNTED_APPLICATIONS = {"status": {"$ne": ApplicationStatus.WITHDRAWN.value}}
+
 
 class ApplicationController:
     """Controller for application operations"""
     
-    def __init__(self, db):
+    def __init__(self, db, notifications: Optional[NotificationService] = None):
         self.db = db
+        self.notifications = notifications
     
     async def create_application(self, engineer_id: str, data: ApplicationCreate) -> ApplicationResponse:
         """Create a new job application"""
@@ -55,7 +85,16 @@ class ApplicationController:
             "updated_at": None
         }
         
-        await self.db.applications.insert_one(application_doc)
+        # The unique (role_id, engineer_id) index catches a concurrent apply
+        # that got past the check above
+        try:
+            await self.db.applications.insert_one(application_doc)
+        except DuplicateKeyError:
+            raise ValueError("You have already applied to this role")
+        await self.db.roles.update_one(
+            {"role_id": data.role_id, "applications_count": {"$exists": True}},
+            {"$inc": {"applications_count": 1}}
+        )
         
         # Get role and startup info for response
         startup = await self.db.startups.find_one({"startup_id": role["startup_id"]})
@@ -108,13 +147,134 @@ class ApplicationController:
         if data.interview_date:
             update_data["interview_date"] = data.interview_date.isoformat()
         
-        await self.db.applications.update_one(
+        # Only withdrawn applications are left out of applications_count
+        previous = await self.db.applications.find_one_and_update(
             {"application_id": application_id},
-            {"$set": update_data}
+            {"$set": update_data},
+            projection={"_id": 0, "status": 1}
         )
+        if previous is None:
+            # Deleted since it was read above
+            raise ValueError("Application not found")
+        was_counted = previous["status"] != ApplicationStatus.WITHDRAWN.value
+        is_counted = data.status != ApplicationStatus.WITHDRAWN
+        if was_counted != is_counted:
+            await self.db.roles.update_one(
+                {"role_id": app["role_id"], "applications_count": {"$exists": True}},
+                {"$inc": {"applications_count": 1 if is_counted else -1}}
+            )
         
         return await self.get_application(application_id)
     
+    async def bulk_update_application_status(
+        self,
+        founder_id: str,
+        data: ApplicationBulkUpdate
+    ) -> ApplicationBulkUpdateResponse:
+        """Update the status of many applications to the founder's startup in one request"""
+        requested = list(dict.fromkeys(data.application_ids))
+        
+        # Ownership of every application in one query
+        cursor = self.db.applications.aggregate([
+            {"$match": {"application_id": {"$in": requested}}},
+            {"$lookup": {
+                "from": "startups",
+                "localField": "startup_id",
+                "foreignField": "startup_id",
+                "as": "startup"
+            }},
+            {"$match": {"startup.founder_id": founder_id}},
+            {"$project": {"_id": 0, "application_id": 1, "role_id": 1, "status": 1}}
+        ])
+        owned = {app["application_id"]: app async for app in cursor}
+        
+        update_data = {
+            "status": data.status.value,
+            "updated_at": datetime.now(timezone.utc).isoformat()
+        }
+        if data.feedback:
+            update_data["feedback"] = data.feedback
+        if data.interview_date:
+            update_data["interview_date"] = data.interview_date.isoformat()
+        
+        changing = [app for app in owned.values() if app["status"] != data.status.value]
+        changing_ids = {app["application_id"] for app in changing}
+        updated = [app["application_id"] for app in changing]
+        if changing:
+            # Guarded by the status read above, so a concurrent change is not overwritten
+            result = await self.db.applications.bulk_write([
+                UpdateOne(
+                    {"application_id": app["application_id"], "status": app["status"]},
+                    {"$set": update_data}
+                )
+                for app in changing
+            ], ordered=False)
+            await self._adjust_applications_counts(changing, data.status, result.matched_count)
+            
+            if result.matched_count < len(changing):
+                # Some lost the race; only report and notify the ones this request wrote
+                cursor = self.db.applications.find(
+                    {"application_id": {"$in": updated}, **update_data},
+                    {"_id": 0, "application_id": 1}
+                )
+                written = {app["application_id"] async for app in cursor}
+                updated = [app_id for app_id in updated if app_id in written]
+        
+        if updated and self.notifications:
+            # One server-side fan-out for the whole batch
+            await self.notifications.notify_applications_status_update(
+                {"application_id": {"$in": updated}}, data.status.value
+            )
+        
+        updated_ids = set(updated)
+        return ApplicationBulkUpdateResponse(
+            status=data.status,
+            updated=updated,
+            unchanged=[app_id for app_id in owned if app_id not in changing_ids],
+            skipped=[
+                app_id for app_id in requested
+                if app_id not in owned or (app_id in changing_ids and app_id not in updated_ids)
+            ]
+        )
+    
+    async def _adjust_applications_counts(
+        self,
+        changed: List[dict],
+        new_status: ApplicationStatus,
+        matched: int
+    ):
+        """Apply a bulk status change to the roles' applications_count"""
+        withdrawn = ApplicationStatus.WITHDRAWN.value
+        is_counted = new_status != ApplicationStatus.WITHDRAWN
+        deltas = {}
+        for app in changed:
+            if (app["status"] != withdrawn) != is_counted:
+                deltas[app["role_id"]] = deltas.get(app["role_id"], 0) + (1 if is_counted else -1)
+        if not deltas:
+            return
+        
+        if matched != len(changed):
+            # Some applications changed status concurrently; recount those roles exactly
+            counts = await count_by(self.db.applications, "role_id", list(deltas), COUNTED_APPLICATIONS)
+            operations = [
+                UpdateOne(
+                    {"role_id": role_id, "applications_count": {"$exists": True}},
+                    {"$set": {"applications_count": count}}
+                )
+                for role_id, count in counts.items()
+            ]
+        else:
+            operations = [
+                UpdateOne(
+                    {"role_id": role_id, "applications_count": {"$exists": True}},
+                    {"$inc": {"applications_count": delta}}
+                )
+                for role_id, delta in deltas.items()
+                if delta
+            ]
+        if operations:
+            await self.db.roles.bulk_write(operations, ordered=False)
+    
     async def withdraw_application(self, application_id: str, engineer_id: str) -> bool:
         """Withdraw an application"""
         app = await self.db.applications.find_one({"application_id": application_id})
@@ -124,14 +284,21 @@ class ApplicationController:
         if app["engineer_id"] != engineer_id:
             raise ValueError("Not authorized to withdraw this application")
         
-        await self.db.applications.update_one(
-            {"application_id": application_id},
+        result = await self.db.applications.update_one(
+            {"application_id": application_id, **COUNTED_APPLICATIONS},
             {"$set": {
                 "status": ApplicationStatus.WITHDRAWN.value,
                 "updated_at": datetime.now(timezone.utc).isoformat()
             }}
         )
         
+        # Withdrawing twice must not decrement twice
+        if result.modified_count:
+            await self.db.roles.update_one(
+                {"role_id": app["role_id"], "applications_count": {"$exists": True}},
+                {"$inc": {"applications_count": -1}}
+            )
+        
         return True
     
     async def get_engineer_applications(
@@ -139,29 +306,35 @@ class ApplicationController:
         engineer_id: str,
         page: int = 1,
         page_size: int = 20,
-        status: Optional[str] = None
+        status: Optional[str] = None,
+        after: Optional[str] = None,
+        count_mode: str = "exact"
     ) -> ApplicationListResponse:
         """Get applications for an engineer"""
         query = {"engineer_id": engineer_id}
         if status:
             query["status"] = status
         
-        total = await self.db.applications.count_documents(query)
+        total, total_exact = await count_total(self.db.applications, query, count_mode)
         
-        cursor = self.db.applications.find(query, {"_id": 0})
-        cursor = cursor.skip((page - 1) * page_size).limit(page_size)
-        cursor = cursor.sort("applied_at", -1)
+        docs, has_more, next_cursor = await APPLICATION_LIST.fetch(
+            self.db, query, page=page, page_size=page_size, after=after
+        )
         
-        applications = []
-        async for doc in cursor:
-            applications.append(await self._enrich_application(doc))
+        # Related roles, startups and users for the whole page load in one query each
+        loaders = EntityLoaders(self.db)
+        applications = await asyncio.gather(*[
+            self._enrich_application(doc, loaders) for doc in docs
+        ])
         
         return ApplicationListResponse(
-            applications=applications,
+            applications=list(applications),
             total=total,
+            total_exact=total_exact,
             page=page,
             page_size=page_size,
-            has_more=(page * page_size) < total
+            has_more=has_more,
+            next_cursor=next_cursor
         )
     
     async def get_role_applications(
@@ -170,7 +343,9 @@ class ApplicationController:
         founder_id: str,
         page: int = 1,
         page_size: int = 20,
-        status: Optional[str] = None
+        status: Optional[str] = None,
+        after: Optional[str] = None,
+        count_mode: str = "exact"
     ) -> ApplicationListResponse:
         """Get applications for a role (for founders)"""
         # Verify founder owns the role
@@ -186,29 +361,42 @@ class ApplicationController:
         if status:
             query["status"] = status
         
-        total = await self.db.applications.count_documents(query)
+        total, total_exact = await count_total(self.db.applications, query, count_mode)
         
-        cursor = self.db.applications.find(query, {"_id": 0})
-        cursor = cursor.skip((page - 1) * page_size).limit(page_size)
-        cursor = cursor.sort("applied_at", -1)
+        docs, has_more, next_cursor = await APPLICATION_LIST.fetch(
+            self.db, query, page=page, page_size=page_size, after=after
+        )
         
-        applications = []
-        async for doc in cursor:
-            applications.append(await self._enrich_application(doc))
+        # Related roles, startups and users for the whole page load in one query each
+        loaders = EntityLoaders(self.db)
+        loaders.roles.prime(role_id, role)
+        loaders.startups.prime(role["startup_id"], startup)
+        applications = await asyncio.gather(*[
+            self._enrich_application(doc, loaders) for doc in docs
+        ])
         
         return ApplicationListResponse(
-            applications=applications,
+            applications=list(applications),
             total=total,
+            total_exact=total_exact,
             page=page,
             page_size=page_size,
-            has_more=(page * page_size) < total
+            has_more=has_more,
+            next_cursor=next_cursor
         )
     
-    async def _enrich_application(self, doc: dict) -> ApplicationResponse:
+    async def _enrich_application(
+        self,
+        doc: dict,
+        loaders: Optional[EntityLoaders] = None
+    ) -> ApplicationResponse:
         """Enrich application with related data"""
-        role = await self.db.roles.find_one({"role_id": doc["role_id"]}, {"title": 1})
-        startup = await self.db.startups.find_one({"startup_id": doc["startup_id"]}, {"name": 1})
-        engineer = await self.db.users.find_one({"user_id": doc["engineer_id"]}, {"name": 1})
+        loaders = loaders or EntityLoaders(self.db)
+        role, startup, engineer = await asyncio.gather(
+            loaders.roles.load(doc["role_id"]),
+            loaders.startups.load(doc["startup_id"]),
+            loaders.users.load(doc["engineer_id"])
+        )
         
         applied_at = doc["applied_at"]
         if isinstance(applied_at, str):
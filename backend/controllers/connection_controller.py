@@ -3,22 +3,68 @@ Connection Controller - Handles founder-engineer connections and messaging
 """
 from datetime import datetime, timezone
 from typing import Optional, List
+import asyncio
 import uuid
 import logging
 
+from pymongo import ASCENDING
+
 from schemas.connection import (
-    ConnectionRequest, ConnectionResponse, ConnectionStatus,
-    ConnectionListResponse, Message, MessageType, generate_connection_id
+    ConnectionRequest, ConnectionResponse, ConnectionStatus, ConnectionListResponse,
+    Message, MessageListResponse, MessageType, generate_connection_id
 )
+from services.batch_loader import EntityLoaders
+from services.pagination import count_total, encode_cursor
+from services.query_builder import ListSpec
+from services.realtime import RealtimeHub
 
 logger = logging.getLogger(__name__)
 
+# Fields ConnectionResponse is built from; message history lives in `messages`
+CONNECTION_FIELDS = (
+    "connection_id", "founder_id", "engineer_id", "startup_id", "role_id", "status",
+    "last_message", "message_count", "unread_count", "created_at", "updated_at"
+)
+
+CONNECTION_LIST = ListSpec(
+    "connections", "updated_at", "connection_id",
+    fields=CONNECTION_FIELDS,
+    hints=[
+        (("founder_id",), "founder_id_1_updated_at_-1_connection_id_-1"),
+        (("engineer_id",), "engineer_id_1_updated_at_-1_connection_id_-1"),
+    ],
+    filter_fields=("status",)
+)
+
+MESSAGE_FIELDS = (
+    "message_id", "sender_id", "sender_name", "content", "message_type", "sent_at", "read"
+)
+
+# Newest first; pages are reversed into chat order before they are returned
+MESSAGE_LIST = ListSpec(
+    "messages", "sent_at", "message_id",
+    fields=MESSAGE_FIELDS,
+    hints=[(("connection_id",), "connection_id_1_sent_at_-1_message_id_-1")]
+)
+
+# Oldest first, for fetching only the messages newer than an anchor
+MESSAGE_DELTA = ListSpec(
+    "messages", "sent_at", "message_id",
+    fields=MESSAGE_FIELDS,
+    hints=[(("connection_id",), "connection_id_1_sent_at_-1_message_id_-1")],
+    direction=ASCENDING
+)
+
+# Messages returned inline by get_connection; older ones via get_messages
+CONNECTION_MESSAGES_PAGE_SIZE = 50
+
 
 class ConnectionController:
     """Controller for connection operations"""
     
-    def __init__(self, db):
+    def __init__(self, db, hub: Optional[RealtimeHub] = None):
         self.db = db
+        self.hub = hub
     
     async def create_connection(self, founder_id: str, data: ConnectionRequest) -> ConnectionResponse:
         """Create a new connection request (founder to engineer)"""
@@ -45,15 +91,7 @@ class ConnectionController:
         
         # Create initial message
         founder_user = await self.db.users.find_one({"user_id": founder_id})
-        initial_message = {
-            "message_id": f"msg_{uuid.uuid4().hex[:12]}",
-            "sender_id": founder_id,
-            "sender_name": founder_user["name"],
-            "content": data.message,
-            "message_type": MessageType.TEXT.value,
-            "sent_at": now.isoformat(),
-            "read": False
-        }
+        initial_message = self._new_message(connection_id, founder_user, data.message, now)
         
         connection_doc = {
             "connection_id": connection_id,
@@ -62,12 +100,15 @@ class ConnectionController:
             "startup_id": startup["startup_id"],
             "role_id": data.role_id,
             "status": ConnectionStatus.PENDING.value,
-            "messages": [initial_message],
+            "last_message": self._preview(initial_message),
+            "message_count": 1,
+            "unread_count": {"founder": 0, "engineer": 1},
             "created_at": now.isoformat(),
             "updated_at": None
         }
         
         await self.db.connections.insert_one(connection_doc)
+        await self.db.messages.insert_one(initial_message)
         
         # Get role info if provided
         role = None
@@ -80,7 +121,10 @@ class ConnectionController:
             engineer_id=data.engineer_id,
             role_id=data.role_id,
             status=ConnectionStatus.PENDING,
-            messages=[Message(**{**initial_message, "sent_at": now})],
+            messages=[self._doc_to_message(initial_message)],
+            last_message=self._doc_to_message(initial_message),
+            message_count=1,
+            unread_count=0,
             created_at=now,
             founder_name=founder_user["name"],
             startup_name=startup["name"],
@@ -115,31 +159,28 @@ class ConnectionController:
         }
         
         # Add response message if provided
+        posted = None
         if message:
             engineer = await self.db.users.find_one({"user_id": engineer_id})
-            response_message = {
-                "message_id": f"msg_{uuid.uuid4().hex[:12]}",
-                "sender_id": engineer_id,
-                "sender_name": engineer["name"],
-                "content": message,
-                "message_type": MessageType.TEXT.value,
-                "sent_at": now.isoformat(),
-                "read": False
-            }
-            await self.db.connections.update_one(
-                {"connection_id": connection_id},
-                {
-                    "$set": update_data,
-                    "$push": {"messages": response_message}
-                }
-            )
+            posted = await self._post_message(conn, engineer, message, now, update_data)
         else:
             await self.db.connections.update_one(
                 {"connection_id": connection_id},
                 {"$set": update_data}
             )
         
-        return await self.get_connection(connection_id)
+        if self.hub:
+            await self.hub.publish_many(
+                [conn["founder_id"], conn["engineer_id"]],
+                "connection_updated",
+                {
+                    "connection_id": connection_id,
+                    "status": new_status.value,
+                    "message": self._doc_to_message(posted).model_dump(mode="json") if posted else None
+                }
+            )
+        
+        return await self.get_connection(connection_id, engineer_id)
     
     async def send_message(
         self,
@@ -163,33 +204,110 @@ class ConnectionController:
         sender = await self.db.users.find_one({"user_id": sender_id})
         now = datetime.now(timezone.utc)
         
-        new_message = {
-            "message_id": f"msg_{uuid.uuid4().hex[:12]}",
-            "sender_id": sender_id,
-            "sender_name": sender["name"],
-            "content": content,
-            "message_type": MessageType.TEXT.value,
-            "sent_at": now.isoformat(),
-            "read": False
-        }
+        posted = await self._post_message(conn, sender, content, now, {"updated_at": now.isoformat()})
         
-        await self.db.connections.update_one(
-            {"connection_id": connection_id},
-            {
-                "$push": {"messages": new_message},
-                "$set": {"updated_at": now.isoformat()}
-            }
-        )
+        if self.hub:
+            # The sender's other open sockets get it too
+            await self.hub.publish_many(
+                [conn["founder_id"], conn["engineer_id"]],
+                "message",
+                {
+                    "connection_id": connection_id,
+                    "message": self._doc_to_message(posted).model_dump(mode="json")
+                }
+            )
         
-        return await self.get_connection(connection_id)
+        return await self.get_connection(connection_id, sender_id)
     
-    async def get_connection(self, connection_id: str) -> Optional[ConnectionResponse]:
-        """Get connection by ID"""
+    async def get_connection(
+        self,
+        connection_id: str,
+        viewer_id: Optional[str] = None
+    ) -> Optional[ConnectionResponse]:
+        """Get connection by ID with its most recent messages"""
         conn = await self.db.connections.find_one({"connection_id": connection_id}, {"_id": 0})
         if not conn:
             return None
         
-        return await self._enrich_connection(conn)
+        response, (messages, _, _) = await asyncio.gather(
+            self._enrich_connection(conn, viewer_id=viewer_id),
+            MESSAGE_LIST.fetch(
+                self.db, {"connection_id": connection_id}, page_size=CONNECTION_MESSAGES_PAGE_SIZE
+            )
+        )
+        response.messages = [self._doc_to_message(msg) for msg in reversed(messages)]
+        return response
+    
+    async def get_messages(
+        self,
+        connection_id: str,
+        user_id: str,
+        before: Optional[str] = None,
+        limit: int = CONNECTION_MESSAGES_PAGE_SIZE,
+        before_id: Optional[str] = None,
+        after_id: Optional[str] = None,
+        until: Optional[datetime] = None,
+        since: Optional[datetime] = None
+    ) -> MessageListResponse:
+        """
+        Up to `limit` messages in chat order. Without an anchor this is the
+        newest page; `before` (a previous next_cursor), `before_id` and `until`
+        page backwards through history. `after_id` and `since` return only the
+        messages newer than the anchor, oldest first, so polling clients fetch
+        just the delta.
+        """
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        forward = after_id is not None or since is not None
+        if forward and (before or before_id or until):
+            raise ValueError("Cannot fetch messages before and after an anchor at once")
+        
+        await self._get_participant_connection(connection_id, user_id)
+        
+        query = {"connection_id": connection_id}
+        if since:
+            query["sent_at"] = {"$gt": self._sent_at_key(since)}
+        if until:
+            query["sent_at"] = {"$lt": self._sent_at_key(until)}
+        
+        cursor = before
+        anchor_id = after_id or before_id
+        if anchor_id:
+            anchor = await self.db.messages.find_one(
+                {"connection_id": connection_id, "message_id": anchor_id},
+                {"_id": 0, "sent_at": 1, "message_id": 1}
+            )
+            if not anchor:
+                raise ValueError("Message not found")
+            cursor = encode_cursor(anchor["sent_at"], anchor["message_id"])
+        
+        spec = MESSAGE_DELTA if forward else MESSAGE_LIST
+        docs, has_more, next_cursor = await spec.fetch(
+            self.db, query, page_size=limit, after=cursor
+        )
+        if not forward:
+            docs = list(reversed(docs))
+        
+        return MessageListResponse(
+            messages=[self._doc_to_message(doc) for doc in docs],
+            has_more=has_more,
+            # Forward fetches continue from the last message's id instead
+            next_cursor=None if forward else next_cursor
+        )
+    
+    async def mark_read(self, connection_id: str, user_id: str) -> int:
+        """Mark every message sent to user_id in a connection as read"""
+        conn = await self._get_participant_connection(connection_id, user_id)
+        
+        result = await self.db.messages.update_many(
+            {"connection_id": connection_id, "sender_id": {"$ne": user_id}, "read": False},
+            {"$set": {"read": True}}
+        )
+        reset = {f"unread_count.{self._side(conn, user_id)}": 0}
+        if conn.get("last_message") and conn["last_message"]["sender_id"] != user_id:
+            reset["last_message.read"] = True
+        await self.db.connections.update_one({"connection_id": connection_id}, {"$set": reset})
+        return result.modified_count
     
     async def get_user_connections(
         self,
@@ -197,7 +315,9 @@ class ConnectionController:
         role: str,
         page: int = 1,
         page_size: int = 20,
-        status: Optional[str] = None
+        status: Optional[str] = None,
+        after: Optional[str] = None,
+        count_mode: str = "exact"
     ) -> ConnectionListResponse:
         """Get connections for a user"""
         if role == "founder":
@@ -208,33 +328,122 @@ class ConnectionController:
         if status:
             query["status"] = status
         
-        total = await self.db.connections.count_documents(query)
+        total, total_exact = await count_total(self.db.connections, query, count_mode)
         
-        cursor = self.db.connections.find(query, {"_id": 0})
-        cursor = cursor.skip((page - 1) * page_size).limit(page_size)
-        cursor = cursor.sort("updated_at", -1)
+        docs, has_more, next_cursor = await CONNECTION_LIST.fetch(
+            self.db, query, page=page, page_size=page_size, after=after
+        )
         
-        connections = []
-        async for doc in cursor:
-            connections.append(await self._enrich_connection(doc))
+        # Related users, startups and roles for the whole page load in one query each
+        loaders = EntityLoaders(self.db)
+        connections = await asyncio.gather(*[
+            self._enrich_connection(doc, loaders, viewer_id=user_id) for doc in docs
+        ])
         
         return ConnectionListResponse(
-            connections=connections,
+            connections=list(connections),
             total=total,
+            total_exact=total_exact,
             page=page,
             page_size=page_size,
-            has_more=(page * page_size) < total
+            has_more=has_more,
+            next_cursor=next_cursor
         )
     
-    async def _enrich_connection(self, doc: dict) -> ConnectionResponse:
-        """Enrich connection with related data"""
-        founder = await self.db.users.find_one({"user_id": doc["founder_id"]}, {"name": 1})
-        engineer = await self.db.users.find_one({"user_id": doc["engineer_id"]}, {"name": 1})
-        startup = await self.db.startups.find_one({"startup_id": doc["startup_id"]}, {"name": 1})
+    async def _get_participant_connection(self, connection_id: str, user_id: str) -> dict:
+        """Connection document, if user_id is one of its two participants"""
+        conn = await self.db.connections.find_one(
+            {"connection_id": connection_id},
+            {"_id": 0, "founder_id": 1, "engineer_id": 1, "last_message": 1}
+        )
+        if not conn:
+            raise ValueError("Connection not found")
+        if user_id not in [conn["founder_id"], conn["engineer_id"]]:
+            raise ValueError("Not authorized to view this connection")
+        return conn
+    
+    @staticmethod
+    def _side(conn: dict, user_id: str) -> str:
+        """Which side of the connection a user is on (founder or engineer)"""
+        return "founder" if user_id == conn["founder_id"] else "engineer"
+    
+    @staticmethod
+    def _sent_at_key(value: datetime) -> str:
+        """A timestamp in the stored sent_at form (UTC ISO string)"""
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc).isoformat()
+    
+    @staticmethod
+    def _new_message(connection_id: str, sender: dict, content: str, now: datetime) -> dict:
+        """Document for the messages collection"""
+        return {
+            "message_id": f"msg_{uuid.uuid4().hex[:12]}",
+            "connection_id": connection_id,
+            "sender_id": sender["user_id"],
+            "sender_name": sender["name"],
+            "content": content,
+            "message_type": MessageType.TEXT.value,
+            "sent_at": now.isoformat(),
+            "read": False
+        }
+    
+    @staticmethod
+    def _preview(message: dict) -> dict:
+        """last_message preview kept on the connection"""
+        return {f: message[f] for f in MESSAGE_FIELDS}
+    
+    async def _post_message(
+        self,
+        conn: dict,
+        sender: dict,
+        content: str,
+        now: datetime,
+        set_fields: dict
+    ) -> dict:
+        """Store a message and update the connection's preview and counters"""
+        message = self._new_message(conn["connection_id"], sender, content, now)
+        await self.db.messages.insert_one(message)
         
-        role = None
-        if doc.get("role_id"):
-            role = await self.db.roles.find_one({"role_id": doc["role_id"]}, {"title": 1})
+        recipient = "engineer" if self._side(conn, sender["user_id"]) == "founder" else "founder"
+        await self.db.connections.update_one(
+            {"connection_id": conn["connection_id"]},
+            {
+                "$set": {**set_fields, "last_message": self._preview(message)},
+                "$inc": {"message_count": 1, f"unread_count.{recipient}": 1}
+            }
+        )
+        return message
+    
+    def _doc_to_message(self, msg: dict) -> Message:
+        """Convert a message document to the Message model"""
+        sent_at = msg["sent_at"]
+        if isinstance(sent_at, str):
+            sent_at = datetime.fromisoformat(sent_at)
+        return Message(
+            message_id=msg["message_id"],
+            sender_id=msg["sender_id"],
+            sender_name=msg["sender_name"],
+            content=msg["content"],
+            message_type=msg.get("message_type", "text"),
+            sent_at=sent_at,
+            read=msg.get("read", False)
+        )
+    
+    async def _enrich_connection(
+        self,
+        doc: dict,
+        loaders: Optional[EntityLoaders] = None,
+        viewer_id: Optional[str] = None
+    ) -> ConnectionResponse:
+        """Enrich connection with related data"""
+        loaders = loaders or EntityLoaders(self.db)
+        founder, engineer, startup, role = await asyncio.gather(
+            loaders.users.load(doc["founder_id"]),
+            loaders.users.load(doc["engineer_id"]),
+            loaders.startups.load(doc["startup_id"]),
+            loaders.roles.load(doc.get("role_id"))
+        )
         
         created_at = doc["created_at"]
         if isinstance(created_at, str):
@@ -244,21 +453,10 @@ class ConnectionController:
         if updated_at and isinstance(updated_at, str):
             updated_at = datetime.fromisoformat(updated_at)
         
-        # Convert messages
-        messages = []
-        for msg in doc.get("messages", []):
-            sent_at = msg["sent_at"]
-            if isinstance(sent_at, str):
-                sent_at = datetime.fromisoformat(sent_at)
-            messages.append(Message(
-                message_id=msg["message_id"],
-                sender_id=msg["sender_id"],
-                sender_name=msg["sender_name"],
-                content=msg["content"],
-                message_type=msg.get("message_type", "text"),
-                sent_at=sent_at,
-                read=msg.get("read", False)
-            ))
+        last_message = doc.get("last_message")
+        unread_count = None
+        if viewer_id in (doc["founder_id"], doc["engineer_id"]):
+            unread_count = doc.get("unread_count", {}).get(self._side(doc, viewer_id), 0)
         
         return ConnectionResponse(
             connection_id=doc["connection_id"],
@@ -266,7 +464,9 @@ class ConnectionController:
             engineer_id=doc["engineer_id"],
             role_id=doc.get("role_id"),
             status=doc["status"],
-            messages=messages,
+            last_message=self._doc_to_message(last_message) if last_message else None,
+            message_count=doc.get("message_count", 0),
+            unread_count=unread_count,
             created_at=created_at,
             updated_at=updated_at,
             founder_name=founder["name"] if founder else None,
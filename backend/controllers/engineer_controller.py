@@ -7,17 +7,59 @@ import logging
 
 from schemas.engineer import (
     EngineerProfileCreate, EngineerProfileUpdate, EngineerProfileResponse,
-    EngineerListResponse, generate_engineer_profile_id
+    EngineerProfileSummary, EngineerListResponse, generate_engineer_profile_id
 )
+from services.match_cache import (
+    MatchScoreCache, ENGINEER_SCORING_FIELDS, scoring_fields_changed
+)
+from services.embedding_pipeline import EmbeddingPipeline
+from services.shortlist_service import ShortlistService
+from services.batch_loader import EntityLoaders
+from services.pagination import count_total
+from services.query_builder import ListSpec
 
 logger = logging.getLogger(__name__)
 
+# Fields EngineerProfileResponse is built from
+ENGINEER_FIELDS = (
+    "profile_id", "user_id", "name", "headline", "bio", "skills", "experience_years",
+    "experience", "education", "linkedin_url", "github_url", "portfolio_url", "availability",
+    "work_preference", "preferred_locations", "open_to_equity", "match_score", "created_at", "updated_at"
+)
+
+# Fields EngineerProfileSummary is built from
+ENGINEER_SUMMARY_FIELDS = (
+    "profile_id", "user_id", "name", "headline", "skills", "experience_years", "availability",
+    "work_preference", "preferred_locations", "open_to_equity", "match_score", "created_at", "updated_at"
+)
+
+ENGINEER_LIST = ListSpec(
+    "engineer_profiles", "updated_at", "user_id",
+    fields=ENGINEER_FIELDS,
+    summary_fields=ENGINEER_SUMMARY_FIELDS,
+    hints=[
+        (("availability",), "availability_1_updated_at_-1_user_id_-1"),
+        # The default availability $ne filter is a range, so it walks the sort index instead
+        ((), "updated_at_-1_user_id_-1"),
+    ],
+    filter_fields=("availability", "skills", "experience_years", "work_preference")
+)
+
 
 class EngineerController:
     """Controller for engineer profile operations"""
     
-    def __init__(self, db):
+    def __init__(
+        self,
+        db,
+        match_cache: Optional[MatchScoreCache] = None,
+        embedding_pipeline: Optional[EmbeddingPipeline] = None,
+        shortlists: Optional[ShortlistService] = None
+    ):
         self.db = db
+        self.match_cache = match_cache if match_cache is not None else MatchScoreCache(db)
+        self.embedding_pipeline = embedding_pipeline
+        self.shortlists = shortlists
     
     async def get_profile(self, user_id: str) -> Optional[EngineerProfileResponse]:
         """Get engineer profile by user ID"""
@@ -66,6 +108,15 @@ class EngineerController:
             {"$set": update_data}
         )
         
+        # Cached match scores for this engineer are stale once scoring fields change
+        if scoring_fields_changed(profile, update_data, ENGINEER_SCORING_FIELDS):
+            await self.match_cache.invalidate_engineer(user_id)
+        
+        if self.embedding_pipeline:
+            self.embedding_pipeline.schedule_engineer(user_id)
+        if self.shortlists:
+            self.shortlists.schedule_engineer(user_id)
+        
         # Mark onboarding as completed if profile has required fields
         if update_data.get("headline") and update_data.get("skills"):
             await self.db.users.update_one(
@@ -94,6 +145,13 @@ class EngineerController:
             {"$set": update_data}
         )
         
+        await self.match_cache.invalidate_engineer(user_id)
+        
+        if self.embedding_pipeline:
+            self.embedding_pipeline.schedule_engineer(user_id)
+        if self.shortlists:
+            self.shortlists.schedule_engineer(user_id)
+        
         # Mark onboarding as completed
         await self.db.users.update_one(
             {"user_id": user_id},
@@ -110,9 +168,13 @@ class EngineerController:
         experience_years_min: Optional[int] = None,
         experience_years_max: Optional[int] = None,
         availability: Optional[str] = None,
-        work_preference: Optional[str] = None
+        work_preference: Optional[str] = None,
+        after: Optional[str] = None,
+        count_mode: str = "exact",
+        view: str = "full"
     ) -> EngineerListResponse:
         """List engineer profiles with filters (for founders)"""
+        projection = ENGINEER_LIST.projection_for(view)
         query = {"availability": {"$ne": "not_looking"}}  # Only show available engineers
         
         if skills:
@@ -129,26 +191,23 @@ class EngineerController:
         if work_preference:
             query["work_preference"] = work_preference
         
-        total = await self.db.engineer_profiles.count_documents(query)
-        
-        cursor = self.db.engineer_profiles.find(query, {"_id": 0})
-        cursor = cursor.skip((page - 1) * page_size).limit(page_size)
-        cursor = cursor.sort("updated_at", -1)
+        total, total_exact = await count_total(self.db.engineer_profiles, query, count_mode)
         
-        engineers = []
-        async for doc in cursor:
-            user = await self.db.users.find_one(
-                {"user_id": doc["user_id"]},
-                {"_id": 0, "name": 1, "avatar_url": 1}
-            )
-            engineers.append(self._doc_to_response(doc, user))
+        docs, has_more, next_cursor = await ENGINEER_LIST.fetch(
+            self.db, query, page=page, page_size=page_size, after=after, projection=projection
+        )
+        users = await EntityLoaders(self.db).users.load_many(doc["user_id"] for doc in docs)
+        to_response = self._doc_to_summary if view == "summary" else self._doc_to_response
+        engineers = [to_response(doc, user) for doc, user in zip(docs, users)]
         
         return EngineerListResponse(
             engineers=engineers,
             total=total,
+            total_exact=total_exact,
             page=page,
             page_size=page_size,
-            has_more=(page * page_size) < total
+            has_more=has_more,
+            next_cursor=next_cursor
         )
     
     async def search_by_skills(self, skills: List[str], limit: int = 10) -> List[EngineerProfileResponse]:
@@ -160,18 +219,35 @@ class EngineerController:
         
         cursor = self.db.engineer_profiles.find(query, {"_id": 0}).limit(limit)
         
-        engineers = []
-        async for doc in cursor:
-            user = await self.db.users.find_one(
-                {"user_id": doc["user_id"]},
-                {"_id": 0, "name": 1, "avatar_url": 1}
-            )
-            engineers.append(self._doc_to_response(doc, user))
+        docs = await cursor.to_list(None)
+        users = await EntityLoaders(self.db).users.load_many(doc["user_id"] for doc in docs)
+        engineers = [self._doc_to_response(doc, user) for doc, user in zip(docs, users)]
         
         return engineers
     
-    def _doc_to_response(self, doc: dict, user: dict = None) -> EngineerProfileResponse:
-        """Convert MongoDB document to response model"""
+    def _doc_to_summary(self, doc: dict, user: dict = None) -> EngineerProfileSummary:
+        """Convert MongoDB document to list-view summary model"""
+        created_at, updated_at = self._timestamps(doc)
+        
+        return EngineerProfileSummary(
+            profile_id=doc["profile_id"],
+            user_id=doc["user_id"],
+            name=user.get("name", doc.get("name", "")) if user else doc.get("name", ""),
+            avatar_url=user.get("avatar_url") if user else None,
+            headline=doc.get("headline", ""),
+            skills=doc.get("skills", []),
+            experience_years=doc.get("experience_years", 0),
+            availability=doc.get("availability", "open_to_opportunities"),
+            work_preference=doc.get("work_preference", "any"),
+            preferred_locations=doc.get("preferred_locations", []),
+            open_to_equity=doc.get("open_to_equity", True),
+            match_score=doc.get("match_score"),
+            created_at=created_at,
+            updated_at=updated_at
+        )
+    
+    def _timestamps(self, doc: dict):
+        """created_at and updated_at as datetimes"""
         created_at = doc["created_at"]
         if isinstance(created_at, str):
             created_at = datetime.fromisoformat(created_at)
@@ -179,6 +255,11 @@ class EngineerController:
         updated_at = doc.get("updated_at")
         if updated_at and isinstance(updated_at, str):
             updated_at = datetime.fromisoformat(updated_at)
+        return created_at, updated_at
+    
+    def _doc_to_response(self, doc: dict, user: dict = None) -> EngineerProfileResponse:
+        """Convert MongoDB document to response model"""
+        created_at, updated_at = self._timestamps(doc)
         
         return EngineerProfileResponse(
             profile_id=doc["profile_id"],
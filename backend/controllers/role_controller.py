@@ -2,22 +2,68 @@
 Role Controller - Handles job role CRUD operations
 """
 from datetime import datetime, timezone
-from typing import Optional, List
+from typing import Awaitable, Callable, Optional, List, Dict, Tuple
 import logging
 
 from schemas.role import (
-    RoleCreate, RoleUpdate, RoleResponse, RoleListResponse, RoleStatus,
+    RoleCreate, RoleUpdate, RoleResponse, RoleSummary, RoleListResponse, RoleStatus,
     generate_role_id
 )
+from services.match_cache import (
+    MatchScoreCache, ROLE_SCORING_FIELDS, scoring_fields_changed
+)
+from services.embedding_pipeline import EmbeddingPipeline
+from services.shortlist_service import ShortlistService
+from services.notification_service import NotificationService
+from services.batch_loader import load_startups, count_by
+from services.pagination import count_total
+from services.query_builder import ListSpec
+from controllers.application_controller import COUNTED_APPLICATIONS
 
 logger = logging.getLogger(__name__)
 
+# Fields RoleResponse is built from
+ROLE_FIELDS = (
+    "role_id", "startup_id", "title", "description", "requirements", "nice_to_have",
+    "skills_required", "experience_level", "employment_type", "salary_range", "location",
+    "remote_allowed", "visa_sponsorship", "status", "applications_count", "created_at", "updated_at"
+)
+
+# Fields RoleSummary is built from
+ROLE_SUMMARY_FIELDS = (
+    "role_id", "startup_id", "title", "skills_required", "experience_level", "employment_type",
+    "salary_range", "location", "remote_allowed", "visa_sponsorship", "status", "applications_count",
+    "created_at", "updated_at"
+)
+
+ROLE_LIST = ListSpec(
+    "roles", "created_at", "role_id",
+    fields=ROLE_FIELDS,
+    summary_fields=ROLE_SUMMARY_FIELDS,
+    hints=[
+        (("startup_id",), "startup_id_1_created_at_-1_role_id_-1"),
+        (("status",), "status_1_created_at_-1_role_id_-1"),
+    ],
+    filter_fields=("status", "skills_required", "experience_level", "remote_allowed")
+)
+
 
 class RoleController:
     """Controller for role operations"""
     
-    def __init__(self, db):
+    def __init__(
+        self,
+        db,
+        match_cache: Optional[MatchScoreCache] = None,
+        embedding_pipeline: Optional[EmbeddingPipeline] = None,
+        shortlists: Optional[ShortlistService] = None,
+        notifications: Optional[NotificationService] = None
+    ):
         self.db = db
+        self.match_cache = match_cache if match_cache is not None else MatchScoreCache(db)
+        self.embedding_pipeline = embedding_pipeline
+        self.shortlists = shortlists
+        self.notifications = notifications
     
     async def create_role(self, founder_id: str, data: RoleCreate) -> RoleResponse:
         """Create a new role"""
@@ -45,11 +91,21 @@ class RoleController:
             "remote_allowed": data.remote_allowed,
             "visa_sponsorship": data.visa_sponsorship,
             "status": RoleStatus.ACTIVE.value,
+            "applications_count": 0,
             "created_at": now.isoformat(),
             "updated_at": None
         }
         
-        await self.db.roles.insert_one(role_doc)
+        async def insert():
+            await self.db.roles.insert_one(role_doc)
+            return None, RoleStatus.ACTIVE.value
+        
+        await self._write_role_status(startup["startup_id"], insert)
+        
+        if self.embedding_pipeline:
+            self.embedding_pipeline.schedule_role(role_id)
+        if self.shortlists:
+            self.shortlists.schedule_role(role_id)
         
         return RoleResponse(
             role_id=role_id,
@@ -84,10 +140,9 @@ class RoleController:
             {"_id": 0, "name": 1, "logo_url": 1}
         )
         
-        # Count applications
-        apps_count = await self.db.applications.count_documents({"role_id": role_id})
+        counts = await self._applications_counts([role])
         
-        return self._doc_to_response(role, apps_count, startup)
+        return self._doc_to_response(role, counts[role_id], startup)
     
     async def update_role(self, role_id: str, founder_id: str, data: RoleUpdate) -> RoleResponse:
         """Update role"""
@@ -110,10 +165,34 @@ class RoleController:
         
         update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
         
-        await self.db.roles.update_one(
-            {"role_id": role_id},
-            {"$set": update_data}
-        )
+        async def update():
+            previous = await self.db.roles.find_one_and_update(
+                {"role_id": role_id},
+                {"$set": update_data},
+                projection={"_id": 0, "status": 1}
+            )
+            if previous is None:
+                return None, None
+            return previous["status"], update_data.get("status", previous["status"])
+        
+        if "status" in update_data:
+            found, _ = await self._write_role_status(role["startup_id"], update)
+        else:
+            found, _ = await update()
+        if found is None:
+            # Removed since it was read above
+            raise ValueError("Role not found")
+        
+        # Cached match scores for this role are stale once scoring fields change
+        if scoring_fields_changed(role, update_data, ROLE_SCORING_FIELDS):
+            await self.match_cache.invalidate_role(role_id)
+            if self.shortlists:
+                await self.shortlists.invalidate_role(role_id)
+        elif self.shortlists and "status" in update_data:
+            self.shortlists.schedule_role(role_id)
+        
+        if self.embedding_pipeline:
+            self.embedding_pipeline.schedule_role(role_id)
         
         return await self.get_role(role_id)
     
@@ -126,10 +205,30 @@ class RoleController:
         if role["founder_id"] != founder_id:
             raise ValueError("Not authorized to delete this role")
         
-        await self.db.roles.update_one(
-            {"role_id": role_id},
-            {"$set": {"status": RoleStatus.CLOSED.value, "updated_at": datetime.now(timezone.utc).isoformat()}}
-        )
+        async def close():
+            previous = await self.db.roles.find_one_and_update(
+                {"role_id": role_id},
+                {"$set": {"status": RoleStatus.CLOSED.value, "updated_at": datetime.now(timezone.utc).isoformat()}},
+                projection={"_id": 0, "status": 1}
+            )
+            if previous is None:
+                return None, None
+            return previous["status"], RoleStatus.CLOSED.value
+        
+        previous_status, _ = await self._write_role_status(role["startup_id"], close)
+        if previous_status is None:
+            # Removed since it was read above
+            raise ValueError("Role not found")
+        
+        # One server-side fan-out, however many engineers applied
+        if self.notifications and previous_status != RoleStatus.CLOSED.value:
+            await self.notifications.notify_role_closed(role)
+        
+        # Closed roles leave the semantic index and lose their shortlist
+        if self.embedding_pipeline:
+            self.embedding_pipeline.schedule_role(role_id)
+        if self.shortlists:
+            self.shortlists.schedule_role(role_id)
         
         return True
     
@@ -141,9 +240,13 @@ class RoleController:
         skills: Optional[List[str]] = None,
         experience_level: Optional[str] = None,
         remote_allowed: Optional[bool] = None,
-        status: Optional[str] = None
+        status: Optional[str] = None,
+        after: Optional[str] = None,
+        count_mode: str = "exact",
+        view: str = "full"
     ) -> RoleListResponse:
         """List roles with filters"""
+        projection = ROLE_LIST.projection_for(view)
         query = {}
         
         if status:
@@ -160,27 +263,28 @@ class RoleController:
         if remote_allowed is not None:
             query["remote_allowed"] = remote_allowed
         
-        total = await self.db.roles.count_documents(query)
+        total, total_exact = await count_total(self.db.roles, query, count_mode)
         
-        cursor = self.db.roles.find(query, {"_id": 0})
-        cursor = cursor.skip((page - 1) * page_size).limit(page_size)
-        cursor = cursor.sort("created_at", -1)
+        docs, has_more, next_cursor = await ROLE_LIST.fetch(
+            self.db, query, page=page, page_size=page_size, after=after, projection=projection
+        )
+        startups = await load_startups(self.db, (doc["startup_id"] for doc in docs))
+        counts = await self._applications_counts(docs)
         
-        roles = []
-        async for doc in cursor:
-            startup = await self.db.startups.find_one(
-                {"startup_id": doc["startup_id"]},
-                {"_id": 0, "name": 1, "logo_url": 1}
-            )
-            apps_count = await self.db.applications.count_documents({"role_id": doc["role_id"]})
-            roles.append(self._doc_to_response(doc, apps_count, startup))
+        to_response = self._doc_to_summary if view == "summary" else self._doc_to_response
+        roles = [
+            to_response(doc, counts[doc["role_id"]], startups.get(doc["startup_id"]))
+            for doc in docs
+        ]
         
         return RoleListResponse(
             roles=roles,
             total=total,
+            total_exact=total_exact,
             page=page,
             page_size=page_size,
-            has_more=(page * page_size) < total
+            has_more=has_more,
+            next_cursor=next_cursor
         )
     
     async def get_startup_roles(self, founder_id: str) -> List[RoleResponse]:
@@ -194,15 +298,102 @@ class RoleController:
             {"_id": 0}
         ).sort("created_at", -1)
         
-        roles = []
-        async for doc in cursor:
-            apps_count = await self.db.applications.count_documents({"role_id": doc["role_id"]})
-            roles.append(self._doc_to_response(doc, apps_count, startup))
+        docs = await cursor.to_list(None)
+        counts = await self._applications_counts(docs)
         
-        return roles
+        return [self._doc_to_response(doc, counts[doc["role_id"]], startup) for doc in docs]
     
-    def _doc_to_response(self, doc: dict, apps_count: int = 0, startup: dict = None) -> RoleResponse:
-        """Convert MongoDB document to response model"""
+    async def _write_role_status(
+        self,
+        startup_id: str,
+        write: Callable[[], Awaitable[Tuple[Optional[str], Optional[str]]]]
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Run a role write that may change its status and keep the startup's
+        open_roles_count in step. write() returns the role's status before
+        and after (None if the role does not exist). The startup is marked
+        pending, and its counter version bumped, before the write, so
+        reconcile_open_roles_counts never overwrites the counter between the
+        role write and its $inc.
+        """
+        await self.db.startups.update_one(
+            {"startup_id": startup_id},
+            {
+                "$inc": {"open_roles_pending": 1, "open_roles_version": 1},
+                "$set": {"open_roles_pending_at": datetime.now(timezone.utc).isoformat()}
+            }
+        )
+        before = after = None
+        try:
+            before, after = await write()
+        finally:
+            await self._adjust_open_roles(startup_id, before, after)
+        return before, after
+    
+    async def _adjust_open_roles(
+        self,
+        startup_id: str,
+        before: Optional[str],
+        after: Optional[str]
+    ):
+        """Apply a role status transition to open_roles_count and clear its pending mark"""
+        active = RoleStatus.ACTIVE.value
+        if (before == active) != (after == active):
+            # Startups without the counter yet are counted by aggregation instead
+            result = await self.db.startups.update_one(
+                {"startup_id": startup_id, "open_roles_count": {"$exists": True}},
+                {"$inc": {"open_roles_count": 1 if after == active else -1, "open_roles_pending": -1}}
+            )
+            if result.matched_count:
+                return
+        
+        await self.db.startups.update_one(
+            {"startup_id": startup_id},
+            {"$inc": {"open_roles_pending": -1}}
+        )
+    
+    async def _applications_counts(self, docs: List[dict]) -> Dict[str, int]:
+        """
+        Applications per role. Uses the denormalized applications_count when the
+        role has one, and a single $group aggregation for the rest.
+        """
+        counts = {
+            doc["role_id"]: doc["applications_count"]
+            for doc in docs
+            if doc.get("applications_count") is not None
+        }
+        missing = [doc["role_id"] for doc in docs if doc["role_id"] not in counts]
+        if missing:
+            counts.update(await count_by(
+                self.db.applications, "role_id", missing, COUNTED_APPLICATIONS
+            ))
+        return counts
+    
+    def _doc_to_summary(self, doc: dict, apps_count: int = 0, startup: dict = None) -> RoleSummary:
+        """Convert MongoDB document to list-view summary model"""
+        created_at, updated_at = self._timestamps(doc)
+        
+        return RoleSummary(
+            role_id=doc["role_id"],
+            startup_id=doc["startup_id"],
+            title=doc["title"],
+            skills_required=doc.get("skills_required", []),
+            experience_level=doc["experience_level"],
+            employment_type=doc["employment_type"],
+            salary_range=doc.get("salary_range"),
+            location=doc["location"],
+            remote_allowed=doc.get("remote_allowed", True),
+            visa_sponsorship=doc.get("visa_sponsorship", False),
+            status=doc["status"],
+            applications_count=apps_count,
+            created_at=created_at,
+            updated_at=updated_at,
+            startup_name=startup.get("name") if startup else None,
+            startup_logo=startup.get("logo_url") if startup else None
+        )
+    
+    def _timestamps(self, doc: dict):
+        """created_at and updated_at as datetimes"""
         created_at = doc["created_at"]
         if isinstance(created_at, str):
             created_at = datetime.fromisoformat(created_at)
@@ -210,6 +401,11 @@ class RoleController:
         updated_at = doc.get("updated_at")
         if updated_at and isinstance(updated_at, str):
             updated_at = datetime.fromisoformat(updated_at)
+        return created_at, updated_at
+    
+    def _doc_to_response(self, doc: dict, apps_count: int = 0, startup: dict = None) -> RoleResponse:
+        """Convert MongoDB document to response model"""
+        created_at, updated_at = self._timestamps(doc)
         
         return RoleResponse(
             role_id=doc["role_id"],
@@ -1,17 +1,43 @@
 """
 Startup Controller - Handles startup CRUD operations
 """
-from datetime import datetime, timezone
-from typing import Optional, List
+from datetime import datetime, timezone, timedelta
+from typing import Optional, List, Dict
 import logging
 
+from pymongo import UpdateOne
+
 from schemas.startup import (
     StartupCreate, StartupUpdate, StartupResponse, StartupListResponse,
     generate_startup_id
 )
+from services.batch_loader import count_by
+from services.pagination import count_total
+from services.query_builder import ListSpec
 
 logger = logging.getLogger(__name__)
 
+# Fields StartupResponse is built from
+STARTUP_FIELDS = (
+    "startup_id", "founder_id", "name", "tagline", "description", "website", "logo_url",
+    "funding_stage", "team_size", "tech_stack", "industry", "location", "remote_friendly",
+    "open_roles_count", "created_at", "updated_at"
+)
+
+# A role write marked pending this long ago belongs to a process that died
+# before adjusting open_roles_count; reconcile may repair that counter again
+OPEN_ROLES_PENDING_TIMEOUT = 300
+
+STARTUP_LIST = ListSpec(
+    "startups", "created_at", "startup_id",
+    fields=STARTUP_FIELDS,
+    hints=[
+        (("industry",), "industry_1_created_at_-1_startup_id_-1"),
+        ((), "created_at_-1_startup_id_-1"),
+    ],
+    filter_fields=("funding_stage", "remote_friendly")
+)
+
 
 class StartupController:
     """Controller for startup operations"""
@@ -43,6 +69,7 @@ class StartupController:
             "industry": data.industry,
             "location": data.location,
             "remote_friendly": data.remote_friendly,
+            "open_roles_count": 0,
             "created_at": now.isoformat(),
             "updated_at": None
         }
@@ -69,13 +96,9 @@ class StartupController:
         if not startup:
             return None
         
-        # Count open roles
-        roles_count = await self.db.roles.count_documents({
-            "startup_id": startup_id,
-            "status": "active"
-        })
+        counts = await self._open_roles_counts([startup])
         
-        return self._doc_to_response(startup, roles_count)
+        return self._doc_to_response(startup, counts[startup_id])
     
     async def get_founder_startup(self, founder_id: str) -> Optional[StartupResponse]:
         """Get startup by founder ID"""
@@ -83,12 +106,9 @@ class StartupController:
         if not startup:
             return None
         
-        roles_count = await self.db.roles.count_documents({
-            "startup_id": startup["startup_id"],
-            "status": "active"
-        })
+        counts = await self._open_roles_counts([startup])
         
-        return self._doc_to_response(startup, roles_count)
+        return self._doc_to_response(startup, counts[startup["startup_id"]])
     
     async def update_startup(self, startup_id: str, founder_id: str, data: StartupUpdate) -> StartupResponse:
         """Update startup"""
@@ -122,7 +142,9 @@ class StartupController:
         page_size: int = 20,
         industry: Optional[str] = None,
         funding_stage: Optional[str] = None,
-        remote_friendly: Optional[bool] = None
+        remote_friendly: Optional[bool] = None,
+        after: Optional[str] = None,
+        count_mode: str = "exact"
     ) -> StartupListResponse:
         """List startups with filters"""
         query = {}
@@ -134,28 +156,93 @@ class StartupController:
         if remote_friendly is not None:
             query["remote_friendly"] = remote_friendly
         
-        total = await self.db.startups.count_documents(query)
-        
-        cursor = self.db.startups.find(query, {"_id": 0})
-        cursor = cursor.skip((page - 1) * page_size).limit(page_size)
-        cursor = cursor.sort("created_at", -1)
+        total, total_exact = await count_total(self.db.startups, query, count_mode)
         
-        startups = []
-        async for doc in cursor:
-            roles_count = await self.db.roles.count_documents({
-                "startup_id": doc["startup_id"],
-                "status": "active"
-            })
-            startups.append(self._doc_to_response(doc, roles_count))
+        docs, has_more, next_cursor = await STARTUP_LIST.fetch(
+            self.db, query, page=page, page_size=page_size, after=after
+        )
+        counts = await self._open_roles_counts(docs)
+        startups = [self._doc_to_response(doc, counts[doc["startup_id"]]) for doc in docs]
         
         return StartupListResponse(
             startups=startups,
             total=total,
+            total_exact=total_exact,
             page=page,
             page_size=page_size,
-            has_more=(page * page_size) < total
+            has_more=has_more,
+            next_cursor=next_cursor
         )
     
+    async def _open_roles_counts(self, docs: List[dict]) -> Dict[str, int]:
+        """
+        Active roles per startup. Uses the denormalized open_roles_count when
+        the startup has one, and a single $group aggregation for the rest.
+        """
+        counts = {
+            doc["startup_id"]: doc["open_roles_count"]
+            for doc in docs
+            if doc.get("open_roles_count") is not None
+        }
+        missing = [doc["startup_id"] for doc in docs if doc["startup_id"] not in counts]
+        if missing:
+            counts.update(await count_by(
+                self.db.roles, "startup_id", missing, {"status": "active"}
+            ))
+        return counts
+    
+    async def reconcile_open_roles_counts(self) -> int:
+        """
+        Recount active roles for every startup and repair drifted counters.
+        Startups with a role status write in flight are skipped. The others
+        are only overwritten if their open_roles_version, bumped before every
+        such write, is unchanged since it was read ahead of the recount, so
+        a concurrent role write's $inc is never lost; those are left for the
+        next run.
+        """
+        stale = (datetime.now(timezone.utc) - timedelta(seconds=OPEN_ROLES_PENDING_TIMEOUT)).isoformat()
+        observed = {}
+        cursor = self.db.startups.find({}, {
+            "_id": 0, "startup_id": 1, "open_roles_count": 1, "open_roles_version": 1,
+            "open_roles_pending": 1, "open_roles_pending_at": 1
+        })
+        async for doc in cursor:
+            pending = doc.get("open_roles_pending") or 0
+            if pending > 0 and (doc.get("open_roles_pending_at") or "") >= stale:
+                continue
+            observed[doc["startup_id"]] = (
+                doc.get("open_roles_count"), doc.get("open_roles_version"), pending
+            )
+        
+        actual: Dict[str, int] = {}
+        cursor = self.db.roles.aggregate([
+            {"$match": {"status": "active"}},
+            {"$group": {"_id": "$startup_id", "count": {"$sum": 1}}}
+        ])
+        async for row in cursor:
+            actual[row["_id"]] = row["count"]
+        
+        operations = []
+        for startup_id, (seen, version, pending) in observed.items():
+            count = actual.get(startup_id, 0)
+            if seen == count and not pending:
+                continue
+            repair = {"open_roles_count": count}
+            if pending:
+                # Abandoned by a process that died mid-write
+                repair["open_roles_pending"] = 0
+            operations.append(UpdateOne(
+                # null also matches a missing version on startups never written since
+                {"startup_id": startup_id, "open_roles_version": version},
+                {"$set": repair}
+            ))
+        
+        if not operations:
+            return 0
+        result = await self.db.startups.bulk_write(operations, ordered=False)
+        logger.info(f"Repaired open_roles_count on {result.modified_count} startups")
+        return result.modified_count
+    
     def _doc_to_response(self, doc: dict, roles_count: int = 0) -> StartupResponse:
         """Convert MongoDB document to response model"""
         created_at = doc["created_at"]
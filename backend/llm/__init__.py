@@ -2,9 +2,11 @@
 from .llm_service import LLMService
 from .openai_provider import OpenAIProvider
 from .anthropic_provider import AnthropicProvider
+from .hashing_embedder import HashingEmbedder
 
 __all__ = [
     "LLMService",
     "OpenAIProvider",
     "AnthropicProvider",
+    "HashingEmbedder",
 ]
@@ -14,6 +14,8 @@ logger = logging.getLogger(__name__)
 class AnthropicProvider(LLMProvider):
     """Anthropic Claude API provider implementation"""
     
+    supports_embeddings = False
+    
     def __init__(self):
         self.api_key = os.environ.get("ANTHROPIC_API_KEY")
         self.model = os.environ.get("ANTHROPIC_MODEL", "claude-3-haiku-20240307")
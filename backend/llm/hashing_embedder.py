@@ -0,0 +1,46 @@
+"""
+Hashing Embedder - Deterministic local embeddings via feature hashing
+"""
+from typing import List
+import hashlib
+import math
+import re
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+
+class HashingEmbedder:
+    """
+    Embeds text by hashing word unigrams and bigrams into a fixed number of
+    buckets. No network or model download is needed and the same text always
+    produces the same vector, which makes it suitable for local development,
+    tests, and as a fallback when no embedding provider is configured.
+    """
+    
+    def __init__(self, dimensions: int = 256):
+        self.dimensions = dimensions
+        self.embedding_model = f"hashing-{dimensions}"
+    
+    def _bucket(self, feature: str):
+        digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        return value % self.dimensions, 1.0 if (value >> 63) & 1 else -1.0
+    
+    def embed(self, text: str) -> List[float]:
+        """Embed a single text"""
+        vector = [0.0] * self.dimensions
+        tokens = _TOKEN_RE.findall((text or "").lower())
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        
+        for feature in features:
+            index, sign = self._bucket(feature)
+            vector[index] += sign
+        
+        norm = math.sqrt(sum(v * v for v in vector))
+        if norm:
+            vector = [v / norm for v in vector]
+        return vector
+    
+    async def embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Generate embeddings for texts (same interface as LLMService)"""
+        return [self.embed(text) for text in texts]
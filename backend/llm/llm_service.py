@@ -12,6 +12,9 @@ logger = logging.getLogger(__name__)
 class LLMProvider(ABC):
     """Abstract base class for LLM providers"""
     
+    # Whether embeddings() is backed by a real embeddings API
+    supports_embeddings = True
+    
     @abstractmethod
     async def generate(
         self,
@@ -77,6 +80,11 @@ class LLMService:
         """Check if LLM service is available"""
         return self.provider is not None
     
+    @property
+    def supports_embeddings(self) -> bool:
+        """Check if the provider can generate embeddings"""
+        return self.provider is not None and self.provider.supports_embeddings
+    
     async def generate(
         self,
         prompt: str,
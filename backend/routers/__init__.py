@@ -1 +1,2 @@
 from .auth import router as auth_router, get_current_user, get_db
+from .realtime import router as realtime_router, get_hub, get_notification_writer
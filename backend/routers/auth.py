@@ -59,13 +59,10 @@ def decode_jwt_token(token: str) -> Optional[dict]:
         return None
 
 
-async def get_current_user(request: Request, db=Depends(get_db)) -> dict:
+async def resolve_user(db, session_token: Optional[str], jwt_token: Optional[str]) -> Optional[dict]:
     """
-    Get current user from session token (cookie) or JWT (header)
+    User for a session token or JWT, whichever is valid (session first)
     """
-    # Check session token from cookie first
-    session_token = request.cookies.get("session_token")
-    
     if session_token:
         # Verify session
         session = await db.user_sessions.find_one(
@@ -87,11 +84,8 @@ async def get_current_user(request: Request, db=Depends(get_db)) -> dict:
                 if user:
                     return user
     
-    # Fall back to JWT from Authorization header
-    auth_header = request.headers.get("Authorization")
-    if auth_header and auth_header.startswith("Bearer "):
-        token = auth_header.split(" ")[1]
-        payload = decode_jwt_token(token)
+    if jwt_token:
+        payload = decode_jwt_token(jwt_token)
         if payload:
             user = await db.users.find_one(
                 {"user_id": payload["user_id"]},
@@ -100,6 +94,25 @@ async def get_current_user(request: Request, db=Depends(get_db)) -> dict:
             if user:
                 return user
     
+    return None
+
+
+async def get_current_user(request: Request, db=Depends(get_db)) -> dict:
+    """
+    Get current user from session token (cookie) or JWT (header)
+    """
+    # Session token from cookie first, then JWT from Authorization header
+    session_token = request.cookies.get("session_token")
+    
+    jwt_token = None
+    auth_header = request.headers.get("Authorization")
+    if auth_header and auth_header.startswith("Bearer "):
+        jwt_token = auth_header.split(" ")[1]
+    
+    user = await resolve_user(db, session_token, jwt_token)
+    if user:
+        return user
+    
     raise HTTPException(status_code=401, detail="Not authenticated")
 
 
@@ -0,0 +1,118 @@
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, Request, status
+from fastapi.responses import StreamingResponse
+from typing import Optional
+import asyncio
+import json
+import logging
+import os
+
+from .auth import get_db, get_current_user, resolve_user
+from services.notification_service import NotificationService
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["realtime"])
+
+# Seconds between SSE keepalive comments, so proxies keep idle streams open
+SSE_HEARTBEAT_INTERVAL = float(os.environ.get("SSE_HEARTBEAT_INTERVAL", "15"))
+
+
+def get_hub():
+    """Dependency to get the realtime hub - will be injected from main app"""
+    from server import realtime_hub
+    return realtime_hub
+
+
+def get_notification_writer():
+    """Dependency to get the notification writer - will be injected from main app"""
+    from server import notification_writer
+    return notification_writer
+
+
+@router.websocket("/ws")
+async def realtime_socket(
+    websocket: WebSocket,
+    token: Optional[str] = None,
+    db=Depends(get_db),
+    hub=Depends(get_hub)
+):
+    """
+    Push new messages, connection updates and notifications to the user.
+    Authenticates with the session_token cookie, or a JWT in ?token= since
+    browsers cannot set headers on WebSocket requests.
+    """
+    user = await resolve_user(db, websocket.cookies.get("session_token"), token)
+    if not user:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    await websocket.accept()
+    subscription = await hub.connect(user["user_id"])
+    
+    async def send_events():
+        while True:
+            await websocket.send_json(await subscription.get())
+    
+    async def receive_until_closed():
+        # Clients only send keepalives; reading is how a disconnect is noticed
+        while True:
+            if await websocket.receive_text() == "ping":
+                await websocket.send_json({"type": "pong"})
+    
+    tasks = [asyncio.create_task(send_events()), asyncio.create_task(receive_until_closed())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            error = task.exception()
+            if error and not isinstance(error, WebSocketDisconnect):
+                logger.warning(f"Realtime socket for {user['user_id']} closed: {error}")
+    finally:
+        for task in tasks:
+            task.cancel()
+        await hub.disconnect(subscription)
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.get("/notifications/unread-count/stream")
+async def unread_count_stream(
+    request: Request,
+    user: dict = Depends(get_current_user),
+    db=Depends(get_db),
+    hub=Depends(get_hub),
+    writer=Depends(get_notification_writer)
+):
+    """
+    Server-Sent Events stream of the user's unread notification count: the
+    current count on connect, then every change.
+    """
+    # With the writer, counts include notifications still queued for insertion
+    notifications = NotificationService(db, hub, writer=writer)
+    user_id = user["user_id"]
+    
+    async def events():
+        subscription = await hub.connect(user_id)
+        try:
+            yield _sse("unread_count", {"count": await notifications.get_unread_count(user_id)})
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(subscription.get(), SSE_HEARTBEAT_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                
+                if event["type"] == "unread_count":
+                    yield _sse("unread_count", event["data"])
+                elif event["type"] == "resync":
+                    # Dropped events may have included count changes
+                    yield _sse("unread_count", {"count": await notifications.get_unread_count(user_id)})
+        finally:
+            await hub.disconnect(subscription)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -7,10 +7,11 @@ from .startup import (
     StartupCreate, StartupUpdate, StartupResponse, StartupListResponse
 )
 from .role import (
-    RoleCreate, RoleUpdate, RoleResponse, RoleListResponse, RoleStatus
+    RoleCreate, RoleUpdate, RoleResponse, RoleSummary, RoleListResponse, RoleStatus
 )
 from .engineer import (
-    EngineerProfileCreate, EngineerProfileUpdate, EngineerProfileResponse
+    EngineerProfileCreate, EngineerProfileUpdate, EngineerProfileResponse,
+    EngineerProfileSummary, EngineerListResponse
 )
 from .application import (
     ApplicationCreate, ApplicationUpdate, ApplicationResponse, ApplicationStatus
@@ -26,9 +27,10 @@ __all__ = [
     # Startup
     "StartupCreate", "StartupUpdate", "StartupResponse", "StartupListResponse",
     # Role
-    "RoleCreate", "RoleUpdate", "RoleResponse", "RoleListResponse", "RoleStatus",
+    "RoleCreate", "RoleUpdate", "RoleResponse", "RoleSummary", "RoleListResponse", "RoleStatus",
     # Engineer
     "EngineerProfileCreate", "EngineerProfileUpdate", "EngineerProfileResponse",
+    "EngineerProfileSummary", "EngineerListResponse",
     # Application
     "ApplicationCreate", "ApplicationUpdate", "ApplicationResponse", "ApplicationStatus",
     # Connection
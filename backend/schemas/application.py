@@ -40,6 +40,14 @@ class ApplicationUpdate(BaseModel):
     interview_date: Optional[datetime] = None
 
 
+class ApplicationBulkUpdate(BaseModel):
+    """Schema for updating the status of many applications at once (by founder)"""
+    application_ids: List[str] = Field(..., min_length=1, max_length=1000)
+    status: ApplicationStatus
+    feedback: Optional[str] = None
+    interview_date: Optional[datetime] = None
+
+
 class ApplicationWithdraw(BaseModel):
     """Schema for withdrawing an application"""
     reason: Optional[str] = None
@@ -66,10 +74,20 @@ class ApplicationResponse(BaseModel):
     engineer_name: Optional[str] = None
 
 
+class ApplicationBulkUpdateResponse(BaseModel):
+    """Schema for the outcome of a bulk status update"""
+    status: ApplicationStatus
+    updated: List[str]
+    unchanged: List[str]  # Already had the target status
+    skipped: List[str]  # Not found, not an application to the founder's startup, or changed concurrently
+
+
 class ApplicationListResponse(BaseModel):
     """Schema for paginated application list"""
     applications: List[ApplicationResponse]
-    total: int
+    total: Optional[int] = None  # None when count_mode="none"
+    total_exact: bool = True  # False for cached or estimated totals
     page: int
     page_size: int
     has_more: bool
+    next_cursor: Optional[str] = None  # Pass as `after` to fetch the next page
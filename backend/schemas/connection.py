@@ -56,6 +56,13 @@ class Message(BaseModel):
     read: bool = False
 
 
+class MessageListResponse(BaseModel):
+    """Schema for a page of connection messages, oldest first"""
+    messages: List[Message]
+    has_more: bool
+    next_cursor: Optional[str] = None  # Pass as `before` to fetch older messages; None for after_id/since
+
+
 class ConnectionResponse(BaseModel):
     """Schema for connection response"""
     connection_id: str
@@ -63,7 +70,10 @@ class ConnectionResponse(BaseModel):
     engineer_id: str
     role_id: Optional[str] = None
     status: ConnectionStatus
-    messages: List[Message] = Field(default_factory=list)
+    messages: List[Message] = Field(default_factory=list)  # Most recent page; empty in lists
+    last_message: Optional[Message] = None
+    message_count: int = 0
+    unread_count: Optional[int] = None  # Unread by the requesting user, when known
     created_at: datetime
     updated_at: Optional[datetime] = None
     # Populated fields
@@ -76,7 +86,9 @@ class ConnectionResponse(BaseModel):
 class ConnectionListResponse(BaseModel):
     """Schema for paginated connection list"""
     connections: List[ConnectionResponse]
-    total: int
+    total: Optional[int] = None  # None when count_mode="none"
+    total_exact: bool = True  # False for cached or estimated totals
     page: int
     page_size: int
     has_more: bool
+    next_cursor: Optional[str] = None  # Pass as `after` to fetch the next page
@@ -2,7 +2,7 @@
 Engineer Profile Schemas - Request/Response models for engineer/candidate profiles
 """
 from pydantic import BaseModel, Field, HttpUrl
-from typing import Optional, List
+from typing import Optional, List, Union
 from datetime import datetime
 from enum import Enum
 import uuid
@@ -111,10 +111,30 @@ class EngineerProfileResponse(BaseModel):
     updated_at: Optional[datetime] = None
 
 
+class EngineerProfileSummary(BaseModel):
+    """Schema for engineer profile in list views (no bio, experience or education)"""
+    profile_id: str
+    user_id: str
+    name: str
+    avatar_url: Optional[str] = None
+    headline: str
+    skills: List[str]
+    experience_years: int
+    availability: AvailabilityStatus
+    work_preference: WorkPreference
+    preferred_locations: List[str]
+    open_to_equity: bool
+    match_score: Optional[float] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+
 class EngineerListResponse(BaseModel):
     """Schema for paginated engineer list"""
-    engineers: List[EngineerProfileResponse]
-    total: int
+    engineers: List[Union[EngineerProfileResponse, EngineerProfileSummary]]
+    total: Optional[int] = None  # None when count_mode="none"
+    total_exact: bool = True  # False for cached or estimated totals
     page: int
     page_size: int
     has_more: bool
+    next_cursor: Optional[str] = None  # Pass as `after` to fetch the next page
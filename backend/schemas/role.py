@@ -2,7 +2,7 @@
 Role Schemas - Request/Response models for job roles/positions
 """
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Union
 from datetime import datetime
 from enum import Enum
 import uuid
@@ -102,10 +102,33 @@ class RoleResponse(BaseModel):
     startup_logo: Optional[str] = None
 
 
+class RoleSummary(BaseModel):
+    """Schema for role in list views (no description, requirements or nice-to-haves)"""
+    role_id: str
+    startup_id: str
+    title: str
+    skills_required: List[str]
+    experience_level: ExperienceLevel
+    employment_type: EmploymentType
+    salary_range: Optional[SalaryRange] = None
+    location: str
+    remote_allowed: bool
+    visa_sponsorship: bool
+    status: RoleStatus
+    applications_count: int = 0
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    # Populated fields
+    startup_name: Optional[str] = None
+    startup_logo: Optional[str] = None
+
+
 class RoleListResponse(BaseModel):
     """Schema for paginated role list"""
-    roles: List[RoleResponse]
-    total: int
+    roles: List[Union[RoleResponse, RoleSummary]]
+    total: Optional[int] = None  # None when count_mode="none"
+    total_exact: bool = True  # False for cached or estimated totals
     page: int
     page_size: int
     has_more: bool
+    next_cursor: Optional[str] = None  # Pass as `after` to fetch the next page
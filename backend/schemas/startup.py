@@ -87,7 +87,9 @@ class StartupResponse(BaseModel):
 class StartupListResponse(BaseModel):
     """Schema for paginated startup list"""
     startups: List[StartupResponse]
-    total: int
+    total: Optional[int] = None  # None when count_mode="none"
+    total_exact: bool = True  # False for cached or estimated totals
     page: int
     page_size: int
     has_more: bool
+    next_cursor: Optional[str] = None  # Pass as `after` to fetch the next page
@@ -38,10 +38,29 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Background services shared by all requests
+from llm import LLMService
+from services import (
+    MatchingService, EmbeddingPipeline, ShortlistService, RealtimeHub, InMemoryBroker,
+    NotificationWriter, NotificationDigestBuilder, NotificationArchiver
+)
+
+llm_provider = os.environ.get('LLM_PROVIDER')
+llm_service = LLMService.create(llm_provider) if llm_provider else None
+matching_service = MatchingService(db, llm_service)
+embedding_pipeline = EmbeddingPipeline(matching_service)
+shortlist_service = ShortlistService(db, matching_service)
+# Swap InMemoryBroker for a shared broker when running several workers
+realtime_hub = RealtimeHub(InMemoryBroker())
+notification_writer = NotificationWriter(db)
+notification_digests = NotificationDigestBuilder(db)
+notification_archiver = NotificationArchiver(db)
+
 # Import and include routers
-from routers import auth_router
+from routers import auth_router, realtime_router
 
 app.include_router(auth_router, prefix="/api")
+app.include_router(realtime_router, prefix="/api")
 
 
 @app.get("/api")
@@ -64,10 +83,43 @@ async def health_check():
 async def startup_event():
     """Initialize on startup"""
     logger.info("Starting StartupsForYou API...")
+    
+    # Schema: data migrations first, then indexes (the sessions TTL index needs migrated dates)
+    from services.migrations import MigrationManager
+    from services.indexes import ensure_indexes, log_index_report
+    await MigrationManager(db).run()
+    log_index_report(await ensure_indexes(db))
+    
+    if os.environ.get("QUERY_PLAN_AUDIT", "").lower() in ("1", "true", "yes"):
+        from services.query_audit import audit_list_query_plans
+        await audit_list_query_plans(db)
+    
+    # Repair any drift in denormalized counters
+    from controllers import StartupController
+    await StartupController(db).reconcile_open_roles_counts()
+    
+    embedding_pipeline.start()
+    shortlist_service.start()
+    notification_writer.start()
+    notification_digests.start()
+    notification_archiver.start()
 
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
     """Clean up on shutdown"""
     logger.info("Shutting down StartupsForYou API...")
+    # Queued notifications first, so a failing worker cannot lose them; every
+    # worker is stopped (and the connection closed) even if another one fails
+    for worker in (
+        notification_writer,
+        embedding_pipeline,
+        shortlist_service,
+        notification_digests,
+        notification_archiver
+    ):
+        try:
+            await worker.stop()
+        except Exception as e:
+            logger.error(f"{worker.name} failed to stop cleanly: {e}")
     client.close()
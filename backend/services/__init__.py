@@ -2,9 +2,26 @@
 from .matching_service import MatchingService
 from .resume_service import ResumeService
 from .notification_service import NotificationService
+from .batch_scorer import EngineerBatch, RoleBatch
+from .embedding_pipeline import EmbeddingPipeline
+from .shortlist_service import ShortlistService
+from .realtime import RealtimeHub, Broker, InMemoryBroker
+from .notification_writer import NotificationWriter
+from .notification_digest import NotificationDigestBuilder
+from .notification_archive import NotificationArchiver
 
 __all__ = [
     "MatchingService",
     "ResumeService",
     "NotificationService",
+    "EngineerBatch",
+    "RoleBatch",
+    "EmbeddingPipeline",
+    "ShortlistService",
+    "RealtimeHub",
+    "Broker",
+    "InMemoryBroker",
+    "NotificationWriter",
+    "NotificationDigestBuilder",
+    "NotificationArchiver",
 ]
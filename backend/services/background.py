@@ -0,0 +1,153 @@
+"""
+Background Worker - Coalescing queues of document ids and periodic jobs, run off the request path
+"""
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Iterable
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CoalescingWorker(ABC):
+    """
+    Base class for background workers fed by write events.
+    Ids are queued per kind; scheduling the same id again before it is
+    processed is a no-op. The worker wakes up every flush_interval seconds,
+    or as soon as batch_size ids are pending, and hands them to process()
+    in batches of at most batch_size per kind.
+    """
+    
+    kinds: Iterable[str] = ()
+    name = "background worker"
+    
+    def __init__(self, batch_size: int, flush_interval: float):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # Insertion-ordered sets of pending ids, per kind
+        self._pending: Dict[str, Dict[str, None]] = {kind: {} for kind in self.kinds}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+    
+    @property
+    def pending_count(self) -> int:
+        return sum(len(ids) for ids in self._pending.values())
+    
+    def schedule(self, kind: str, doc_id: str):
+        """Queue a document id for processing"""
+        self._pending[kind][doc_id] = None
+        if self.pending_count >= self.batch_size:
+            self._wakeup.set()
+    
+    def start(self):
+        """Start the background worker"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Stop the background worker after processing anything still pending"""
+        if self._task:
+            # Let a batch already inside process() finish rather than cancelling it
+            self._stopping = True
+            self._wakeup.set()
+            try:
+                await self._task
+            finally:
+                self._task = None
+                self._stopping = False
+        await self.flush()
+    
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self._stopping:
+                break
+            
+            try:
+                await self.flush()
+                await self.on_idle()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"{self.name} failed: {e}")
+    
+    def _take(self, kind: str) -> List[str]:
+        ids = list(self._pending[kind])[:self.batch_size]
+        for doc_id in ids:
+            del self._pending[kind][doc_id]
+        return ids
+    
+    async def flush(self) -> int:
+        """Process everything pending now; returns the sum of process() results"""
+        processed = 0
+        while self.pending_count:
+            for kind in self.kinds:
+                ids = self._take(kind)
+                if not ids:
+                    continue
+                try:
+                    processed += await self.process(kind, ids)
+                except BaseException:
+                    # Put the batch back so the next flush retries it, also when cancelled
+                    for doc_id in ids:
+                        self._pending[kind].setdefault(doc_id)
+                    raise
+        return processed
+    
+    @abstractmethod
+    async def process(self, kind: str, ids: List[str]) -> int:
+        """Handle one batch of ids of one kind"""
+        pass
+    
+    async def on_idle(self):
+        """Hook run after every periodic flush"""
+        pass
+
+
+class PeriodicTask(ABC):
+    """Base class for background jobs that run every interval seconds"""
+    
+    name = "periodic task"
+    
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._stopped = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self):
+        """Start running the job periodically"""
+        if self._task is None or self._task.done():
+            self._stopped.clear()
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Stop after the run in progress, if any, completes"""
+        if self._task:
+            self._stopped.set()
+            try:
+                await self._task
+            finally:
+                self._task = None
+    
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._stopped.wait(), timeout=self.interval)
+                return
+            except asyncio.TimeoutError:
+                pass
+            
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"{self.name} failed: {e}")
+    
+    @abstractmethod
+    async def run_once(self):
+        """One run of the job"""
+        pass
@@ -0,0 +1,169 @@
+"""
+Batch Loader - Fetch related documents for many rows in one query
+"""
+from typing import Dict, Iterable, Optional, List, Callable, Awaitable, Hashable
+import asyncio
+
+# Startup fields shown next to roles, applications and connections
+STARTUP_SUMMARY_PROJECTION = {"_id": 0, "startup_id": 1, "name": 1, "logo_url": 1}
+
+
+async def load_by_ids(
+    collection,
+    key_field: str,
+    ids: Iterable[str],
+    projection: Optional[dict] = None
+) -> Dict[str, dict]:
+    """
+    Fetch the documents whose key_field is in ids with a single $in query.
+    Returns a dict keyed by key_field; ids with no document are simply absent.
+    """
+    keys = list(dict.fromkeys(i for i in ids if i is not None))
+    if not keys:
+        return {}
+    
+    if projection is None:
+        projection = {"_id": 0}
+    elif projection.get(key_field) is None and any(v for k, v in projection.items() if k != "_id"):
+        # Inclusion projections must keep the join key
+        projection = {**projection, key_field: 1}
+    
+    cursor = collection.find({key_field: {"$in": keys}}, projection)
+    return {doc[key_field]: doc async for doc in cursor}
+
+
+async def count_by(
+    collection,
+    key_field: str,
+    ids: Iterable[str],
+    match: Optional[dict] = None
+) -> Dict[str, int]:
+    """
+    Count documents per key_field value for many ids in one $match/$group
+    aggregation. Every requested id is present in the result, with 0 if
+    nothing matched.
+    """
+    keys = list(dict.fromkeys(i for i in ids if i is not None))
+    if not keys:
+        return {}
+    
+    pipeline = [
+        {"$match": {key_field: {"$in": keys}, **(match or {})}},
+        {"$group": {"_id": f"${key_field}", "count": {"$sum": 1}}}
+    ]
+    counts = dict.fromkeys(keys, 0)
+    async for row in collection.aggregate(pipeline):
+        counts[row["_id"]] = row["count"]
+    return counts
+
+
+async def load_startups(db, startup_ids: Iterable[str]) -> Dict[str, dict]:
+    """Fetch startup name/logo for many startups at once"""
+    return await load_by_ids(db.startups, "startup_id", startup_ids, STARTUP_SUMMARY_PROJECTION)
+
+
+async def attach_startups(db, docs: Iterable[dict]) -> list:
+    """Add startup_name and startup_logo to each document that has a startup_id"""
+    docs = list(docs)
+    startups = await load_startups(db, (doc.get("startup_id") for doc in docs))
+    
+    enriched = []
+    for doc in docs:
+        startup = startups.get(doc.get("startup_id"))
+        enriched.append({
+            **doc,
+            "startup_name": startup.get("name") if startup else None,
+            "startup_logo": startup.get("logo_url") if startup else None
+        })
+    return enriched
+
+
+# Related-document fields shown on list pages
+USER_SUMMARY_PROJECTION = {"_id": 0, "user_id": 1, "name": 1, "avatar_url": 1}
+ROLE_SUMMARY_PROJECTION = {"_id": 0, "role_id": 1, "title": 1, "startup_id": 1}
+
+
+class DataLoader:
+    """
+    Request-scoped batching loader.
+    Every load() issued before the event loop gets a chance to run the
+    dispatch callback is coalesced into a single batch_fn call, and each key
+    is fetched at most once for the lifetime of the loader.
+    """
+    
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Hashable]], Awaitable[Dict[Hashable, dict]]],
+        max_batch_size: int = 500
+    ):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self._cache: Dict[Hashable, asyncio.Future] = {}
+        self._queue: List[Hashable] = []
+        self._dispatch_scheduled = False
+    
+    def load(self, key: Hashable) -> asyncio.Future:
+        """Future resolving to the document for key (None if missing)"""
+        loop = asyncio.get_running_loop()
+        if key is None:
+            future = loop.create_future()
+            future.set_result(None)
+            return future
+        
+        future = self._cache.get(key)
+        if future is None:
+            future = loop.create_future()
+            self._cache[key] = future
+            self._queue.append(key)
+            if not self._dispatch_scheduled:
+                self._dispatch_scheduled = True
+                loop.call_soon(self._schedule_dispatch)
+        return future
+    
+    async def load_many(self, keys: Iterable[Hashable]) -> List[Optional[dict]]:
+        """Documents for keys, in order"""
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+    
+    def prime(self, key: Hashable, doc: Optional[dict]):
+        """Seed the cache with a document the caller already has"""
+        if key not in self._cache:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(doc)
+            self._cache[key] = future
+    
+    def _schedule_dispatch(self):
+        self._dispatch_scheduled = False
+        keys, self._queue = self._queue, []
+        for start in range(0, len(keys), self.max_batch_size):
+            asyncio.ensure_future(self._dispatch(keys[start:start + self.max_batch_size]))
+    
+    async def _dispatch(self, keys: List[Hashable]):
+        try:
+            found = await self.batch_fn(keys)
+        except Exception as e:
+            for key in keys:
+                # Failed keys are retried by the next load()
+                future = self._cache.pop(key)
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for key in keys:
+            future = self._cache[key]
+            if not future.done():
+                future.set_result(found.get(key))
+
+
+class EntityLoaders:
+    """DataLoaders for the documents list pages join against; create one per request"""
+    
+    def __init__(self, db):
+        self.users = DataLoader(
+            lambda ids: load_by_ids(db.users, "user_id", ids, USER_SUMMARY_PROJECTION)
+        )
+        self.startups = DataLoader(
+            lambda ids: load_by_ids(db.startups, "startup_id", ids, STARTUP_SUMMARY_PROJECTION)
+        )
+        self.roles = DataLoader(
+            lambda ids: load_by_ids(db.roles, "role_id", ids, ROLE_SUMMARY_PROJECTION)
+        )
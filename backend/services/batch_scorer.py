@@ -0,0 +1,231 @@
+"""
+Batch Scorer - Vectorized rule-based matching over many profiles at once
+"""
+from typing import List, Dict, Iterable, Tuple
+import numpy as np
+
+# Component weights for rule-based matching
+MATCH_WEIGHTS = {
+    "skills": 0.4,
+    "experience": 0.3,
+    "location": 0.15,
+    "work_preference": 0.15
+}
+
+# Years of experience expected for each role level (inclusive)
+EXPERIENCE_RANGES = {
+    "intern": (0, 1),
+    "junior": (0, 2),
+    "mid": (2, 5),
+    "senior": (5, 10),
+    "lead": (7, 15),
+    "principal": (10, 30)
+}
+DEFAULT_EXPERIENCE_RANGE = (0, 30)
+
+
+class TermVocabulary:
+    """Maps lowercased terms (skills, locations) to dense integer ids"""
+    
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+    
+    def encode(self, term_lists: List[Iterable[str]]) -> np.ndarray:
+        """Register terms and build a boolean (rows x vocabulary) membership matrix"""
+        ids = self.ids
+        lengths = [len(terms or ()) for terms in term_lists]
+        cols = [ids.setdefault(t.lower(), len(ids)) for terms in term_lists for t in terms or ()]
+        
+        matrix = np.zeros((len(term_lists), max(len(ids), 1)), dtype=bool)
+        rows = np.repeat(np.arange(len(term_lists)), lengths)
+        matrix[rows, np.asarray(cols, dtype=np.int64)] = True
+        return matrix
+    
+    def lookup(self, terms: Iterable[str]) -> List[int]:
+        """Return ids for known terms (case-insensitive), skipping unknown ones"""
+        lowered = set(t.lower() for t in terms or ())
+        return [self.ids[t] for t in lowered if t in self.ids]
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def _experience_component(exp: np.ndarray, min_exp: np.ndarray, max_exp: np.ndarray) -> np.ndarray:
+    """Experience score: full in range, partial when close, 80% when over-qualified"""
+    weight = MATCH_WEIGHTS["experience"]
+    under = np.maximum(0, weight * (1 - (min_exp - exp) / 3))
+    return np.where(
+        (exp >= min_exp) & (exp <= max_exp),
+        weight,
+        np.where(exp < min_exp, under, weight * 0.8)
+    )
+
+
+def _work_preference_component(prefs: np.ndarray, remote: np.ndarray) -> np.ndarray:
+    """Work preference score for encoded preferences against remote flags"""
+    weight = MATCH_WEIGHTS["work_preference"]
+    return np.select(
+        [
+            prefs == "any",
+            (prefs == "remote") & remote,
+            (prefs == "onsite") & ~remote,
+            prefs == "hybrid"
+        ],
+        [weight, weight, weight, weight * 0.8],
+        default=weight * 0.3
+    )
+
+
+def _finalize(score: np.ndarray) -> np.ndarray:
+    """Clamp to [0, 1] and round to 2 decimals exactly like round(x, 2)"""
+    score = np.clip(score, 0.0, 1.0)
+    rounded = np.round(score, 2)
+    # np.round scales by 100 first, which can tip values sitting right on a
+    # half-cent boundary the other way; defer those few to Python's round
+    scaled = score * 100
+    ties = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    for i in ties:
+        rounded[i] = round(float(score[i]), 2)
+    return rounded
+
+
+class EngineerBatch:
+    """
+    Precomputed feature matrices for a set of engineer profiles.
+    Score all of them against a role in a single pass with score_role().
+    """
+    
+    def __init__(self, engineers: List[dict]):
+        self.engineers = engineers
+        self.skills = TermVocabulary()
+        self.locations = TermVocabulary()
+        
+        self.skill_matrix = self.skills.encode([e.get("skills", []) for e in engineers])
+        self.location_matrix = self.locations.encode(
+            [e.get("preferred_locations", []) for e in engineers]
+        )
+        self.has_locations = self.location_matrix.any(axis=1)
+        self.experience = np.array(
+            [e.get("experience_years") or 0 for e in engineers], dtype=float
+        )
+        self.work_preference = np.array(
+            [e.get("work_preference", "any") for e in engineers], dtype=object
+        )
+    
+    def __len__(self) -> int:
+        return len(self.engineers)
+    
+    def score_role(self, role: dict) -> np.ndarray:
+        """Return rule-based match scores of every engineer for one role"""
+        n = len(self.engineers)
+        if n == 0:
+            return np.zeros(0)
+        
+        # Skills matching (40%)
+        required = set(s.lower() for s in role.get("skills_required", []))
+        if required:
+            known = self.skills.lookup(required)
+            overlap = self.skill_matrix[:, known].sum(axis=1)
+            score = overlap / len(required) * MATCH_WEIGHTS["skills"]
+        else:
+            score = np.full(n, MATCH_WEIGHTS["skills"])
+        
+        # Experience matching (30%)
+        min_exp, max_exp = EXPERIENCE_RANGES.get(
+            role.get("experience_level", "mid"), DEFAULT_EXPERIENCE_RANGE
+        )
+        score = score + _experience_component(self.experience, min_exp, max_exp)
+        
+        # Location matching (15%)
+        remote = bool(role.get("remote_allowed", True))
+        if remote:
+            score = score + MATCH_WEIGHTS["location"]
+        else:
+            location_ids = self.locations.lookup([role.get("location", "").lower()])
+            matches = ~self.has_locations
+            if location_ids:
+                matches = matches | self.location_matrix[:, location_ids[0]]
+            score = score + np.where(
+                matches, MATCH_WEIGHTS["location"], MATCH_WEIGHTS["location"] * 0.3
+            )
+        
+        # Work preference matching (15%)
+        score = score + _work_preference_component(
+            self.work_preference, np.full(n, remote)
+        )
+        
+        return _finalize(score)
+
+
+class RoleBatch:
+    """
+    Precomputed feature matrices for a set of roles.
+    Score all of them against an engineer in a single pass with score_engineer().
+    """
+    
+    def __init__(self, roles: List[dict]):
+        self.roles = roles
+        self.skills = TermVocabulary()
+        
+        self.skill_matrix = self.skills.encode([r.get("skills_required", []) for r in roles])
+        self.required_counts = self.skill_matrix.sum(axis=1).astype(float)
+        
+        ranges = [
+            EXPERIENCE_RANGES.get(r.get("experience_level", "mid"), DEFAULT_EXPERIENCE_RANGE)
+            for r in roles
+        ]
+        self.min_experience = np.array([lo for lo, _ in ranges], dtype=float)
+        self.max_experience = np.array([hi for _, hi in ranges], dtype=float)
+        self.remote = np.array([bool(r.get("remote_allowed", True)) for r in roles], dtype=bool)
+        self.location = np.array([r.get("location", "").lower() for r in roles], dtype=object)
+    
+    def __len__(self) -> int:
+        return len(self.roles)
+    
+    def score_engineer(self, engineer: dict) -> np.ndarray:
+        """Return rule-based match scores of every role for one engineer"""
+        n = len(self.roles)
+        if n == 0:
+            return np.zeros(0)
+        
+        # Skills matching (40%)
+        engineer_skills = np.zeros(self.skill_matrix.shape[1], dtype=bool)
+        engineer_skills[self.skills.lookup(engineer.get("skills", []))] = True
+        overlap = self.skill_matrix @ engineer_skills.astype(float)
+        score = np.where(
+            self.required_counts > 0,
+            overlap / np.maximum(self.required_counts, 1) * MATCH_WEIGHTS["skills"],
+            MATCH_WEIGHTS["skills"]
+        )
+        
+        # Experience matching (30%)
+        exp = float(engineer.get("experience_years") or 0)
+        score = score + _experience_component(
+            np.full(n, exp), self.min_experience, self.max_experience
+        )
+        
+        # Location matching (15%)
+        engineer_locations = set(loc.lower() for loc in engineer.get("preferred_locations", []))
+        if engineer_locations:
+            location_ok = self.remote | np.isin(self.location, list(engineer_locations))
+        else:
+            location_ok = np.ones(n, dtype=bool)
+        score = score + np.where(
+            location_ok, MATCH_WEIGHTS["location"], MATCH_WEIGHTS["location"] * 0.3
+        )
+        
+        # Work preference matching (15%)
+        prefs = np.full(n, engineer.get("work_preference", "any"), dtype=object)
+        score = score + _work_preference_component(prefs, self.remote)
+        
+        return _finalize(score)
+
+
+def rank_scores(scores: np.ndarray, threshold: float, limit: int) -> List[Tuple[int, float]]:
+    """Return (index, score) pairs above threshold, best first, capped at limit"""
+    eligible = np.flatnonzero(scores >= threshold)
+    # Ties keep their input order, matching a stable sort on the original list
+    order = eligible[np.lexsort((eligible, -scores[eligible]))]
+    if limit is not None:
+        order = order[:limit]
+    return [(int(i), float(scores[i])) for i in order]
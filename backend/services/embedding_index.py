@@ -0,0 +1,206 @@
+"""
+Embedding Index - In-memory vector search for semantic candidate-role matching
+"""
+from typing import List, Dict, Optional, Tuple, Iterable
+import hashlib
+import os
+
+import numpy as np
+
+# Above this many vectors, searches probe a few IVF clusters instead of every row
+VECTOR_IVF_THRESHOLD = int(os.environ.get("VECTOR_IVF_THRESHOLD", "50000"))
+VECTOR_IVF_PROBES = int(os.environ.get("VECTOR_IVF_PROBES", "8"))
+
+
+def engineer_embedding_text(profile: dict) -> str:
+    """Text used to embed an engineer profile"""
+    parts = [
+        profile.get("headline") or "",
+        profile.get("bio") or "",
+        "Skills: " + ", ".join(profile.get("skills") or []),
+    ]
+    for exp in profile.get("experience") or []:
+        parts.append(" ".join(
+            str(exp.get(field) or "") for field in ("title", "company", "description")
+        ))
+    return "\n".join(p for p in parts if p.strip())
+
+
+def role_embedding_text(role: dict) -> str:
+    """Text used to embed a role"""
+    parts = [
+        role.get("title") or "",
+        role.get("description") or "",
+        "Skills: " + ", ".join(role.get("skills_required") or []),
+        "Requirements: " + "; ".join(role.get("requirements") or []),
+        "Nice to have: " + "; ".join(role.get("nice_to_have") or []),
+    ]
+    return "\n".join(p for p in parts if p.strip())
+
+
+def text_hash(text: str) -> str:
+    """Content hash used to detect when a document needs re-embedding"""
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+def embedder_name(embedder) -> str:
+    """Identify the model behind an embedder so stored vectors are never mixed"""
+    model = getattr(embedder, "embedding_model", None)
+    if model is None:
+        model = getattr(getattr(embedder, "provider", None), "embedding_model", None)
+    return model or type(embedder).__name__
+
+
+class VectorIndex:
+    """
+    Cosine-similarity index over L2-normalized rows of a NumPy matrix.
+    A query is a single matrix-vector multiply; once the index grows past
+    ivf_threshold, build_ivf() clusters the rows and searches only the
+    n_probe closest clusters.
+    """
+    
+    def __init__(self, ivf_threshold: int = VECTOR_IVF_THRESHOLD, n_probe: int = VECTOR_IVF_PROBES):
+        self.ivf_threshold = ivf_threshold
+        self.n_probe = n_probe
+        self.ids: List[str] = []
+        self.positions: Dict[str, int] = {}
+        self._matrix: Optional[np.ndarray] = None
+        self.centroids: Optional[np.ndarray] = None
+        self._lists: Optional[np.ndarray] = None
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.positions
+    
+    @property
+    def matrix(self) -> np.ndarray:
+        """Active rows of the index"""
+        if self._matrix is None:
+            return np.zeros((0, 0), dtype=np.float32)
+        return self._matrix[:len(self.ids)]
+    
+    @staticmethod
+    def _normalize(vectors) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors[None, :]
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+    
+    def _grow(self, needed: int, dim: int):
+        if self._matrix is None:
+            self._matrix = np.zeros((max(needed, 64), dim), dtype=np.float32)
+            self._lists = np.zeros(self._matrix.shape[0], dtype=np.int32)
+        elif needed > self._matrix.shape[0]:
+            capacity = max(needed, self._matrix.shape[0] * 2)
+            matrix = np.zeros((capacity, dim), dtype=np.float32)
+            matrix[:len(self.ids)] = self.matrix
+            lists = np.zeros(capacity, dtype=np.int32)
+            lists[:len(self.ids)] = self._lists[:len(self.ids)]
+            self._matrix, self._lists = matrix, lists
+    
+    def upsert(self, ids: List[str], vectors) -> None:
+        """Insert or replace vectors"""
+        if not ids:
+            return
+        rows = self._normalize(vectors)
+        if self._matrix is not None and rows.shape[1] != self._matrix.shape[1]:
+            raise ValueError(
+                f"Vector dimension {rows.shape[1]} does not match index dimension {self._matrix.shape[1]}"
+            )
+        
+        new_ids = [doc_id for doc_id in dict.fromkeys(ids) if doc_id not in self.positions]
+        self._grow(len(self.ids) + len(new_ids), rows.shape[1])
+        for doc_id in new_ids:
+            self.positions[doc_id] = len(self.ids)
+            self.ids.append(doc_id)
+        
+        positions = np.array([self.positions[doc_id] for doc_id in ids])
+        self._matrix[positions] = rows
+        if self.centroids is not None:
+            self._lists[positions] = np.argmax(rows @ self.centroids.T, axis=1)
+    
+    def remove(self, doc_ids: Iterable[str]) -> None:
+        """Remove vectors, moving the last row into each freed slot"""
+        for doc_id in doc_ids:
+            position = self.positions.pop(doc_id, None)
+            if position is None:
+                continue
+            last = len(self.ids) - 1
+            if position != last:
+                moved = self.ids[last]
+                self._matrix[position] = self._matrix[last]
+                self._lists[position] = self._lists[last]
+                self.ids[position] = moved
+                self.positions[moved] = position
+            self.ids.pop()
+    
+    def get(self, doc_id: str) -> Optional[np.ndarray]:
+        """Get the stored (normalized) vector for a document"""
+        position = self.positions.get(doc_id)
+        return None if position is None else self._matrix[position]
+    
+    def build_ivf(self, n_lists: Optional[int] = None, iterations: int = 10) -> None:
+        """Cluster rows with spherical k-means so searches can skip most of the index"""
+        data = self.matrix
+        n = len(data)
+        if n < self.ivf_threshold:
+            self.centroids = None
+            return
+        
+        n_lists = n_lists or int(np.sqrt(n))
+        rng = np.random.default_rng(0)
+        sample = data[rng.choice(n, size=min(n, n_lists * 64), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)]
+        
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(n_lists):
+                members = sample[assignment == c]
+                if len(members):
+                    centroids[c] = members.mean(axis=0)
+            centroids = self._normalize(centroids)
+        
+        self.centroids = centroids
+        for start in range(0, n, 10000):
+            chunk = data[start:start + 10000]
+            self._lists[start:start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+    
+    def search(self, query, k: int = 20) -> List[Tuple[str, float]]:
+        """Return the k most similar (id, cosine similarity) pairs"""
+        if not self.ids or k <= 0:
+            return []
+        q = self._normalize(query)[0]
+        
+        if self.centroids is not None:
+            probes = np.argsort(-(self.centroids @ q))[:self.n_probe]
+            rows = np.flatnonzero(np.isin(self._lists[:len(self.ids)], probes))
+            scores = self.matrix[rows] @ q
+        else:
+            rows = None
+            scores = self.matrix @ q
+        
+        k = min(k, len(scores))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        
+        positions = top if rows is None else rows[top]
+        return [(self.ids[p], float(scores[t])) for p, t in zip(positions, top)]
+
+
+class SemanticIndex:
+    """Vector indexes for engineer profiles and active roles"""
+    
+    def __init__(self):
+        self.engineers = VectorIndex()
+        self.roles = VectorIndex()
+        self.model: Optional[str] = None
+        self.loaded = False
+
+
+# Shared by every MatchingService in this process
+shared_semantic_index = SemanticIndex()
@@ -0,0 +1,53 @@
+"""
+Embedding Pipeline - Background, write-driven refresh of match embeddings
+"""
+from typing import List
+import logging
+import os
+
+from .background import CoalescingWorker
+from .matching_service import MatchingService, MATCH_EMBEDDING_BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for more writes before refreshing a partial batch
+EMBEDDING_FLUSH_INTERVAL = float(os.environ.get("EMBEDDING_FLUSH_INTERVAL", "5"))
+
+
+class EmbeddingPipeline(CoalescingWorker):
+    """
+    Collects profile and role writes and refreshes their embeddings in the
+    background. Repeated writes to the same document before a flush are
+    coalesced, texts are embedded batch_size at a time, and documents whose
+    content hash is unchanged are never re-embedded.
+    """
+    
+    kinds = ("engineer", "role")
+    name = "Embedding refresh"
+    
+    def __init__(
+        self,
+        matching_service: MatchingService,
+        batch_size: int = MATCH_EMBEDDING_BATCH_SIZE,
+        flush_interval: float = EMBEDDING_FLUSH_INTERVAL
+    ):
+        super().__init__(batch_size, flush_interval)
+        self.matching = matching_service
+    
+    def schedule_engineer(self, user_id: str):
+        """Queue an engineer profile for re-embedding"""
+        self.schedule("engineer", user_id)
+    
+    def schedule_role(self, role_id: str):
+        """Queue a role for re-embedding"""
+        self.schedule("role", role_id)
+    
+    async def process(self, kind: str, ids: List[str]) -> int:
+        if kind == "engineer":
+            embedded = await self.matching.refresh_engineer_embeddings(ids)
+        else:
+            embedded = await self.matching.refresh_role_embeddings(ids)
+        
+        if embedded:
+            logger.info(f"Re-embedded {embedded} {kind} documents")
+        return embedded
@@ -0,0 +1,203 @@
+"""
+Indexes - Declarative index registry applied at startup
+"""
+from typing import Dict, List, Set
+import logging
+
+from pymongo import IndexModel, ASCENDING, DESCENDING
+
+from .notification_archive import NOTIFICATION_READ_TTL_DAYS
+
+logger = logging.getLogger(__name__)
+
+
+def _index(keys, **options) -> IndexModel:
+    """IndexModel from [(field, direction)] with a readable default name"""
+    if isinstance(keys, str):
+        keys = [(keys, ASCENDING)]
+    options.setdefault("name", "_".join(f"{field}_{direction}" for field, direction in keys))
+    return IndexModel(keys, **options)
+
+
+# Every index the application relies on, per collection. Filter fields come
+# first, then the list sort field and its id tie-breaker (see pagination.py),
+# so list queries are an index seek plus an in-order scan instead of a
+# collection scan and in-memory sort.
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        _index("user_id", unique=True),
+        _index("email", unique=True),
+    ],
+    "user_sessions": [
+        _index("session_token", unique=True),
+        _index("user_id"),
+        # Expired sessions are removed by MongoDB; expires_at must be a BSON date
+        _index("expires_at", expireAfterSeconds=0),
+    ],
+    "engineer_profiles": [
+        _index("user_id", unique=True),
+        _index("profile_id", unique=True),
+        _index("skills"),
+        _index([("availability", ASCENDING), ("updated_at", DESCENDING), ("user_id", DESCENDING)]),
+        _index([("updated_at", DESCENDING), ("user_id", DESCENDING)]),
+    ],
+    "profiles": [
+        _index("user_id", unique=True),
+    ],
+    "founder_profiles": [
+        _index("user_id", unique=True),
+    ],
+    "startups": [
+        _index("startup_id", unique=True),
+        _index("founder_id"),
+        _index([("created_at", DESCENDING), ("startup_id", DESCENDING)]),
+        _index([("industry", ASCENDING), ("created_at", DESCENDING), ("startup_id", DESCENDING)]),
+    ],
+    "roles": [
+        _index("role_id", unique=True),
+        _index([("status", ASCENDING), ("created_at", DESCENDING), ("role_id", DESCENDING)]),
+        _index([("startup_id", ASCENDING), ("created_at", DESCENDING), ("role_id", DESCENDING)]),
+        _index([("startup_id", ASCENDING), ("status", ASCENDING)]),
+        _index("skills_required"),
+    ],
+    "applications": [
+        _index("application_id", unique=True),
+        _index([("role_id", ASCENDING), ("applied_at", DESCENDING), ("application_id", DESCENDING)]),
+        _index([("engineer_id", ASCENDING), ("applied_at", DESCENDING), ("application_id", DESCENDING)]),
+        _index([("role_id", ASCENDING), ("engineer_id", ASCENDING)], unique=True),
+    ],
+    "connections": [
+        _index("connection_id", unique=True),
+        _index([("founder_id", ASCENDING), ("updated_at", DESCENDING), ("connection_id", DESCENDING)]),
+        _index([("engineer_id", ASCENDING), ("updated_at", DESCENDING), ("connection_id", DESCENDING)]),
+        _index([("founder_id", ASCENDING), ("engineer_id", ASCENDING)]),
+    ],
+    "messages": [
+        _index("message_id", unique=True),
+        _index([("connection_id", ASCENDING), ("sent_at", DESCENDING), ("message_id", DESCENDING)]),
+    ],
+    "notifications": [
+        _index("notification_id", unique=True),
+        _index([("user_id", ASCENDING), ("created_at", DESCENDING)]),
+        _index([("user_id", ASCENDING), ("read", ASCENDING)]),
+        # At most one unread notification per coalesce key (see NotificationService)
+        _index(
+            [("user_id", ASCENDING), ("coalesce_key", ASCENDING)],
+            unique=True,
+            partialFilterExpression={"read": False, "coalesce_key": {"$exists": True}}
+        ),
+        _index([("read", ASCENDING), ("created_at", ASCENDING)]),
+        _index("created_at"),
+        # Read notifications expire; unread ones are only ever archived
+        _index(
+            "read_at",
+            expireAfterSeconds=NOTIFICATION_READ_TTL_DAYS * 86400,
+            partialFilterExpression={"read": True}
+        ),
+    ],
+    "notifications_archive": [
+        _index("notification_id", unique=True),
+        _index([("user_id", ASCENDING), ("created_at", DESCENDING)]),
+    ],
+    "notification_digests": [
+        _index("digest_id", unique=True),
+        _index([("user_id", ASCENDING), ("created_at", DESCENDING)]),
+    ],
+    "resumes": [
+        _index("resume_id", unique=True),
+        _index("user_id"),
+    ],
+    "match_scores": [
+        _index("key", unique=True),
+        _index("engineer_id"),
+        _index("role_id"),
+    ],
+    "match_embeddings": [
+        _index([("kind", ASCENDING), ("ref_id", ASCENDING)], unique=True),
+    ],
+    "role_matches": [
+        _index("role_id", unique=True),
+        _index("candidates.user_id"),
+        _index([("stale", ASCENDING), ("computed_at", ASCENDING)]),
+    ],
+}
+
+# Index names confirmed present by the last ensure_indexes run, per collection
+available_indexes: Dict[str, Set[str]] = {}
+
+# Options that make two indexes on the same keys behave differently
+_INDEX_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
+
+
+def _key_of(keys) -> tuple:
+    """Comparable form of an index key ({field: dir} or [(field, dir)])"""
+    pairs = keys.items() if hasattr(keys, "items") else keys
+    return tuple(
+        (field, int(direction) if isinstance(direction, (int, float)) else direction)
+        for field, direction in pairs
+    )
+
+
+async def ensure_indexes(db, drop_extra: bool = False) -> Dict[str, Dict[str, list]]:
+    """
+    Create any registered index that does not exist yet.
+    Existing indexes are matched by key, so re-running is a no-op. Returns a
+    report per collection of indexes created, indexes present but not
+    registered ("extra"), registered keys whose existing index has different
+    options ("mismatched"), and indexes that failed to build.
+    """
+    report: Dict[str, Dict[str, list]] = {}
+    
+    for collection_name, models in INDEXES.items():
+        collection = db[collection_name]
+        existing = await collection.index_information()
+        by_key = {_key_of(info["key"]): (name, info) for name, info in existing.items()}
+        
+        entry = {"created": [], "extra": [], "mismatched": [], "failed": []}
+        wanted = set()
+        available = available_indexes.setdefault(collection_name, set())
+        available.clear()
+        
+        for model in models:
+            spec = model.document
+            key = _key_of(spec["key"])
+            wanted.add(key)
+            
+            if key in by_key:
+                name, info = by_key[key]
+                if any(info.get(opt) != spec.get(opt) for opt in _INDEX_OPTIONS):
+                    entry["mismatched"].append(name)
+                available.add(name)
+                continue
+            
+            try:
+                await collection.create_indexes([model])
+                entry["created"].append(spec["name"])
+                available.add(spec["name"])
+            except Exception as e:
+                logger.error(f"Failed to create index {collection_name}.{spec['name']}: {e}")
+                entry["failed"].append(spec["name"])
+        
+        for key, (name, _) in by_key.items():
+            if name == "_id_" or key in wanted:
+                continue
+            if drop_extra:
+                await collection.drop_index(name)
+            entry["extra"].append(name)
+        
+        entry = {k: v for k, v in entry.items() if v}
+        if entry:
+            report[collection_name] = entry
+    
+    return report
+
+
+def log_index_report(report: Dict[str, Dict[str, list]]):
+    """Log the outcome of ensure_indexes"""
+    if not report:
+        logger.info("All indexes present")
+        return
+    for collection_name, entry in report.items():
+        for status, names in entry.items():
+            log = logger.info if status == "created" else logger.warning
+            log(f"Indexes {status} on {collection_name}: {', '.join(names)}")
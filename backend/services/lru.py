@@ -0,0 +1,69 @@
+"""
+LRU - Small in-process LRU map with optional expiry
+"""
+from typing import Any, Callable, Hashable, List, Optional
+from collections import OrderedDict
+import time
+
+
+class LRUCache:
+    """
+    In-process map of at most max_size entries; setting a new key evicts the
+    least recently used one. With a ttl, entries also expire ttl seconds
+    after they were set.
+    """
+    
+    def __init__(self, max_size: int, ttl: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        # key -> (value, expires at or None)
+        self._data: OrderedDict = OrderedDict()
+    
+    def _live(self, key: Hashable):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= time.monotonic():
+            del self._data[key]
+            return None
+        return entry
+    
+    def get(self, key: Hashable) -> Any:
+        """Value for key, or None when missing or expired"""
+        entry = self._live(key)
+        if entry is None:
+            return None
+        self._data.move_to_end(key)
+        return entry[0]
+    
+    def set(self, key: Hashable, value: Any):
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        self._data[key] = (value, expires)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+    
+    def replace(self, key: Hashable, value: Any) -> bool:
+        """Change the value of a live entry without extending its expiry"""
+        entry = self._live(key)
+        if entry is None:
+            return False
+        self._data[key] = (value, entry[1])
+        return True
+    
+    def pop(self, key: Hashable):
+        self._data.pop(key, None)
+    
+    def keys(self) -> List[Hashable]:
+        """Keys of the live entries, least recently used first"""
+        return [key for key in list(self._data) if self._live(key) is not None]
+    
+    def discard_where(self, predicate: Callable[[Any], bool]):
+        for key in [k for k, (value, _) in self._data.items() if predicate(value)]:
+            del self._data[key]
+    
+    def clear(self):
+        self._data.clear()
+    
+    def __len__(self) -> int:
+        return len(self._data)
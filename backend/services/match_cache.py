@@ -0,0 +1,132 @@
+"""
+Match Cache - Persistent AI match-score cache keyed by profile/role content hash
+"""
+from typing import List, Dict, Optional, Tuple, Iterable
+from datetime import datetime, timezone
+import hashlib
+import json
+import logging
+import os
+
+from pymongo import UpdateOne
+
+from .lru import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Fields that influence a match score; changing anything else keeps cached scores valid
+ENGINEER_SCORING_FIELDS = (
+    "skills", "experience_years", "headline", "work_preference", "preferred_locations"
+)
+ROLE_SCORING_FIELDS = (
+    "title", "skills_required", "experience_level", "remote_allowed", "location", "description"
+)
+
+MATCH_CACHE_LRU_SIZE = int(os.environ.get("MATCH_CACHE_LRU_SIZE", "10000"))
+
+
+def content_hash(doc: dict, fields: Iterable[str]) -> str:
+    """Stable hash of the given fields of a document"""
+    payload = json.dumps({f: doc.get(f) for f in fields}, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+def scoring_fields_changed(before: dict, update: dict, fields: Iterable[str]) -> bool:
+    """Check whether an update touches any scoring-relevant field"""
+    return any(f in update and update[f] != before.get(f) for f in fields)
+
+
+# Shared by every MatchScoreCache in this process
+_shared_lru = LRUCache(MATCH_CACHE_LRU_SIZE)
+
+
+class MatchScoreCache:
+    """
+    Two-level cache of AI match scores: an in-process LRU in front of the
+    match_scores collection. Keys are content hashes, so an edited profile or
+    role simply stops matching its old entries.
+    """
+    
+    def __init__(self, db, lru: Optional[LRUCache] = None):
+        self.db = db
+        self.lru = lru if lru is not None else _shared_lru
+    
+    @staticmethod
+    def cache_key(engineer: dict, role: dict) -> str:
+        """Cache key for an engineer/role pair"""
+        return (
+            f"{content_hash(engineer, ENGINEER_SCORING_FIELDS)}:"
+            f"{content_hash(role, ROLE_SCORING_FIELDS)}"
+        )
+    
+    async def get(self, engineer: dict, role: dict) -> Optional[float]:
+        """Get a cached score for one pair"""
+        return (await self.get_many([(engineer, role)]))[0]
+    
+    async def get_many(self, pairs: List[Tuple[dict, dict]]) -> List[Optional[float]]:
+        """Get cached scores for many pairs with at most one database query"""
+        keys = [self.cache_key(engineer, role) for engineer, role in pairs]
+        found: Dict[str, float] = {}
+        
+        missing = []
+        for key in keys:
+            entry = self.lru.get(key)
+            if entry is not None:
+                found[key] = entry["score"]
+            else:
+                missing.append(key)
+        
+        if missing:
+            cursor = self.db.match_scores.find(
+                {"key": {"$in": list(set(missing))}},
+                {"_id": 0, "key": 1, "engineer_id": 1, "role_id": 1, "score": 1}
+            )
+            async for doc in cursor:
+                self.lru.set(doc["key"], doc)
+                found[doc["key"]] = doc["score"]
+        
+        return [found.get(key) for key in keys]
+    
+    async def set(self, engineer: dict, role: dict, score: float):
+        """Store a score for one pair"""
+        await self.set_many([(engineer, role, score)])
+    
+    async def set_many(self, entries: List[Tuple[dict, dict, float]]):
+        """Store scores for many pairs in one bulk write"""
+        if not entries:
+            return
+        
+        now = datetime.now(timezone.utc).isoformat()
+        operations = []
+        for engineer, role, score in entries:
+            key = self.cache_key(engineer, role)
+            entry = {
+                "key": key,
+                "engineer_id": engineer.get("user_id"),
+                "role_id": role.get("role_id"),
+                "score": score
+            }
+            self.lru.set(key, entry)
+            operations.append(UpdateOne(
+                {"key": key},
+                {"$set": {**entry, "created_at": now}},
+                upsert=True
+            ))
+        
+        try:
+            await self.db.match_scores.bulk_write(operations, ordered=False)
+        except Exception as e:
+            # A cache write failure must never fail the match itself
+            logger.error(f"Failed to persist match scores: {e}")
+    
+    async def invalidate_engineer(self, engineer_id: str) -> int:
+        """Drop all cached scores for an engineer"""
+        self.lru.discard_where(lambda entry: entry.get("engineer_id") == engineer_id)
+        result = await self.db.match_scores.delete_many({"engineer_id": engineer_id})
+        return result.deleted_count
+    
+    async def invalidate_role(self, role_id: str) -> int:
+        """Drop all cached scores for a role"""
+        self.lru.discard_where(lambda entry: entry.get("role_id") == role_id)
+        result = await self.db.match_scores.delete_many({"role_id": role_id})
+        return result.deleted_count
@@ -1,21 +1,68 @@
 """
 Matching Service - AI-powered candidate-role matching
 """
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple, Callable
+import asyncio
 import logging
+import os
 from datetime import datetime, timezone
 
-from llm import LLMService
+from pymongo import UpdateOne
+
+from llm import LLMService, HashingEmbedder
+from .batch_scorer import (
+    EngineerBatch, RoleBatch, MATCH_WEIGHTS, EXPERIENCE_RANGES,
+    DEFAULT_EXPERIENCE_RANGE, rank_scores
+)
+from .match_cache import MatchScoreCache
+from .batch_loader import attach_startups
+from .embedding_index import (
+    SemanticIndex, VectorIndex, shared_semantic_index, engineer_embedding_text,
+    role_embedding_text, text_hash, embedder_name
+)
 
 logger = logging.getLogger(__name__)
 
+MIN_MATCH_SCORE = 0.3
+
+# AI scoring pipeline configuration
+MATCH_AI_CONCURRENCY = int(os.environ.get("MATCH_AI_CONCURRENCY", "8"))
+MATCH_AI_TIMEOUT = float(os.environ.get("MATCH_AI_TIMEOUT", "10"))
+MATCH_CURSOR_BATCH_SIZE = int(os.environ.get("MATCH_CURSOR_BATCH_SIZE", "200"))
+# Two-stage matching: only the rule-based top (factor x limit) are sent to the LLM.
+# Set to 0 to AI-score every candidate.
+MATCH_RERANK_FACTOR = int(os.environ.get("MATCH_RERANK_FACTOR", "3"))
+# Texts sent per embeddings API call
+MATCH_EMBEDDING_BATCH_SIZE = int(os.environ.get("MATCH_EMBEDDING_BATCH_SIZE", "100"))
+
 
 class MatchingService:
     """Service for AI-powered matching between candidates and roles"""
     
-    def __init__(self, db, llm_service: Optional[LLMService] = None):
+    def __init__(
+        self,
+        db,
+        llm_service: Optional[LLMService] = None,
+        ai_concurrency: int = MATCH_AI_CONCURRENCY,
+        ai_timeout: float = MATCH_AI_TIMEOUT,
+        rerank_factor: int = MATCH_RERANK_FACTOR,
+        match_cache: Optional[MatchScoreCache] = None,
+        embedder=None,
+        semantic_index: Optional[SemanticIndex] = None
+    ):
         self.db = db
         self.llm = llm_service
+        self.ai_concurrency = max(1, ai_concurrency)
+        self.ai_timeout = ai_timeout
+        self.rerank_factor = max(0, rerank_factor)
+        self.cache = match_cache if match_cache is not None else MatchScoreCache(db)
+        
+        # Anything with an async embeddings(texts) method; the local hashing
+        # embedder keeps semantic matching usable without an embeddings API
+        if embedder is None:
+            embedder = llm_service if llm_service and llm_service.supports_embeddings else HashingEmbedder()
+        self.embedder = embedder
+        self.semantic_index = semantic_index if semantic_index is not None else shared_semantic_index
     
     async def calculate_match_score(
         self,
@@ -28,6 +75,9 @@ class MatchingService:
         """
         # If LLM is available, use AI-powered matching
         if self.llm:
+            cached = await self.cache.get(engineer_profile, role)
+            if cached is not None:
+                return cached
             return await self._ai_match_score(engineer_profile, role)
         
         # Fallback to rule-based matching
@@ -36,12 +86,7 @@ class MatchingService:
     def _rule_based_match_score(self, engineer: dict, role: dict) -> float:
         """Rule-based matching algorithm"""
         score = 0.0
-        weights = {
-            "skills": 0.4,
-            "experience": 0.3,
-            "location": 0.15,
-            "work_preference": 0.15
-        }
+        weights = MATCH_WEIGHTS
         
         # Skills matching (40%)
         engineer_skills = set(s.lower() for s in engineer.get("skills", []))
@@ -57,16 +102,7 @@ class MatchingService:
         engineer_exp = engineer.get("experience_years", 0)
         role_level = role.get("experience_level", "mid")
         
-        exp_ranges = {
-            "intern": (0, 1),
-            "junior": (0, 2),
-            "mid": (2, 5),
-            "senior": (5, 10),
-            "lead": (7, 15),
-            "principal": (10, 30)
-        }
-        
-        min_exp, max_exp = exp_ranges.get(role_level, (0, 30))
+        min_exp, max_exp = EXPERIENCE_RANGES.get(role_level, DEFAULT_EXPERIENCE_RANGE)
         if min_exp <= engineer_exp <= max_exp:
             score += weights["experience"]
         elif engineer_exp < min_exp:
@@ -130,17 +166,132 @@ class MatchingService:
         try:
             response = await self.llm.generate(prompt, max_tokens=10)
             score = float(response.strip())
-            return round(min(1.0, max(0.0, score)), 2)
+            score = round(min(1.0, max(0.0, score)), 2)
         except Exception as e:
             logger.error(f"AI matching failed: {e}")
             return self._rule_based_match_score(engineer, role)
+        
+        # Only genuine LLM scores are cached; rule-based fallbacks are retried next time
+        await self.cache.set(engineer, role, score)
+        return score
+    
+    async def _bounded_ai_score(
+        self,
+        semaphore: asyncio.Semaphore,
+        engineer: dict,
+        role: dict
+    ) -> float:
+        """AI score one pair within the worker pool, falling back to rules on timeout"""
+        async with semaphore:
+            try:
+                return await asyncio.wait_for(
+                    self._ai_match_score(engineer, role),
+                    timeout=self.ai_timeout
+                )
+            except asyncio.TimeoutError:
+                logger.warning(
+                    f"AI matching timed out after {self.ai_timeout}s for "
+                    f"{engineer.get('user_id')} / {role.get('role_id')}"
+                )
+                return self._rule_based_match_score(engineer, role)
+    
+    async def _dispatch_ai_scores(
+        self,
+        semaphore: asyncio.Semaphore,
+        pairs: List[Tuple[dict, dict]]
+    ) -> List[asyncio.Future]:
+        """
+        Start AI scoring for a batch of pairs.
+        Cached scores resolve immediately; only cache misses reach the LLM.
+        """
+        cached = await self.cache.get_many(pairs)
+        loop = asyncio.get_running_loop()
+        
+        futures = []
+        for (engineer, role), score in zip(pairs, cached):
+            if score is None:
+                future = asyncio.ensure_future(self._bounded_ai_score(semaphore, engineer, role))
+            else:
+                future = loop.create_future()
+                future.set_result(score)
+            futures.append(future)
+        return futures
+    
+    async def ai_score_pairs(self, pairs: List[Tuple[dict, dict]]) -> List[float]:
+        """
+        AI scores of (engineer, role) pairs, in order, with at most
+        ai_concurrency LLM calls in flight. Cached scores skip the LLM.
+        """
+        semaphore = asyncio.Semaphore(self.ai_concurrency)
+        return list(await asyncio.gather(*await self._dispatch_ai_scores(semaphore, pairs)))
+    
+    async def _ai_score_stream(
+        self,
+        cursor,
+        pair_for: Callable[[dict], Tuple[dict, dict]]
+    ) -> List[Tuple[dict, float]]:
+        """
+        Score every cursor document with the LLM.
+        Documents are dispatched batch by batch as the cursor yields them, with
+        at most ai_concurrency calls in flight; results keep cursor order.
+        """
+        semaphore = asyncio.Semaphore(self.ai_concurrency)
+        
+        docs = []
+        futures = []
+        batch = []
+        async for doc in cursor.batch_size(MATCH_CURSOR_BATCH_SIZE):
+            batch.append(doc)
+            if len(batch) >= MATCH_CURSOR_BATCH_SIZE:
+                futures.extend(await self._dispatch_ai_scores(semaphore, [pair_for(d) for d in batch]))
+                docs.extend(batch)
+                batch = []
+        if batch:
+            futures.extend(await self._dispatch_ai_scores(semaphore, [pair_for(d) for d in batch]))
+            docs.extend(batch)
+        
+        scores = await asyncio.gather(*futures)
+        return list(zip(docs, scores))
+    
+    async def _rerank_with_ai(
+        self,
+        docs: List[dict],
+        rule_scores,
+        pair_for: Callable[[dict], Tuple[dict, dict]],
+        limit: int,
+        rerank_k: Optional[int] = None
+    ) -> List[Tuple[dict, float]]:
+        """
+        Second stage of two-stage matching.
+        Keeps the rule-based top K documents and re-scores only those with the LLM.
+        """
+        k = rerank_k or self.rerank_factor * limit
+        shortlist = [docs[i] for i, _ in rank_scores(rule_scores, 0.0, k)]
+        
+        ai_scores = await self.ai_score_pairs([pair_for(doc) for doc in shortlist])
+        
+        scored = [
+            (doc, score) for doc, score in zip(shortlist, ai_scores)
+            if score >= MIN_MATCH_SCORE
+        ]
+        scored.sort(key=lambda x: x[1], reverse=True)
+        return scored[:limit]
+    
+    def _use_two_stage(self, rerank_k: Optional[int]) -> bool:
+        """Whether AI matching should rerank a rule-based shortlist"""
+        return bool(rerank_k or self.rerank_factor)
     
     async def find_matching_candidates(
         self,
         role_id: str,
-        limit: int = 20
+        limit: int = 20,
+        rerank_k: Optional[int] = None
     ) -> List[Dict]:
-        """Find top matching candidates for a role"""
+        """
+        Find top matching candidates for a role.
+        With an LLM configured, only the rule-based top rerank_k
+        (default: rerank_factor x limit) candidates are AI-scored.
+        """
         role = await self.db.roles.find_one({"role_id": role_id}, {"_id": 0})
         if not role:
             return []
@@ -154,26 +305,43 @@ class MatchingService:
         
         cursor = self.db.engineer_profiles.find(query, {"_id": 0})
         
-        candidates = []
-        async for engineer in cursor:
-            score = await self.calculate_match_score(engineer, role)
-            if score >= 0.3:  # Minimum threshold
-                candidates.append({
-                    **engineer,
-                    "match_score": score
-                })
-        
-        # Sort by match score
-        candidates.sort(key=lambda x: x["match_score"], reverse=True)
+        if self.llm and not self._use_two_stage(rerank_k):
+            # AI-score every candidate
+            scored = await self._ai_score_stream(cursor, lambda engineer: (engineer, role))
+            scored = [(e, score) for e, score in scored if score >= MIN_MATCH_SCORE]
+            scored.sort(key=lambda x: x[1], reverse=True)
+            scored = scored[:limit]
+        else:
+            # Score every candidate in one vectorized pass
+            engineers = [engineer async for engineer in cursor]
+            scores = EngineerBatch(engineers).score_role(role)
+            
+            if self.llm:
+                scored = await self._rerank_with_ai(
+                    engineers, scores, lambda engineer: (engineer, role), limit, rerank_k
+                )
+            else:
+                scored = [
+                    (engineers[i], score)
+                    for i, score in rank_scores(scores, MIN_MATCH_SCORE, limit)
+                ]
         
-        return candidates[:limit]
+        return [
+            {**engineer, "match_score": score}
+            for engineer, score in scored
+        ]
     
     async def find_matching_roles(
         self,
         engineer_id: str,
-        limit: int = 20
+        limit: int = 20,
+        rerank_k: Optional[int] = None
     ) -> List[Dict]:
-        """Find top matching roles for an engineer"""
+        """
+        Find top matching roles for an engineer.
+        With an LLM configured, only the rule-based top rerank_k
+        (default: rerank_factor x limit) roles are AI-scored.
+        """
         engineer = await self.db.engineer_profiles.find_one(
             {"user_id": engineer_id},
             {"_id": 0}
@@ -190,26 +358,290 @@ class MatchingService:
         
         cursor = self.db.roles.find(query, {"_id": 0})
         
-        roles = []
-        async for role in cursor:
-            score = await self.calculate_match_score(engineer, role)
-            if score >= 0.3:  # Minimum threshold
-                # Get startup info
-                startup = await self.db.startups.find_one(
-                    {"startup_id": role["startup_id"]},
-                    {"_id": 0, "name": 1, "logo_url": 1}
+        if self.llm and not self._use_two_stage(rerank_k):
+            # AI-score every role
+            scored = await self._ai_score_stream(cursor, lambda role: (engineer, role))
+            scored = [(role, score) for role, score in scored if score >= MIN_MATCH_SCORE]
+            scored.sort(key=lambda x: x[1], reverse=True)
+            scored = scored[:limit]
+        else:
+            # Score every role in one vectorized pass
+            roles = [role async for role in cursor]
+            scores = RoleBatch(roles).score_engineer(engineer)
+            
+            if self.llm:
+                scored = await self._rerank_with_ai(
+                    roles, scores, lambda role: (engineer, role), limit, rerank_k
                 )
-                roles.append({
-                    **role,
-                    "match_score": score,
-                    "startup_name": startup.get("name") if startup else None,
-                    "startup_logo": startup.get("logo_url") if startup else None
-                })
+            else:
+                scored = [
+                    (roles[i], score)
+                    for i, score in rank_scores(scores, MIN_MATCH_SCORE, limit)
+                ]
         
-        # Sort by match score
-        roles.sort(key=lambda x: x["match_score"], reverse=True)
+        # Startup info for all surviving roles in one query
+        return await attach_startups(
+            self.db, ({**role, "match_score": score} for role, score in scored)
+        )
+    
+    # ============ Semantic matching ============
+    
+    async def _embed_and_store(
+        self,
+        kind: str,
+        docs: List[dict],
+        id_field: str,
+        text_for: Callable[[dict], str]
+    ) -> List[Tuple[str, List[float]]]:
+        """Embed documents in API-sized batches and persist the vectors"""
+        model = embedder_name(self.embedder)
+        results = []
+        
+        for start in range(0, len(docs), MATCH_EMBEDDING_BATCH_SIZE):
+            batch = docs[start:start + MATCH_EMBEDDING_BATCH_SIZE]
+            texts = [text_for(doc) for doc in batch]
+            vectors = await self.embedder.embeddings(texts)
+            now = datetime.now(timezone.utc).isoformat()
+            
+            operations = [
+                UpdateOne(
+                    {"kind": kind, "ref_id": doc[id_field]},
+                    {"$set": {
+                        "kind": kind,
+                        "ref_id": doc[id_field],
+                        "model": model,
+                        "content_hash": text_hash(text),
+                        "vector": list(vector),
+                        "updated_at": now
+                    }},
+                    upsert=True
+                )
+                for doc, text, vector in zip(batch, texts, vectors)
+            ]
+            await self.db.match_embeddings.bulk_write(operations, ordered=False)
+            results.extend((doc[id_field], vector) for doc, vector in zip(batch, vectors))
+        
+        return results
+    
+    async def index_engineers(self, profiles: List[dict]) -> int:
+        """Embed engineer profiles and add them to the vector index"""
+        embedded = await self._embed_and_store(
+            "engineer", profiles, "user_id", engineer_embedding_text
+        )
+        if embedded:
+            ids, vectors = zip(*embedded)
+            self.semantic_index.engineers.upsert(list(ids), list(vectors))
+        return len(embedded)
+    
+    async def index_roles(self, roles: List[dict]) -> int:
+        """Embed roles; only active roles are kept in the vector index"""
+        embedded = await self._embed_and_store("role", roles, "role_id", role_embedding_text)
+        status = {role["role_id"]: role.get("status") for role in roles}
+        
+        active = [(rid, vec) for rid, vec in embedded if status[rid] == "active"]
+        if active:
+            ids, vectors = zip(*active)
+            self.semantic_index.roles.upsert(list(ids), list(vectors))
+        self.semantic_index.roles.remove(rid for rid, _ in embedded if status[rid] != "active")
+        return len(embedded)
+    
+    async def _split_by_content_hash(
+        self,
+        kind: str,
+        docs: List[dict],
+        id_field: str,
+        text_for: Callable[[dict], str]
+    ) -> Tuple[List[dict], List[dict]]:
+        """Split documents into (changed, unchanged) against their stored embeddings"""
+        stored = {}
+        cursor = self.db.match_embeddings.find(
+            {
+                "kind": kind,
+                "ref_id": {"$in": [doc[id_field] for doc in docs]},
+                "model": embedder_name(self.embedder)
+            },
+            {"_id": 0, "ref_id": 1, "content_hash": 1}
+        )
+        async for doc in cursor:
+            stored[doc["ref_id"]] = doc["content_hash"]
+        
+        changed, unchanged = [], []
+        for doc in docs:
+            if stored.get(doc[id_field]) == text_hash(text_for(doc)):
+                unchanged.append(doc)
+            else:
+                changed.append(doc)
+        return changed, unchanged
+    
+    async def _load_vectors(self, index: VectorIndex, kind: str, ids: List[str]):
+        """Load stored vectors into an in-memory index"""
+        if not ids:
+            return
+        cursor = self.db.match_embeddings.find(
+            {"kind": kind, "ref_id": {"$in": ids}, "model": embedder_name(self.embedder)},
+            {"_id": 0, "ref_id": 1, "vector": 1}
+        )
+        docs = await cursor.to_list(None)
+        index.upsert([doc["ref_id"] for doc in docs], [doc["vector"] for doc in docs])
+    
+    async def refresh_engineer_embeddings(self, user_ids: List[str]) -> int:
+        """Re-embed the given engineers, skipping profiles whose content is unchanged"""
+        profiles = await self.db.engineer_profiles.find(
+            {"user_id": {"$in": user_ids}}, {"_id": 0}
+        ).to_list(None)
+        changed, unchanged = await self._split_by_content_hash(
+            "engineer", profiles, "user_id", engineer_embedding_text
+        )
+        
+        index = self.semantic_index.engineers
+        await self.index_engineers(changed)
+        await self._load_vectors(
+            index, "engineer", [p["user_id"] for p in unchanged if p["user_id"] not in index]
+        )
+        
+        found = {p["user_id"] for p in profiles}
+        index.remove(uid for uid in user_ids if uid not in found)
+        return len(changed)
+    
+    async def refresh_role_embeddings(self, role_ids: List[str]) -> int:
+        """Re-embed the given roles, skipping roles whose content is unchanged"""
+        roles = await self.db.roles.find({"role_id": {"$in": role_ids}}, {"_id": 0}).to_list(None)
+        changed, unchanged = await self._split_by_content_hash(
+            "role", roles, "role_id", role_embedding_text
+        )
+        
+        index = self.semantic_index.roles
+        await self.index_roles(changed)
+        
+        # Status changes alone don't need new vectors, only index membership
+        await self._load_vectors(index, "role", [
+            r["role_id"] for r in unchanged
+            if r.get("status") == "active" and r["role_id"] not in index
+        ])
+        active = {r["role_id"] for r in roles if r.get("status") == "active"}
+        index.remove(rid for rid in role_ids if rid not in active)
+        return len(changed)
+    
+    async def rebuild_embeddings(self) -> Dict[str, int]:
+        """Embed every engineer profile and role from scratch"""
+        profiles = await self.db.engineer_profiles.find({}, {"_id": 0}).to_list(None)
+        roles = await self.db.roles.find({}, {"_id": 0}).to_list(None)
+        
+        counts = {
+            "engineers": await self.index_engineers(profiles),
+            "roles": await self.index_roles(roles)
+        }
+        self._build_ivf()
+        return counts
+    
+    async def load_embedding_index(self):
+        """Load stored vectors for the current embedding model into memory"""
+        model = embedder_name(self.embedder)
+        index = self.semantic_index
+        index.engineers = VectorIndex()
+        index.roles = VectorIndex()
+        
+        active_roles = set()
+        async for role in self.db.roles.find({"status": "active"}, {"_id": 0, "role_id": 1}):
+            active_roles.add(role["role_id"])
+        
+        pending = {"engineer": ([], []), "role": ([], [])}
+        cursor = self.db.match_embeddings.find(
+            {"model": model},
+            {"_id": 0, "kind": 1, "ref_id": 1, "vector": 1}
+        )
+        async for doc in cursor:
+            if doc["kind"] == "role" and doc["ref_id"] not in active_roles:
+                continue
+            ids, vectors = pending[doc["kind"]]
+            ids.append(doc["ref_id"])
+            vectors.append(doc["vector"])
+        
+        index.engineers.upsert(*pending["engineer"])
+        index.roles.upsert(*pending["role"])
+        index.model = model
+        index.loaded = True
+        self._build_ivf()
+        
+        logger.info(
+            f"Loaded {len(index.engineers)} engineer and {len(index.roles)} role embeddings ({model})"
+        )
+    
+    def _build_ivf(self):
+        self.semantic_index.engineers.build_ivf()
+        self.semantic_index.roles.build_ivf()
+    
+    async def _ensure_embedding_index(self):
+        index = self.semantic_index
+        if not index.loaded or index.model != embedder_name(self.embedder):
+            await self.load_embedding_index()
+    
+    async def _query_vector(
+        self,
+        index: VectorIndex,
+        kind: str,
+        doc: dict,
+        id_field: str,
+        text_for: Callable[[dict], str]
+    ):
+        """Vector for a document, embedding it on the fly if it was never indexed"""
+        vector = index.get(doc[id_field])
+        if vector is None:
+            (_, vector), = await self._embed_and_store(kind, [doc], id_field, text_for)
+        return vector
+    
+    async def find_similar_candidates(self, role_id: str, limit: int = 20) -> List[Dict]:
+        """Find the engineers whose profiles are semantically closest to a role"""
+        role = await self.db.roles.find_one({"role_id": role_id}, {"_id": 0})
+        if not role:
+            return []
+        
+        await self._ensure_embedding_index()
+        vector = await self._query_vector(
+            self.semantic_index.roles, "role", role, "role_id", role_embedding_text
+        )
+        
+        # Over-fetch to leave room for engineers who are not looking
+        hits = self.semantic_index.engineers.search(vector, limit * 2)
+        similarity = dict(hits)
+        
+        profiles = await self.db.engineer_profiles.find(
+            {"user_id": {"$in": list(similarity)}, "availability": {"$ne": "not_looking"}},
+            {"_id": 0}
+        ).to_list(None)
+        
+        candidates = [
+            {**profile, "match_score": round(max(0.0, similarity[profile["user_id"]]), 2)}
+            for profile in profiles
+        ]
+        candidates.sort(key=lambda x: similarity[x["user_id"]], reverse=True)
+        return candidates[:limit]
+    
+    async def find_similar_roles(self, engineer_id: str, limit: int = 20) -> List[Dict]:
+        """Find the active roles semantically closest to an engineer profile"""
+        engineer = await self.db.engineer_profiles.find_one({"user_id": engineer_id}, {"_id": 0})
+        if not engineer:
+            return []
+        
+        await self._ensure_embedding_index()
+        vector = await self._query_vector(
+            self.semantic_index.engineers, "engineer", engineer, "user_id", engineer_embedding_text
+        )
+        
+        hits = self.semantic_index.roles.search(vector, limit * 2)
+        similarity = dict(hits)
+        
+        roles = await self.db.roles.find(
+            {"role_id": {"$in": list(similarity)}, "status": "active"},
+            {"_id": 0}
+        ).to_list(None)
         
-        return roles[:limit]
+        matches = [
+            {**role, "match_score": round(max(0.0, similarity[role["role_id"]]), 2)}
+            for role in roles
+        ]
+        matches.sort(key=lambda x: similarity[x["role_id"]], reverse=True)
+        return await attach_startups(self.db, matches[:limit])
     
     async def update_application_match_score(self, application_id: str):
         """Calculate and update match score for an application"""
@@ -0,0 +1,289 @@
+"""
+Migrations - One-off data migrations recorded in schema_migrations
+"""
+from typing import List, Callable, Awaitable
+from datetime import datetime, timezone, timedelta
+import asyncio
+import logging
+import os
+import uuid
+
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from controllers.application_controller import COUNTED_APPLICATIONS
+from controllers.connection_controller import MESSAGE_FIELDS
+from controllers.startup_controller import StartupController
+from .indexes import INDEXES
+from .notification_archive import create_archive_collection
+
+logger = logging.getLogger(__name__)
+
+# A running migration whose claim has not been refreshed for this many seconds
+# belongs to an instance that died; another instance takes it over
+MIGRATION_CLAIM_TIMEOUT = float(os.environ.get("MIGRATION_CLAIM_TIMEOUT", "300"))
+# Seconds between checks while another instance is applying a migration
+MIGRATION_POLL_INTERVAL = float(os.environ.get("MIGRATION_POLL_INTERVAL", "2"))
+
+
+class Migration:
+    """A named, idempotent data migration"""
+    
+    def __init__(self, name: str, description: str, apply: Callable[..., Awaitable[int]]):
+        self.name = name
+        self.description = description
+        self.apply = apply
+
+
+async def _session_expiry_dates(db) -> int:
+    """Store user_sessions.expires_at as BSON dates so the TTL index can expire them"""
+    operations = []
+    cursor = db.user_sessions.find(
+        {"expires_at": {"$type": "string"}},
+        {"_id": 1, "expires_at": 1}
+    )
+    async for session in cursor:
+        expires_at = datetime.fromisoformat(session["expires_at"])
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        operations.append(UpdateOne(
+            {"_id": session["_id"]},
+            {"$set": {"expires_at": expires_at}}
+        ))
+    
+    if operations:
+        await db.user_sessions.bulk_write(operations, ordered=False)
+    return len(operations)
+
+
+async def _backfill_applications_count(db) -> int:
+    """Set applications_count on roles created before the counter existed"""
+    counts = {}
+    cursor = db.applications.aggregate([
+        {"$match": COUNTED_APPLICATIONS},
+        {"$group": {"_id": "$role_id", "count": {"$sum": 1}}}
+    ])
+    async for row in cursor:
+        counts[row["_id"]] = row["count"]
+    
+    operations = []
+    cursor = db.roles.find({"applications_count": {"$exists": False}}, {"_id": 0, "role_id": 1})
+    async for role in cursor:
+        operations.append(UpdateOne(
+            # Never overwrite a counter that started being maintained meanwhile
+            {"role_id": role["role_id"], "applications_count": {"$exists": False}},
+            {"$set": {"applications_count": counts.get(role["role_id"], 0)}}
+        ))
+    
+    if operations:
+        await db.roles.bulk_write(operations, ordered=False)
+    return len(operations)
+
+
+async def _backfill_open_roles_count(db) -> int:
+    """Set open_roles_count on startups created before the counter existed"""
+    return await StartupController(db).reconcile_open_roles_counts()
+
+
+async def _connection_messages(db) -> int:
+    """Move embedded connections.messages into the messages collection"""
+    # The unique message_id index makes a retried run upsert instead of duplicating
+    await db.messages.create_indexes(INDEXES["messages"])
+    
+    moved = 0
+    cursor = db.connections.find(
+        {"messages": {"$exists": True}},
+        {"_id": 0, "connection_id": 1, "founder_id": 1, "engineer_id": 1, "messages": 1}
+    )
+    async for conn in cursor:
+        messages = sorted(conn["messages"] or [], key=lambda m: m["sent_at"])
+        if messages:
+            await db.messages.bulk_write([
+                UpdateOne(
+                    {"message_id": msg["message_id"]},
+                    {"$setOnInsert": {**msg, "connection_id": conn["connection_id"]}},
+                    upsert=True
+                )
+                for msg in messages
+            ], ordered=False)
+        
+        unread = {"founder": 0, "engineer": 0}
+        for msg in messages:
+            if not msg.get("read", False):
+                unread["engineer" if msg["sender_id"] == conn["founder_id"] else "founder"] += 1
+        
+        await db.connections.update_one(
+            {"connection_id": conn["connection_id"]},
+            {
+                "$set": {
+                    "last_message": (
+                        {f: messages[-1][f] for f in MESSAGE_FIELDS if f in messages[-1]} if messages else None
+                    ),
+                    "message_count": len(messages),
+                    "unread_count": unread
+                },
+                "$unset": {"messages": ""}
+            }
+        )
+        moved += len(messages)
+    return moved
+
+
+async def _notification_retention(db) -> int:
+    """Create the compressed archive collection and date read notifications for the TTL index"""
+    # Must exist before ensure_indexes, which would create it uncompressed
+    await create_archive_collection(db)
+    
+    # Read time is unknown for these; starting the clock now keeps them a full TTL period
+    result = await db.notifications.update_many(
+        {"read": True, "read_at": {"$exists": False}},
+        {"$set": {"read_at": datetime.now(timezone.utc)}}
+    )
+    return result.modified_count
+
+
+# Applied in order; never rename or reorder an entry once it has shipped
+MIGRATIONS: List[Migration] = [
+    Migration(
+        "0001_session_expiry_dates",
+        "Convert user_sessions.expires_at strings to dates",
+        _session_expiry_dates
+    ),
+    Migration(
+        "0002_roles_applications_count",
+        "Backfill roles.applications_count",
+        _backfill_applications_count
+    ),
+    Migration(
+        "0003_startups_open_roles_count",
+        "Backfill startups.open_roles_count",
+        _backfill_open_roles_count
+    ),
+    Migration(
+        "0004_connection_messages",
+        "Move connections.messages into the messages collection",
+        _connection_messages
+    ),
+    Migration(
+        "0005_notification_retention",
+        "Create notifications_archive and backfill notifications.read_at",
+        _notification_retention
+    ),
+]
+
+
+class MigrationManager:
+    """Applies pending migrations once per database"""
+    
+    def __init__(
+        self,
+        db,
+        migrations: List[Migration] = MIGRATIONS,
+        claim_timeout: float = MIGRATION_CLAIM_TIMEOUT,
+        poll_interval: float = MIGRATION_POLL_INTERVAL
+    ):
+        self.db = db
+        self.migrations = migrations
+        self.claim_timeout = claim_timeout
+        self.poll_interval = poll_interval
+        # Identifies this instance's claims
+        self.owner = uuid.uuid4().hex
+    
+    async def applied(self) -> List[str]:
+        """Names of migrations already applied"""
+        cursor = self.db.schema_migrations.find({"status": "applied"}, {"_id": 1})
+        return [doc["_id"] async for doc in cursor]
+    
+    async def pending(self) -> List[Migration]:
+        """Migrations not yet applied"""
+        done = set(await self.applied())
+        return [m for m in self.migrations if m.name not in done]
+    
+    async def run(self) -> List[str]:
+        """
+        Apply pending migrations in order and return their names.
+        Each migration is claimed by inserting its schema_migrations record
+        first, so several app instances starting together apply it once.
+        While another instance holds the claim this one waits, so it never
+        runs a later migration or serves traffic before an earlier one is
+        applied; a claim that stops being refreshed is taken over.
+        """
+        applied = []
+        for migration in await self.pending():
+            if not await self._claim(migration):
+                # Applied by another instance while we waited
+                continue
+            
+            heartbeat = asyncio.create_task(self._heartbeat(migration))
+            try:
+                changed = await migration.apply(self.db)
+            except Exception:
+                # Release the claim so the next start retries it
+                await self.db.schema_migrations.delete_one({"_id": migration.name, "owner": self.owner})
+                logger.error(f"Migration {migration.name} failed")
+                raise
+            finally:
+                heartbeat.cancel()
+            
+            await self.db.schema_migrations.update_one(
+                {"_id": migration.name},
+                {"$set": {
+                    "status": "applied",
+                    "documents_changed": changed,
+                    "applied_at": datetime.now(timezone.utc)
+                }}
+            )
+            logger.info(f"Applied migration {migration.name} ({changed} documents)")
+            applied.append(migration.name)
+        
+        return applied
+    
+    async def _claim(self, migration: Migration) -> bool:
+        """Wait until this instance holds the migration's claim; False if it got applied meanwhile"""
+        while True:
+            now = datetime.now(timezone.utc)
+            try:
+                await self.db.schema_migrations.insert_one({
+                    "_id": migration.name,
+                    "description": migration.description,
+                    "status": "running",
+                    "owner": self.owner,
+                    "started_at": now,
+                    "heartbeat_at": now
+                })
+                return True
+            except DuplicateKeyError:
+                pass
+            
+            stale = now - timedelta(seconds=self.claim_timeout)
+            taken = await self.db.schema_migrations.find_one_and_update(
+                {
+                    "_id": migration.name,
+                    "status": "running",
+                    "$or": [
+                        {"heartbeat_at": {"$lt": stale}},
+                        {"heartbeat_at": {"$exists": False}, "started_at": {"$lt": stale}}
+                    ]
+                },
+                {"$set": {"owner": self.owner, "heartbeat_at": now, "taken_over_at": now}}
+            )
+            if taken:
+                logger.warning(f"Migration {migration.name} claim is stale, taking it over")
+                return True
+            
+            record = await self.db.schema_migrations.find_one({"_id": migration.name}, {"status": 1})
+            if record and record["status"] == "applied":
+                return False
+            if record:
+                logger.info(f"Waiting for migration {migration.name} running on another instance")
+                await asyncio.sleep(self.poll_interval)
+            # else the claim was released after a failure; try to claim it again
+    
+    async def _heartbeat(self, migration: Migration):
+        """Keep refreshing the claim while the migration runs"""
+        while True:
+            await asyncio.sleep(self.claim_timeout / 3)
+            await self.db.schema_migrations.update_one(
+                {"_id": migration.name, "owner": self.owner},
+                {"$set": {"heartbeat_at": datetime.now(timezone.utc)}}
+            )
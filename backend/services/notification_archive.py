@@ -0,0 +1,95 @@
+"""
+Notification Archive - Retention tiers for the notifications collection
+"""
+from typing import Optional
+from datetime import datetime, timezone, timedelta
+import logging
+import os
+
+from pymongo.errors import BulkWriteError
+
+from .background import PeriodicTask
+from .notification_service import shared_unread_counter
+from .notification_writer import DUPLICATE_KEY
+
+logger = logging.getLogger(__name__)
+
+# Read notifications are deleted by a TTL index this long after read_at
+NOTIFICATION_READ_TTL_DAYS = int(os.environ.get("NOTIFICATION_READ_TTL_DAYS", "30"))
+# Anything older than this (mostly never-read) moves to notifications_archive
+NOTIFICATION_ARCHIVE_AFTER_DAYS = int(os.environ.get("NOTIFICATION_ARCHIVE_AFTER_DAYS", "90"))
+NOTIFICATION_ARCHIVE_BATCH_SIZE = int(os.environ.get("NOTIFICATION_ARCHIVE_BATCH_SIZE", "1000"))
+NOTIFICATION_ARCHIVE_INTERVAL = float(os.environ.get("NOTIFICATION_ARCHIVE_INTERVAL", "3600"))
+
+ARCHIVE_COLLECTION = "notifications_archive"
+
+# Cold data: smaller on disk at some CPU cost per read
+ARCHIVE_STORAGE_ENGINE = {"wiredTiger": {"configString": "block_compressor=zstd"}}
+
+
+async def create_archive_collection(db) -> bool:
+    """Create notifications_archive with zstd block compression, if missing"""
+    if ARCHIVE_COLLECTION in await db.list_collection_names():
+        return False
+    await db.create_collection(ARCHIVE_COLLECTION, storageEngine=ARCHIVE_STORAGE_ENGINE)
+    return True
+
+
+class NotificationArchiver(PeriodicTask):
+    """
+    Every interval, moves notifications older than the archive age into
+    notifications_archive, batch_size documents per insert_many/delete_many
+    round trip, so the hot collection stays bounded.
+    """
+    
+    name = "Notification archiver"
+    
+    def __init__(
+        self,
+        db,
+        archive_after_days: int = NOTIFICATION_ARCHIVE_AFTER_DAYS,
+        batch_size: int = NOTIFICATION_ARCHIVE_BATCH_SIZE,
+        interval: float = NOTIFICATION_ARCHIVE_INTERVAL
+    ):
+        super().__init__(interval)
+        self.db = db
+        self.archive_after = timedelta(days=archive_after_days)
+        self.batch_size = batch_size
+    
+    async def run_once(self):
+        await self.archive()
+    
+    async def archive(self, cutoff: Optional[datetime] = None) -> int:
+        """Move notifications created before cutoff; returns how many moved"""
+        cutoff = cutoff or datetime.now(timezone.utc) - self.archive_after
+        query = {"created_at": {"$lt": cutoff.isoformat()}}
+        
+        moved = 0
+        unread_users = set()
+        while True:
+            # to_list() alone stops reading, but the server would still fetch past the batch
+            cursor = self.db.notifications.find(query).sort("created_at", 1).limit(self.batch_size)
+            docs = await cursor.to_list(self.batch_size)
+            if not docs:
+                break
+            
+            try:
+                await self.db[ARCHIVE_COLLECTION].insert_many(docs, ordered=False)
+            except BulkWriteError as e:
+                # Already archived by an earlier run that stopped before deleting
+                errors = e.details.get("writeErrors", [])
+                if any(error.get("code") != DUPLICATE_KEY for error in errors):
+                    raise
+            
+            await self.db.notifications.delete_many({"_id": {"$in": [doc["_id"] for doc in docs]}})
+            moved += len(docs)
+            unread_users.update(doc["user_id"] for doc in docs if not doc.get("read"))
+            if len(docs) < self.batch_size:
+                break
+        
+        if unread_users:
+            # Archived unread notifications no longer count as unread
+            shared_unread_counter.forget(unread_users)
+        if moved:
+            logger.info(f"Archived {moved} notifications created before {cutoff.isoformat()}")
+        return moved
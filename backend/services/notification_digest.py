@@ -0,0 +1,96 @@
+"""
+Notification Digest - Periodic per-user summaries of unread notifications
+"""
+from typing import List, Optional
+from datetime import datetime, timezone, timedelta
+import logging
+import os
+
+from .background import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+# Seconds between digest runs
+NOTIFICATION_DIGEST_INTERVAL = float(os.environ.get("NOTIFICATION_DIGEST_INTERVAL", "3600"))
+
+# Only notifications at least this old are digested, so ones still queued in
+# the NotificationWriter are never marked digested without being counted
+DIGEST_SETTLE_SECONDS = 60
+
+
+class NotificationDigestBuilder(PeriodicTask):
+    """
+    Every interval, summarizes each user's unread notifications not yet in a
+    digest into one notification_digests document: totals per type and the
+    time of the latest event. Coalesced notifications count the events
+    since they were last digested. Runs entirely as a server-side aggregation.
+    """
+    
+    name = "Notification digest"
+    
+    def __init__(self, db, interval: float = NOTIFICATION_DIGEST_INTERVAL):
+        super().__init__(interval)
+        self.db = db
+    
+    async def run_once(self):
+        await self.build()
+    
+    async def build(self, cutoff: Optional[datetime] = None) -> str:
+        """Digest unread notifications created before cutoff; returns the period id"""
+        cutoff = cutoff or datetime.now(timezone.utc) - timedelta(seconds=DIGEST_SETTLE_SECONDS)
+        period = cutoff.strftime("%Y%m%dT%H%M%S")
+        match = {
+            "read": False,
+            "digested_at": {"$exists": False},
+            "created_at": {"$lt": cutoff.isoformat()}
+        }
+        
+        await self.db.notifications.aggregate(self._pipeline(match, period, cutoff)).to_list(None)
+        # digested_count lets a coalesced notification bumped after this run
+        # contribute only its new events to the next digest
+        result = await self.db.notifications.update_many(
+            match,
+            [{"$set": {
+                "digested_at": cutoff.isoformat(),
+                "digested_count": {"$ifNull": ["$count", 1]}
+            }}]
+        )
+        if result.modified_count:
+            logger.info(f"Digested {result.modified_count} notifications for period {period}")
+        return period
+    
+    @staticmethod
+    def _pipeline(match: dict, period: str, cutoff: datetime) -> List[dict]:
+        return [
+            {"$match": match},
+            {"$group": {
+                "_id": {"user_id": "$user_id", "type": "$type"},
+                "count": {"$sum": {"$subtract": [
+                    {"$ifNull": ["$count", 1]},
+                    {"$ifNull": ["$digested_count", 0]}
+                ]}},
+                "last_at": {"$max": {"$ifNull": ["$last_at", "$created_at"]}}
+            }},
+            {"$group": {
+                "_id": "$_id.user_id",
+                "total": {"$sum": "$count"},
+                "last_at": {"$max": "$last_at"},
+                "types": {"$push": {"type": "$_id.type", "count": "$count", "last_at": "$last_at"}}
+            }},
+            {"$project": {
+                "_id": 0,
+                "digest_id": {"$concat": ["$_id", f":{period}"]},
+                "user_id": "$_id",
+                "period": {"$literal": period},
+                "total": 1,
+                "last_at": 1,
+                "types": 1,
+                "created_at": {"$literal": cutoff.isoformat()}
+            }},
+            {"$merge": {
+                "into": "notification_digests",
+                "on": "digest_id",
+                "whenMatched": "replace",
+                "whenNotMatched": "insert"
+            }}
+        ]
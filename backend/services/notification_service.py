@@ -1,19 +1,127 @@
 """
 Notification Service - Handle in-app and email notifications
 """
-from typing import List, Dict, Optional
+from typing import Iterable, List, Dict, Optional, Sequence
 import logging
 from datetime import datetime, timezone
+import os
 import uuid
 
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from .lru import LRUCache
+from .realtime import RealtimeHub
+from .notification_writer import NotificationWriter
+
 logger = logging.getLogger(__name__)
 
+# Seconds before a user's in-memory unread count is re-read from MongoDB
+UNREAD_COUNT_TTL = float(os.environ.get("UNREAD_COUNT_TTL", "300"))
+UNREAD_COUNT_MAX_USERS = int(os.environ.get("UNREAD_COUNT_MAX_USERS", "100000"))
+
+
+class UnreadCounter:
+    """
+    Unread notification count per user, seeded lazily from MongoDB and then
+    kept current by the NotificationService writes of this process. Entries
+    expire after UNREAD_COUNT_TTL so writes made by other workers show up.
+    """
+    
+    def __init__(self, ttl: float = UNREAD_COUNT_TTL, max_users: int = UNREAD_COUNT_MAX_USERS):
+        self._counts = LRUCache(max_users, ttl)
+    
+    async def get(self, db, user_id: str, queued: Sequence[str] = ()) -> int:
+        """
+        Cached count, or seeded from MongoDB. queued are ids of the user's
+        notifications not yet known to be inserted; they are counted here and
+        excluded from the query, so each is counted once whether or not its
+        insert lands meanwhile.
+        """
+        count = self._counts.get(user_id)
+        if count is not None:
+            return count
+        
+        query = {"user_id": user_id, "read": False}
+        if queued:
+            query["notification_id"] = {"$nin": list(queued)}
+        count = await db.notifications.count_documents(query) + len(queued)
+        self.set(user_id, count)
+        return count
+    
+    def set(self, user_id: str, count: int):
+        self._counts.set(user_id, count)
+    
+    async def refresh(
+        self,
+        db,
+        user_ids: List[str],
+        queued: Optional[Dict[str, Sequence[str]]] = None
+    ) -> Dict[str, int]:
+        """Re-read the counts of many users with one aggregation (queued as in get)"""
+        queued = queued or {}
+        match = {"user_id": {"$in": user_ids}, "read": False}
+        queued_ids = [notification_id for ids in queued.values() for notification_id in ids]
+        if queued_ids:
+            match["notification_id"] = {"$nin": queued_ids}
+        
+        counts = {user_id: len(queued.get(user_id, ())) for user_id in user_ids}
+        cursor = db.notifications.aggregate([
+            {"$match": match},
+            {"$group": {"_id": "$user_id", "count": {"$sum": 1}}}
+        ])
+        async for row in cursor:
+            counts[row["_id"]] += row["count"]
+        
+        for user_id, count in counts.items():
+            self.set(user_id, count)
+        return counts
+    
+    def user_ids(self) -> List[str]:
+        """Users with a cached count"""
+        return self._counts.keys()
+    
+    def forget(self, user_ids: Iterable[str]):
+        """Drop cached counts, e.g. after notifications were written server-side"""
+        for user_id in user_ids:
+            self._counts.pop(user_id)
+    
+    def adjust(self, user_id: str, delta: int):
+        """Apply a change to a seeded count; unseeded users are counted on next read"""
+        count = self._counts.get(user_id)
+        if count is not None:
+            self._counts.replace(user_id, max(0, count + delta))
+
+
+# Shared by every NotificationService in this process
+shared_unread_counter = UnreadCounter()
+
+APPLICATION_STATUS_MESSAGES = {
+    "reviewed": "Your application is being reviewed",
+    "shortlisted": "Congratulations! You've been shortlisted",
+    "interviewing": "You've been invited for an interview",
+    "offered": "Congratulations! You have a job offer",
+    "rejected": "Update on your application"
+}
+
+# Applications whose engineer still waits on the outcome
+OPEN_APPLICATIONS = {"status": {"$nin": ["withdrawn", "rejected"]}}
+
 
 class NotificationService:
     """Service for managing notifications"""
     
-    def __init__(self, db):
+    def __init__(
+        self,
+        db,
+        hub: Optional[RealtimeHub] = None,
+        unread: Optional[UnreadCounter] = None,
+        writer: Optional[NotificationWriter] = None
+    ):
         self.db = db
+        self.hub = hub
+        self.unread = unread if unread is not None else shared_unread_counter
+        self.writer = writer
     
     async def create_notification(
         self,
@@ -21,9 +129,19 @@ class NotificationService:
         notification_type: str,
         title: str,
         message: str,
-        data: Optional[Dict] = None
+        data: Optional[Dict] = None,
+        coalesce_key: Optional[str] = None
     ) -> Dict:
-        """Create a new notification"""
+        """
+        Create a new notification. With a coalesce_key, an unread notification
+        with the same key is updated instead (count, and created_at moves to
+        the latest event), so a burst of similar events leaves one document.
+        """
+        if coalesce_key:
+            return await self._coalesce_notification(
+                user_id, notification_type, title, message, data, coalesce_key
+            )
+        
         notification_id = f"notif_{uuid.uuid4().hex[:12]}"
         now = datetime.now(timezone.utc)
         
@@ -38,7 +156,71 @@ class NotificationService:
             "created_at": now.isoformat()
         }
         
-        await self.db.notifications.insert_one(notification_doc)
+        if self.writer:
+            # Inserted with the next batch; the request does not wait for it
+            self.writer.enqueue(notification_doc)
+        else:
+            await self.db.notifications.insert_one(notification_doc)
+        
+        self.unread.adjust(user_id, 1)
+        if self.hub:
+            await self.hub.publish(
+                user_id,
+                "notification",
+                {k: v for k, v in notification_doc.items() if k != "_id"}
+            )
+        await self._publish_unread_count(user_id)
+        
+        return notification_doc
+    
+    async def _coalesce_notification(
+        self,
+        user_id: str,
+        notification_type: str,
+        title: str,
+        message: str,
+        data: Optional[Dict],
+        coalesce_key: str
+    ) -> Dict:
+        """Upsert the user's unread notification for coalesce_key"""
+        now = datetime.now(timezone.utc).isoformat()
+        
+        # Unique on (user_id, coalesce_key) among unread notifications; a
+        # concurrent upsert that loses the insert race matches on retry
+        for attempt in range(2):
+            try:
+                notification_doc = await self.db.notifications.find_one_and_update(
+                    {"user_id": user_id, "coalesce_key": coalesce_key, "read": False},
+                    {
+                        "$inc": {"count": 1},
+                        # created_at tracks the latest event, so an active thread
+                        # sorts as new and is not archived; first_at keeps the start
+                        "$set": {"created_at": now, "last_at": now},
+                        # Include it in the next digest again
+                        "$unset": {"digested_at": ""},
+                        "$setOnInsert": {
+                            "notification_id": f"notif_{uuid.uuid4().hex[:12]}",
+                            "type": notification_type,
+                            "title": title,
+                            "message": message,
+                            "data": data or {},
+                            "first_at": now
+                        }
+                    },
+                    projection={"_id": 0},
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER
+                )
+                break
+            except DuplicateKeyError:
+                if attempt:
+                    raise
+        
+        if notification_doc["count"] == 1:
+            self.unread.adjust(user_id, 1)
+        if self.hub:
+            await self.hub.publish(user_id, "notification", notification_doc)
+        await self._publish_unread_count(user_id)
         
         return notification_doc
     
@@ -49,6 +231,8 @@ class NotificationService:
         limit: int = 50
     ) -> List[Dict]:
         """Get notifications for a user"""
+        await self._write_pending()
+        
         query = {"user_id": user_id}
         if unread_only:
             query["read"] = False
@@ -60,26 +244,132 @@ class NotificationService:
     
     async def mark_as_read(self, notification_id: str, user_id: str) -> bool:
         """Mark a notification as read"""
+        await self._write_pending()
         result = await self.db.notifications.update_one(
-            {"notification_id": notification_id, "user_id": user_id},
-            {"$set": {"read": True}}
+            {"notification_id": notification_id, "user_id": user_id, "read": False},
+            # read_at is a BSON date so the retention TTL index can expire it
+            {"$set": {"read": True, "read_at": datetime.now(timezone.utc)}}
         )
+        if result.modified_count:
+            self.unread.adjust(user_id, -1)
+            await self._publish_unread_count(user_id)
         return result.modified_count > 0
     
     async def mark_all_as_read(self, user_id: str) -> int:
         """Mark all notifications as read for a user"""
+        await self._write_pending()
         result = await self.db.notifications.update_many(
             {"user_id": user_id, "read": False},
-            {"$set": {"read": True}}
+            {"$set": {"read": True, "read_at": datetime.now(timezone.utc)}}
         )
+        self.unread.set(user_id, 0)
+        await self._publish_unread_count(user_id)
         return result.modified_count
     
+    async def fan_out(
+        self,
+        collection: str,
+        query: Dict,
+        user_field: str,
+        key_field: str,
+        notification_type: str,
+        title: str,
+        message: str,
+        data: Optional[Dict] = None
+    ) -> str:
+        """
+        Create one notification per document of collection matching query,
+        addressed to the document's user_field, entirely inside MongoDB: an
+        aggregation $merge-s the generated notifications into notifications,
+        so the recipients are never loaded into Python. data values are
+        aggregation expressions ("$field" or {"$literal": value}). Returns
+        the fan-out id, which prefixes every generated notification_id.
+        """
+        fan_out_id = uuid.uuid4().hex[:12]
+        pipeline = self._fan_out_pipeline(
+            fan_out_id, query, user_field, key_field,
+            notification_type, title, message, data or {}
+        )
+        await self.db[collection].aggregate(pipeline).to_list(None)
+        await self._sync_fan_out_counts(fan_out_id)
+        return fan_out_id
+    
+    async def _sync_fan_out_counts(self, fan_out_id: str):
+        """
+        Bring this process's state for the fan-out's recipients up to date:
+        users with sockets open here get their new count pushed, other users
+        with a cached count have it dropped. Only recipients among those local
+        users are read back, never the whole recipient list.
+        """
+        connected = set(self.hub.connected_user_ids()) if self.hub else set()
+        local = connected | set(self.unread.user_ids())
+        if not local:
+            return
+        
+        # Anchored prefix of the unique notification_id index
+        cursor = self.db.notifications.find(
+            {"notification_id": {"$regex": f"^notif_{fan_out_id}_"}, "user_id": {"$in": list(local)}},
+            {"_id": 0, "user_id": 1}
+        )
+        recipients = {doc["user_id"] async for doc in cursor}
+        
+        pushed = [user_id for user_id in recipients if user_id in connected]
+        self.unread.forget(recipients.difference(pushed))
+        if pushed:
+            queued = self.writer.queued_by_user(pushed) if self.writer else None
+            counts = await self.unread.refresh(self.db, pushed, queued)
+            for user_id, count in counts.items():
+                await self.hub.publish(user_id, "unread_count", {"count": count})
+    
+    @staticmethod
+    def _fan_out_pipeline(
+        fan_out_id: str,
+        query: Dict,
+        user_field: str,
+        key_field: str,
+        notification_type: str,
+        title: str,
+        message: str,
+        data: Dict
+    ) -> List[Dict]:
+        return [
+            {"$match": query},
+            {"$project": {
+                "_id": 0,
+                # Deterministic per source document, so re-running the merge never duplicates
+                "notification_id": {"$concat": [f"notif_{fan_out_id}_", f"${key_field}"]},
+                "user_id": f"${user_field}",
+                "type": {"$literal": notification_type},
+                "title": {"$literal": title},
+                "message": {"$literal": message},
+                "data": {**data, "fan_out_id": {"$literal": fan_out_id}},
+                "read": {"$literal": False},
+                "created_at": {"$literal": datetime.now(timezone.utc).isoformat()}
+            }},
+            {"$merge": {
+                "into": "notifications",
+                "on": "notification_id",
+                "whenMatched": "keepExisting",
+                "whenNotMatched": "insert"
+            }}
+        ]
+    
     async def get_unread_count(self, user_id: str) -> int:
         """Get count of unread notifications"""
-        return await self.db.notifications.count_documents({
-            "user_id": user_id,
-            "read": False
-        })
+        queued = self.writer.queued_for(user_id) if self.writer else ()
+        return await self.unread.get(self.db, user_id, queued)
+    
+    async def _write_pending(self):
+        """Insert queued notifications now, so reads and updates see them"""
+        if self.writer and self.writer.pending_count:
+            await self.writer.flush()
+    
+    async def _publish_unread_count(self, user_id: str):
+        """Push the user's current unread count to their open streams"""
+        if self.hub:
+            await self.hub.publish(
+                user_id, "unread_count", {"count": await self.get_unread_count(user_id)}
+            )
     
     # Notification triggers
     async def notify_new_application(self, application: Dict, role: Dict, startup: Dict):
@@ -97,25 +387,43 @@ class NotificationService:
     
     async def notify_application_status_update(self, application: Dict, new_status: str):
         """Notify engineer of application status update"""
-        status_messages = {
-            "reviewed": "Your application is being reviewed",
-            "shortlisted": "Congratulations! You've been shortlisted",
-            "interviewing": "You've been invited for an interview",
-            "offered": "Congratulations! You have a job offer",
-            "rejected": "Update on your application"
-        }
-        
         await self.create_notification(
             user_id=application.get("engineer_id"),
             notification_type="application_update",
             title="Application Update",
-            message=status_messages.get(new_status, f"Application status: {new_status}"),
+            message=APPLICATION_STATUS_MESSAGES.get(new_status, f"Application status: {new_status}"),
             data={
                 "application_id": application.get("application_id"),
                 "status": new_status
             }
         )
     
+    async def notify_applications_status_update(self, query: Dict, new_status: str) -> str:
+        """Notify the engineer of every application matching query of a status update"""
+        return await self.fan_out(
+            "applications",
+            query,
+            user_field="engineer_id",
+            key_field="application_id",
+            notification_type="application_update",
+            title="Application Update",
+            message=APPLICATION_STATUS_MESSAGES.get(new_status, f"Application status: {new_status}"),
+            data={"application_id": "$application_id", "status": {"$literal": new_status}}
+        )
+    
+    async def notify_role_closed(self, role: Dict) -> str:
+        """Notify every engineer with an open application that a role closed"""
+        return await self.fan_out(
+            "applications",
+            {"role_id": role.get("role_id"), **OPEN_APPLICATIONS},
+            user_field="engineer_id",
+            key_field="application_id",
+            notification_type="role_closed",
+            title="Role Closed",
+            message=f"{role.get('title')} is no longer accepting applications",
+            data={"application_id": "$application_id", "role_id": "$role_id"}
+        )
+    
     async def notify_new_connection_request(self, connection: Dict):
         """Notify engineer of new connection request"""
         await self.create_notification(
@@ -155,5 +463,7 @@ class NotificationService:
             message="You have a new message",
             data={
                 "connection_id": connection.get("connection_id")
-            }
+            },
+            # One unread notification per conversation, however many messages arrive
+            coalesce_key=f"new_message:{connection.get('connection_id')}"
         )
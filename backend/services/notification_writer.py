@@ -0,0 +1,72 @@
+"""
+Notification Writer - Write-behind batching of notification inserts
+"""
+from typing import Dict, Iterable, List
+import logging
+import os
+
+from pymongo.errors import BulkWriteError
+
+from .background import CoalescingWorker
+
+logger = logging.getLogger(__name__)
+
+# A batch is written when this many notifications are queued...
+NOTIFICATION_BATCH_SIZE = int(os.environ.get("NOTIFICATION_BATCH_SIZE", "100"))
+# ...or after this many seconds, whichever comes first
+NOTIFICATION_FLUSH_INTERVAL = float(os.environ.get("NOTIFICATION_FLUSH_INTERVAL", "0.05"))
+
+# MongoDB duplicate key error
+DUPLICATE_KEY = 11000
+
+
+class NotificationWriter(CoalescingWorker):
+    """
+    Queues notification documents and inserts them with one
+    insert_many(ordered=False) per batch, off the request path.
+    """
+    
+    kinds = ("notification",)
+    name = "Notification writer"
+    
+    def __init__(
+        self,
+        db,
+        batch_size: int = NOTIFICATION_BATCH_SIZE,
+        flush_interval: float = NOTIFICATION_FLUSH_INTERVAL
+    ):
+        super().__init__(batch_size, flush_interval)
+        self.db = db
+        self._docs: Dict[str, dict] = {}
+    
+    def enqueue(self, doc: dict):
+        """Queue a notification document for insertion"""
+        self._docs[doc["notification_id"]] = doc
+        self.schedule("notification", doc["notification_id"])
+    
+    def queued_for(self, user_id: str) -> List[str]:
+        """Ids of user_id's notifications queued or being inserted"""
+        return self.queued_by_user([user_id]).get(user_id, [])
+    
+    def queued_by_user(self, user_ids: Iterable[str]) -> Dict[str, List[str]]:
+        """Ids of notifications queued or being inserted, for each of user_ids that has any"""
+        wanted = set(user_ids)
+        queued: Dict[str, List[str]] = {}
+        for notification_id, doc in self._docs.items():
+            if doc["user_id"] in wanted:
+                queued.setdefault(doc["user_id"], []).append(notification_id)
+        return queued
+    
+    async def process(self, kind: str, ids: List[str]) -> int:
+        docs = [self._docs[notification_id] for notification_id in ids]
+        try:
+            await self.db.notifications.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            # A retried batch may contain documents the failed attempt already wrote
+            errors = e.details.get("writeErrors", [])
+            if any(error.get("code") != DUPLICATE_KEY for error in errors):
+                raise
+        
+        for notification_id in ids:
+            self._docs.pop(notification_id, None)
+        return len(docs)
@@ -0,0 +1,116 @@
+"""
+Pagination - Keyset (continuation-token) pagination for list queries
+"""
+from typing import Any, List, Optional, Tuple
+from datetime import datetime
+import base64
+import json
+import os
+
+from pymongo import DESCENDING
+
+from .lru import LRUCache
+
+
+def encode_cursor(sort_value: Any, id_value: str) -> str:
+    """Opaque continuation token for the position just after a document"""
+    if isinstance(sort_value, datetime):
+        sort_value = {"$date": sort_value.isoformat()}
+    payload = json.dumps([sort_value, id_value], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[Any, str]:
+    """Sort value and id encoded in a continuation token"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        sort_value, id_value = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid pagination cursor")
+    if isinstance(sort_value, dict) and "$date" in sort_value:
+        sort_value = datetime.fromisoformat(sort_value["$date"])
+    return sort_value, id_value
+
+
+def keyset_sort(sort_field: str, id_field: str, direction: int = DESCENDING) -> List[Tuple[str, int]]:
+    """Sort spec with the id as tie-breaker, so every position is unique"""
+    return [(sort_field, direction), (id_field, direction)]
+
+
+def keyset_filter(
+    sort_field: str,
+    id_field: str,
+    after: str,
+    direction: int = DESCENDING
+) -> dict:
+    """
+    Range filter selecting the documents that follow a continuation token.
+    MongoDB sorts null/missing below every other value, so in descending order
+    they form the tail of the list and in ascending order its head.
+    """
+    value, last_id = decode_cursor(after)
+    op = "$lt" if direction == DESCENDING else "$gt"
+    same_value_rest = {sort_field: value, id_field: {op: last_id}}
+    
+    if value is None:
+        if direction == DESCENDING:
+            return same_value_rest
+        return {"$or": [same_value_rest, {sort_field: {"$ne": None}}]}
+    
+    branches = [{sort_field: {op: value}}, same_value_rest]
+    if direction == DESCENDING:
+        branches.append({sort_field: None})
+    return {"$or": branches}
+
+
+# Seconds an "estimated" list total may be served from cache
+LIST_COUNT_CACHE_TTL = float(os.environ.get("LIST_COUNT_CACHE_TTL", "30"))
+LIST_COUNT_CACHE_SIZE = int(os.environ.get("LIST_COUNT_CACHE_SIZE", "5000"))
+
+# exact: count_documents on every call; estimated: cached count, refreshed
+# after LIST_COUNT_CACHE_TTL; none: no count at all (has_more still works)
+COUNT_MODES = ("exact", "estimated", "none")
+
+
+class CountCache(LRUCache):
+    """Per-filter document counts with a short TTL"""
+    
+    def __init__(self, ttl: float = LIST_COUNT_CACHE_TTL, max_size: int = LIST_COUNT_CACHE_SIZE):
+        super().__init__(max_size, ttl)
+    
+    @staticmethod
+    def key(collection, query: dict) -> str:
+        return f"{collection.name}:{json.dumps(query, sort_keys=True, default=str)}"
+
+
+# Shared by every list endpoint in this process
+shared_count_cache = CountCache()
+
+
+async def count_total(
+    collection,
+    query: dict,
+    count_mode: str = "exact",
+    cache: Optional[CountCache] = None
+) -> Tuple[Optional[int], bool]:
+    """Total for a list query as (total, is_exact) according to count_mode"""
+    if count_mode not in COUNT_MODES:
+        raise ValueError(f"count_mode must be one of {', '.join(COUNT_MODES)}")
+    if count_mode == "none":
+        return None, False
+    if count_mode == "exact":
+        return await collection.count_documents(query), True
+    
+    cache = cache if cache is not None else shared_count_cache
+    key = cache.key(collection, query)
+    total = cache.get(key)
+    if total is not None:
+        return total, False
+    
+    # Unfiltered totals come from collection metadata instead of a scan
+    if query:
+        total = await collection.count_documents(query)
+    else:
+        total = await collection.estimated_document_count()
+    cache.set(key, total)
+    return total, bool(query)
@@ -0,0 +1,31 @@
+"""
+Query Audit - Explain-plan check of every list endpoint's query shape
+"""
+from typing import Dict, List
+
+from controllers.application_controller import APPLICATION_LIST
+from controllers.connection_controller import CONNECTION_LIST, MESSAGE_LIST
+from controllers.engineer_controller import ENGINEER_LIST
+from controllers.role_controller import ROLE_LIST
+from controllers.startup_controller import STARTUP_LIST
+from .query_builder import audit_list_queries
+
+# A representative filter per list endpoint; values only need the right shape
+LIST_QUERY_SAMPLES = {
+    "roles.list_roles": (ROLE_LIST, {"status": "active"}),
+    "roles.list_roles(startup)": (ROLE_LIST, {"status": "active", "startup_id": "startup_audit"}),
+    "engineers.list_engineers": (ENGINEER_LIST, {"availability": {"$ne": "not_looking"}}),
+    "engineers.list_engineers(availability)": (ENGINEER_LIST, {"availability": "actively_looking"}),
+    "startups.list_startups": (STARTUP_LIST, {}),
+    "startups.list_startups(industry)": (STARTUP_LIST, {"industry": "fintech"}),
+    "applications.get_engineer_applications": (APPLICATION_LIST, {"engineer_id": "user_audit"}),
+    "applications.get_role_applications": (APPLICATION_LIST, {"role_id": "role_audit"}),
+    "connections.get_user_connections(founder)": (CONNECTION_LIST, {"founder_id": "user_audit"}),
+    "connections.get_user_connections(engineer)": (CONNECTION_LIST, {"engineer_id": "user_audit"}),
+    "connections.get_messages": (MESSAGE_LIST, {"connection_id": "conn_audit"}),
+}
+
+
+async def audit_list_query_plans(db) -> Dict[str, List[str]]:
+    """Explain every list endpoint's query and log scans and in-memory sorts"""
+    return await audit_list_queries(db, LIST_QUERY_SAMPLES)
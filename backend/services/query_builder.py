@@ -0,0 +1,183 @@
+"""
+Query Builder - Consistent sort/range/limit/projection/hint for list queries
+"""
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import logging
+
+from pymongo import DESCENDING
+
+from .indexes import available_indexes
+from .pagination import keyset_filter, keyset_sort, encode_cursor
+
+logger = logging.getLogger(__name__)
+
+# full: every field the detail response needs; summary: list-card fields only
+LIST_VIEWS = ("summary", "full")
+
+
+def _is_equality(condition) -> bool:
+    """Whether a filter condition gives point bounds on an index"""
+    return not isinstance(condition, dict) or set(condition) == {"$eq"}
+
+
+class ListSpec:
+    """
+    How one list endpoint queries its collection: sort field and id
+    tie-breaker, the fields its response needs, and which index serves each
+    filter shape. Every query built from a spec is sorted first, then
+    range-seeked or skipped, then limited.
+    
+    A hint serves a filter when each of its fields is matched by equality
+    (a range on an index prefix would leave the sort to memory) and every
+    other filtered field is listed in filter_fields, to be applied while
+    walking the index. Any other filter shape is left to the query planner.
+    """
+    
+    def __init__(
+        self,
+        collection: str,
+        sort_field: str,
+        id_field: str,
+        fields: Optional[Iterable[str]] = None,
+        hints: Sequence[Tuple[Sequence[str], str]] = (),
+        direction: int = DESCENDING,
+        summary_fields: Optional[Iterable[str]] = None,
+        filter_fields: Iterable[str] = ()
+    ):
+        self.collection = collection
+        self.sort_field = sort_field
+        self.id_field = id_field
+        self.direction = direction
+        self.hints = list(hints)
+        self.filter_fields = {*filter_fields, sort_field, id_field}
+        
+        self.projection = self._projection(fields)
+        self.summary_projection = (
+            self._projection(summary_fields) if summary_fields is not None else self.projection
+        )
+    
+    def _projection(self, fields: Optional[Iterable[str]]) -> dict:
+        projection = {"_id": 0}
+        if fields is not None:
+            # Paging needs the sort key and id even if the response does not
+            projection.update({f: 1 for f in (*fields, self.sort_field, self.id_field)})
+        return projection
+    
+    def projection_for(self, view: str) -> dict:
+        """Projection for a list view ("summary" or "full")"""
+        if view not in LIST_VIEWS:
+            raise ValueError(f"view must be one of {', '.join(LIST_VIEWS)}")
+        return self.summary_projection if view == "summary" else self.projection
+    
+    def hint_for(self, query: dict) -> Optional[str]:
+        """Index for a filter: the first hint that serves its shape"""
+        for fields, index_name in self.hints:
+            if not all(f in query and _is_equality(query[f]) for f in fields):
+                continue
+            if any(f not in fields and f not in self.filter_fields for f in query):
+                continue
+            # Only hint indexes known to exist; hinting a missing index is an error
+            if index_name in available_indexes.get(self.collection, ()):
+                return index_name
+        return None
+    
+    def find(
+        self,
+        db,
+        query: dict,
+        page: int = 1,
+        page_size: int = 20,
+        after: Optional[str] = None,
+        projection: Optional[dict] = None
+    ):
+        """Cursor for one page; reads page_size + 1 documents to detect more"""
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1")
+        if page < 1:
+            raise ValueError("page must be at least 1")
+        
+        hint = self.hint_for(query)
+        if after:
+            query = {"$and": [
+                query,
+                keyset_filter(self.sort_field, self.id_field, after, self.direction)
+            ]}
+        
+        cursor = db[self.collection].find(query, projection or self.projection)
+        cursor = cursor.sort(keyset_sort(self.sort_field, self.id_field, self.direction))
+        if not after:
+            cursor = cursor.skip((page - 1) * page_size)
+        cursor = cursor.limit(page_size + 1)
+        if hint:
+            cursor = cursor.hint(hint)
+        return cursor
+    
+    async def fetch(
+        self,
+        db,
+        query: dict,
+        page: int = 1,
+        page_size: int = 20,
+        after: Optional[str] = None,
+        projection: Optional[dict] = None
+    ) -> Tuple[List[dict], bool, Optional[str]]:
+        """One page of documents as (docs, has_more, next_cursor)"""
+        cursor = self.find(db, query, page, page_size, after, projection)
+        docs = await cursor.to_list(page_size + 1)
+        has_more = len(docs) > page_size
+        docs = docs[:page_size]
+        
+        next_cursor = None
+        if has_more:
+            last = docs[-1]
+            next_cursor = encode_cursor(last.get(self.sort_field), last[self.id_field])
+        return docs, has_more, next_cursor
+    
+    async def explain(self, db, query: dict) -> dict:
+        """Query plan MongoDB picks for this spec and filter"""
+        return await self.find(db, query).explain()
+
+
+def plan_stages(plan: dict) -> List[str]:
+    """All stage names of the winning plan in an explain() result"""
+    planner = plan.get("queryPlanner", plan)
+    winning = planner.get("winningPlan", {})
+    
+    stages = []
+    pending = [winning]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, dict):
+            if "stage" in node:
+                stages.append(node["stage"])
+            pending.extend(node.values())
+        elif isinstance(node, list):
+            pending.extend(node)
+    return stages
+
+
+async def audit_list_queries(
+    db,
+    samples: Dict[str, Tuple[ListSpec, dict]]
+) -> Dict[str, List[str]]:
+    """
+    Explain a representative query per list endpoint and log any that scan
+    the whole collection or sort in memory. Returns the winning-plan stages
+    per endpoint.
+    """
+    report = {}
+    for name, (spec, query) in samples.items():
+        try:
+            stages = plan_stages(await spec.explain(db, query))
+        except Exception as e:
+            logger.error(f"Could not explain {name}: {e}")
+            continue
+        
+        report[name] = stages
+        if "COLLSCAN" in stages:
+            logger.warning(f"List query {name} does a collection scan: {stages}")
+        elif "SORT" in stages:
+            logger.warning(f"List query {name} sorts in memory: {stages}")
+        else:
+            logger.info(f"List query {name}: {stages}")
+    return report
@@ -0,0 +1,143 @@
+"""
+Realtime - Per-user pub/sub fanout of messages and notifications to WebSockets
+"""
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, List, Optional, Set
+from datetime import datetime, timezone
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Events buffered per open socket; a slow client loses the oldest first
+REALTIME_QUEUE_SIZE = int(os.environ.get("REALTIME_QUEUE_SIZE", "100"))
+
+EventHandler = Callable[[str, dict], None]
+
+
+class Broker(ABC):
+    """
+    Carries events between app workers. Each worker's hub subscribes to the
+    users that have a socket open on it; publish reaches every subscriber of
+    that user on any worker.
+    """
+    
+    @abstractmethod
+    async def publish(self, user_id: str, event: dict):
+        """Send an event to every subscriber of user_id"""
+        pass
+    
+    @abstractmethod
+    async def subscribe(self, user_id: str, handler: EventHandler):
+        """Call handler(user_id, event) for events published to user_id"""
+        pass
+    
+    @abstractmethod
+    async def unsubscribe(self, user_id: str, handler: EventHandler):
+        """Stop calling handler for user_id"""
+        pass
+
+
+class InMemoryBroker(Broker):
+    """Broker within one process; share one instance between hubs to simulate several workers"""
+    
+    def __init__(self):
+        self._handlers: Dict[str, Set[EventHandler]] = {}
+    
+    async def publish(self, user_id: str, event: dict):
+        for handler in list(self._handlers.get(user_id, ())):
+            handler(user_id, event)
+    
+    async def subscribe(self, user_id: str, handler: EventHandler):
+        self._handlers.setdefault(user_id, set()).add(handler)
+    
+    async def unsubscribe(self, user_id: str, handler: EventHandler):
+        handlers = self._handlers.get(user_id)
+        if handlers:
+            handlers.discard(handler)
+            if not handlers:
+                del self._handlers[user_id]
+
+
+class Subscription:
+    """Bounded event queue for one open socket; drops the oldest event when full"""
+    
+    def __init__(self, user_id: str, maxsize: int = REALTIME_QUEUE_SIZE):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+    
+    def put(self, event: dict):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+    
+    async def get(self) -> dict:
+        """Next event; a "resync" event first if any were dropped since the last one"""
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            return {"type": "resync", "data": {"dropped": dropped}}
+        return await self.queue.get()
+
+
+class RealtimeHub:
+    """Sockets open on this worker, per user, fed from the broker"""
+    
+    def __init__(self, broker: Optional[Broker] = None, queue_size: int = REALTIME_QUEUE_SIZE):
+        self.broker = broker if broker is not None else InMemoryBroker()
+        self.queue_size = queue_size
+        self._local: Dict[str, Set[Subscription]] = {}
+    
+    async def connect(self, user_id: str) -> Subscription:
+        """Register a socket for user_id"""
+        subscription = Subscription(user_id, self.queue_size)
+        subscriptions = self._local.setdefault(user_id, set())
+        first = not subscriptions
+        subscriptions.add(subscription)
+        if first:
+            await self.broker.subscribe(user_id, self._deliver)
+        return subscription
+    
+    async def disconnect(self, subscription: Subscription):
+        """Unregister a socket"""
+        subscriptions = self._local.get(subscription.user_id)
+        if not subscriptions:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._local[subscription.user_id]
+            await self.broker.unsubscribe(subscription.user_id, self._deliver)
+    
+    def connected_users(self) -> int:
+        """Users with at least one socket open on this worker"""
+        return len(self._local)
+    
+    def connected_user_ids(self) -> List[str]:
+        """Ids of the users with a socket open on this worker"""
+        return list(self._local)
+    
+    async def publish(self, user_id: str, event_type: str, data: dict):
+        """Send an event to every socket user_id has open, on any worker"""
+        await self.publish_many([user_id], event_type, data)
+    
+    async def publish_many(self, user_ids: Iterable[str], event_type: str, data: dict):
+        """Send the same event to several users"""
+        event = {
+            "type": event_type,
+            "data": data,
+            "published_at": datetime.now(timezone.utc).isoformat()
+        }
+        for user_id in set(user_ids):
+            if not user_id:
+                continue
+            # Delivery is best-effort; the write that triggered it has already succeeded
+            try:
+                await self.broker.publish(user_id, event)
+            except Exception as e:
+                logger.error(f"Realtime publish to {user_id} failed: {e}")
+    
+    def _deliver(self, user_id: str, event: dict):
+        for subscription in self._local.get(user_id, ()):
+            subscription.put(event)
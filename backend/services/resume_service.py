@@ -9,6 +9,7 @@ from datetime import datetime, timezone
 import uuid
 
 from llm import LLMService
+from .embedding_pipeline import EmbeddingPipeline
 
 logger = logging.getLogger(__name__)
 
@@ -20,9 +21,15 @@ class ResumeService:
     ALLOWED_EXTENSIONS = {".pdf", ".docx", ".doc", ".txt"}
     MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
     
-    def __init__(self, db, llm_service: Optional[LLMService] = None):
+    def __init__(
+        self,
+        db,
+        llm_service: Optional[LLMService] = None,
+        embedding_pipeline: Optional[EmbeddingPipeline] = None
+    ):
         self.db = db
         self.llm = llm_service
+        self.embedding_pipeline = embedding_pipeline
         self.UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
     
     async def upload_resume(
@@ -112,6 +119,9 @@ class ResumeService:
             }}
         )
         
+        if self.embedding_pipeline:
+            self.embedding_pipeline.schedule_engineer(resume["user_id"])
+        
         return parsed_data
     
     async def _extract_text(self, file_path: Path, file_type: str) -> str:
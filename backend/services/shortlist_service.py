@@ -0,0 +1,267 @@
+"""
+Shortlist Service - Materialized per-role candidate shortlists
+"""
+from typing import List, Dict, Optional
+from datetime import datetime, timezone, timedelta
+import logging
+import os
+import time
+
+from pymongo import UpdateOne
+
+from .background import CoalescingWorker
+from .batch_scorer import EngineerBatch, RoleBatch
+from .matching_service import MatchingService, MIN_MATCH_SCORE
+
+logger = logging.getLogger(__name__)
+
+# Candidates kept per role in role_matches
+ROLE_SHORTLIST_SIZE = int(os.environ.get("ROLE_SHORTLIST_SIZE", "50"))
+# Shortlists older than this many seconds are rebuilt by the background sweep
+ROLE_SHORTLIST_MAX_AGE = int(os.environ.get("ROLE_SHORTLIST_MAX_AGE", "3600"))
+# Seconds between sweeps for missing, stale, or expired shortlists
+ROLE_SHORTLIST_SWEEP_INTERVAL = float(os.environ.get("ROLE_SHORTLIST_SWEEP_INTERVAL", "60"))
+ROLE_SHORTLIST_FLUSH_INTERVAL = float(os.environ.get("ROLE_SHORTLIST_FLUSH_INTERVAL", "5"))
+ROLE_SHORTLIST_BATCH_SIZE = int(os.environ.get("ROLE_SHORTLIST_BATCH_SIZE", "50"))
+
+
+class ShortlistService(CoalescingWorker):
+    """
+    Keeps the top candidates of every active role in the role_matches
+    collection. Role writes rebuild that role's shortlist; profile writes
+    re-score just that engineer against active roles and patch the affected
+    shortlists in place. Reads are a single lookup by role_id.
+    
+    Every entry keeps its rule-based score next to match_score (the AI score
+    when an LLM is configured), so a profile edit only AI-scores roles where
+    the engineer's rule score reaches that shortlist's window.
+    """
+    
+    kinds = ("role", "engineer")
+    name = "Shortlist refresh"
+    
+    def __init__(
+        self,
+        db,
+        matching_service: MatchingService,
+        size: int = ROLE_SHORTLIST_SIZE,
+        max_age: int = ROLE_SHORTLIST_MAX_AGE,
+        sweep_interval: float = ROLE_SHORTLIST_SWEEP_INTERVAL,
+        batch_size: int = ROLE_SHORTLIST_BATCH_SIZE,
+        flush_interval: float = ROLE_SHORTLIST_FLUSH_INTERVAL
+    ):
+        super().__init__(batch_size, flush_interval)
+        self.db = db
+        self.matching = matching_service
+        self.size = size
+        self.max_age = max_age
+        self.sweep_interval = sweep_interval
+        self._last_sweep = 0.0
+    
+    def schedule_role(self, role_id: str):
+        """Queue a role's shortlist for rebuilding"""
+        self.schedule("role", role_id)
+    
+    def schedule_engineer(self, user_id: str):
+        """Queue an engineer for re-scoring against active roles"""
+        self.schedule("engineer", user_id)
+    
+    async def invalidate_role(self, role_id: str):
+        """Flag a role's shortlist as stale and queue it for rebuilding"""
+        await self.db.role_matches.update_one(
+            {"role_id": role_id},
+            {"$set": {"stale": True}}
+        )
+        self.schedule_role(role_id)
+    
+    async def process(self, kind: str, ids: List[str]) -> int:
+        if kind == "role":
+            for role_id in ids:
+                await self.refresh_role(role_id)
+            return len(ids)
+        return await self.apply_engineer_updates(ids)
+    
+    async def on_idle(self):
+        if time.monotonic() - self._last_sweep >= self.sweep_interval:
+            self._last_sweep = time.monotonic()
+            await self.refresh_stale()
+    
+    async def refresh_role(self, role_id: str) -> Optional[dict]:
+        """Recompute and store the full shortlist for one role"""
+        role = await self.db.roles.find_one({"role_id": role_id}, {"_id": 0})
+        if not role or role.get("status") != "active":
+            await self.db.role_matches.delete_one({"role_id": role_id})
+            return None
+        
+        matches = await self.matching.find_matching_candidates(role_id, limit=self.size)
+        rule_scores = EngineerBatch(matches).score_role(role) if matches else []
+        now = datetime.now(timezone.utc).isoformat()
+        shortlist = {
+            "role_id": role_id,
+            "candidates": [
+                {
+                    "user_id": match["user_id"],
+                    "match_score": match["match_score"],
+                    "rule_score": float(rule_score)
+                }
+                for match, rule_score in zip(matches, rule_scores)
+            ],
+            "computed_at": now,
+            "updated_at": now,
+            "stale": False
+        }
+        
+        await self.db.role_matches.update_one(
+            {"role_id": role_id},
+            {"$set": shortlist},
+            upsert=True
+        )
+        return shortlist
+    
+    async def apply_engineer_updates(self, user_ids: List[str]) -> int:
+        """Re-score engineers against active roles and patch existing shortlists"""
+        # Drop the old entries first; updated scores are pushed back below
+        await self.db.role_matches.update_many(
+            {"candidates.user_id": {"$in": user_ids}},
+            {"$pull": {"candidates": {"user_id": {"$in": user_ids}}}}
+        )
+        
+        cursor = self.db.engineer_profiles.find(
+            {"user_id": {"$in": user_ids}, "availability": {"$ne": "not_looking"}},
+            {"_id": 0}
+        )
+        engineers = [engineer async for engineer in cursor]
+        if not engineers:
+            return 0
+        
+        roles = await self.db.roles.find({"status": "active"}, {"_id": 0}).to_list(None)
+        if not roles:
+            return 0
+        batch = RoleBatch(roles)
+        now = datetime.now(timezone.utc).isoformat()
+        
+        # Lowest rule score an engineer needs to enter each shortlist; roles
+        # without a shortlist yet are picked up by the sweep instead
+        windows = {}
+        cursor = self.db.role_matches.find({}, {"_id": 0, "role_id": 1, "candidates.rule_score": 1})
+        async for shortlist in cursor:
+            candidates = shortlist.get("candidates") or []
+            if len(candidates) < self.size:
+                windows[shortlist["role_id"]] = MIN_MATCH_SCORE
+            else:
+                # Entries from before rule scores were stored never let anyone in
+                windows[shortlist["role_id"]] = min(
+                    entry.get("rule_score", float("inf")) for entry in candidates
+                )
+        
+        pairs = []
+        rule_scores = []
+        for engineer in engineers:
+            skills = set(engineer.get("skills") or [])
+            scores = batch.score_engineer(engineer)
+            
+            for role, score in zip(roles, scores):
+                # Same candidate pre-filter as find_matching_candidates
+                required = role.get("skills_required") or []
+                if required and not skills.intersection(required):
+                    continue
+                window = windows.get(role["role_id"])
+                if window is not None and score >= max(window, MIN_MATCH_SCORE):
+                    pairs.append((engineer, role))
+                    rule_scores.append(float(score))
+        
+        if self.matching.llm and pairs:
+            scores = await self.matching.ai_score_pairs(pairs)
+        else:
+            scores = rule_scores
+        
+        operations = [
+            UpdateOne(
+                {"role_id": role["role_id"]},
+                {
+                    "$push": {"candidates": {
+                        "$each": [{
+                            "user_id": engineer["user_id"],
+                            "match_score": score,
+                            "rule_score": rule_score
+                        }],
+                        "$sort": {"match_score": -1},
+                        "$slice": self.size
+                    }},
+                    "$set": {"updated_at": now}
+                }
+            )
+            for (engineer, role), score, rule_score in zip(pairs, scores, rule_scores)
+            if score >= MIN_MATCH_SCORE
+        ]
+        
+        if operations:
+            await self.db.role_matches.bulk_write(operations, ordered=False)
+        return len(engineers)
+    
+    async def refresh_stale(self) -> int:
+        """Queue active roles whose shortlist is missing, flagged stale, or expired"""
+        cutoff = (datetime.now(timezone.utc) - timedelta(seconds=self.max_age)).isoformat()
+        
+        active = {
+            role["role_id"]
+            async for role in self.db.roles.find({"status": "active"}, {"_id": 0, "role_id": 1})
+        }
+        fresh = {
+            doc["role_id"]
+            async for doc in self.db.role_matches.find(
+                {"stale": False, "computed_at": {"$gte": cutoff}},
+                {"_id": 0, "role_id": 1}
+            )
+        }
+        
+        due = active - fresh
+        for role_id in due:
+            self.schedule_role(role_id)
+        return len(due)
+    
+    async def get_shortlist(
+        self,
+        role_id: str,
+        limit: int = 20,
+        force_refresh: bool = False
+    ) -> Dict:
+        """
+        Get the precomputed top candidates for a role.
+        A missing shortlist, or force_refresh, is computed inline; a stale or
+        expired one is returned as-is and queued for a background rebuild.
+        """
+        shortlist = None
+        if not force_refresh:
+            shortlist = await self.db.role_matches.find_one({"role_id": role_id}, {"_id": 0})
+        
+        if shortlist is None:
+            shortlist = await self.refresh_role(role_id)
+            if shortlist is None:
+                raise ValueError("Role not found or not active")
+        
+        computed_at = datetime.fromisoformat(shortlist["computed_at"])
+        age = (datetime.now(timezone.utc) - computed_at).total_seconds()
+        stale = shortlist.get("stale", False) or role_id in self._pending["role"]
+        expired = age > self.max_age
+        if (stale or expired) and role_id not in self._pending["role"]:
+            self.schedule_role(role_id)
+        
+        entries = shortlist["candidates"][:limit]
+        cursor = self.db.engineer_profiles.find(
+            {"user_id": {"$in": [entry["user_id"] for entry in entries]}},
+            {"_id": 0}
+        )
+        profiles = {profile["user_id"]: profile async for profile in cursor}
+        
+        return {
+            "role_id": role_id,
+            "candidates": [
+                {**profiles[entry["user_id"]], "match_score": entry["match_score"]}
+                for entry in entries
+                if entry["user_id"] in profiles
+            ],
+            "computed_at": computed_at,
+            "age_seconds": age,
+            "stale": stale or expired
+        }
@@ -0,0 +1,81 @@
+"""
+Test fixtures - In-memory MongoDB with the async API the services use
+"""
+import mongomock
+import pytest
+
+
+class AsyncCursor:
+    """Motor-style cursor over a mongomock cursor or result list"""
+    
+    def __init__(self, cursor):
+        self._cursor = cursor
+    
+    def sort(self, *args, **kwargs):
+        self._cursor = self._cursor.sort(*args, **kwargs)
+        return self
+    
+    def skip(self, count):
+        self._cursor = self._cursor.skip(count)
+        return self
+    
+    def limit(self, count):
+        self._cursor = self._cursor.limit(count)
+        return self
+    
+    def hint(self, index):
+        return self
+    
+    def batch_size(self, size):
+        return self
+    
+    def __aiter__(self):
+        self._iterator = iter(self._cursor)
+        return self
+    
+    async def __anext__(self):
+        try:
+            return next(self._iterator)
+        except StopIteration:
+            raise StopAsyncIteration
+    
+    async def to_list(self, length=None):
+        docs = list(self._cursor)
+        return docs if length is None else docs[:length]
+
+
+class AsyncCollection:
+    """Motor-style collection: queries return cursors, everything else is awaitable"""
+    
+    def __init__(self, collection):
+        self._collection = collection
+        self.name = collection.name
+    
+    def find(self, *args, **kwargs):
+        return AsyncCursor(self._collection.find(*args, **kwargs))
+    
+    def aggregate(self, pipeline, **kwargs):
+        return AsyncCursor(list(self._collection.aggregate(pipeline, **kwargs)))
+    
+    def __getattr__(self, name):
+        method = getattr(self._collection, name)
+        
+        async def call(*args, **kwargs):
+            return method(*args, **kwargs)
+        return call
+
+
+class AsyncDatabase:
+    def __init__(self):
+        self._db = mongomock.MongoClient().db
+    
+    def __getattr__(self, name):
+        return AsyncCollection(self._db[name])
+    
+    def __getitem__(self, name):
+        return AsyncCollection(self._db[name])
+
+
+@pytest.fixture
+def db():
+    return AsyncDatabase()
@@ -0,0 +1,169 @@
+import asyncio
+
+import pytest
+
+from controllers.application_controller import ApplicationController
+from schemas.application import ApplicationBulkUpdate, ApplicationCreate, ApplicationStatus, ApplicationUpdate
+
+
+async def _seed(db):
+    await db.applications.create_index([("role_id", 1), ("engineer_id", 1)], unique=True)
+    await db.startups.insert_one({"startup_id": "startup_1", "founder_id": "founder_1", "name": "Acme"})
+    await db.roles.insert_one({
+        "role_id": "role_1",
+        "startup_id": "startup_1",
+        "title": "Backend engineer",
+        "status": "active",
+        "applications_count": 0
+    })
+
+
+class _Missing:
+    """Collection proxy whose method finds nothing, as when racing a concurrent request"""
+    
+    def __init__(self, collection, method):
+        self._collection = collection
+        self._method = method
+    
+    def __getattr__(self, name):
+        if name == self._method:
+            async def missing(*args, **kwargs):
+                return None
+            return missing
+        return getattr(self._collection, name)
+
+
+class _Proxy:
+    def __init__(self, db, **collections):
+        self._db = db
+        self._collections = collections
+    
+    def __getattr__(self, name):
+        return self._collections.get(name) or getattr(self._db, name)
+
+
+def test_concurrent_apply_is_rejected_without_counting(db):
+    async def run():
+        await _seed(db)
+        data = ApplicationCreate(role_id="role_1")
+        await ApplicationController(db).create_application("engineer_1", data)
+        
+        racing_db = _Proxy(db, applications=_Missing(db.applications, "find_one"))
+        with pytest.raises(ValueError, match="already applied"):
+            await ApplicationController(racing_db).create_application("engineer_1", data)
+        
+        role = await db.roles.find_one({"role_id": "role_1"})
+        return role["applications_count"], await db.applications.count_documents({})
+    
+    assert asyncio.run(run()) == (1, 1)
+
+
+def test_status_update_of_a_deleted_application_is_not_found(db):
+    async def run():
+        await _seed(db)
+        application = await ApplicationController(db).create_application(
+            "engineer_1", ApplicationCreate(role_id="role_1")
+        )
+        
+        deleted_db = _Proxy(db, applications=_Missing(db.applications, "find_one_and_update"))
+        with pytest.raises(ValueError, match="Application not found"):
+            await ApplicationController(deleted_db).update_application_status(
+                application.application_id, "founder_1", ApplicationUpdate(status=ApplicationStatus.REVIEWED)
+            )
+    
+    asyncio.run(run())
+
+
+async def _seed_bulk(db):
+    await _seed(db)
+    await db.startups.insert_one({"startup_id": "startup_2", "founder_id": "founder_2", "name": "Other"})
+    await db.roles.update_one({"role_id": "role_1"}, {"$set": {"applications_count": 2}})
+    await db.roles.insert_many([
+        {"role_id": "role_2", "startup_id": "startup_1", "status": "active", "applications_count": 1},
+        {"role_id": "role_3", "startup_id": "startup_2", "status": "active", "applications_count": 1}
+    ])
+    await db.applications.insert_many([
+        {"application_id": f"app_{i}", "role_id": role_id, "startup_id": startup_id,
+         "engineer_id": f"engineer_{i}", "status": status}
+        for i, (role_id, startup_id, status) in enumerate([
+            ("role_1", "startup_1", "pending"),
+            ("role_1", "startup_1", "withdrawn"),
+            ("role_1", "startup_1", "reviewed"),
+            ("role_2", "startup_1", "rejected"),
+            ("role_3", "startup_2", "pending")
+        ])
+    ])
+
+
+async def _applications_counts(db):
+    return {role["role_id"]: role["applications_count"] async for role in db.roles.find({})}
+
+
+def test_bulk_status_update_reports_and_counts(db):
+    async def run():
+        await _seed_bulk(db)
+        result = await ApplicationController(db).bulk_update_application_status(
+            "founder_1",
+            ApplicationBulkUpdate(
+                application_ids=["app_0", "app_1", "app_3", "app_4", "app_missing", "app_0"],
+                status=ApplicationStatus.REJECTED
+            )
+        )
+        return result, await _applications_counts(db)
+    
+    result, counts = asyncio.run(run())
+    
+    assert result.updated == ["app_0", "app_1"]
+    assert result.unchanged == ["app_3"]
+    # Another founder's application and an unknown id
+    assert result.skipped == ["app_4", "app_missing"]
+    # Only the withdrawn application becomes counted again
+    assert counts == {"role_1": 3, "role_2": 1, "role_3": 1}
+
+
+def test_bulk_withdraw_uncounts_applications(db):
+    async def run():
+        await _seed_bulk(db)
+        await ApplicationController(db).bulk_update_application_status(
+            "founder_1",
+            ApplicationBulkUpdate(application_ids=["app_0", "app_1", "app_3"], status=ApplicationStatus.WITHDRAWN)
+        )
+        return await _applications_counts(db)
+    
+    assert asyncio.run(run()) == {"role_1": 1, "role_2": 0, "role_3": 1}
+
+
+class _ChangedBeforeWrite:
+    """Applications proxy that rejects app_0 just before bulk_write, as a concurrent request would"""
+    
+    def __init__(self, collection):
+        self._collection = collection
+    
+    def __getattr__(self, name):
+        attr = getattr(self._collection, name)
+        if name != "bulk_write":
+            return attr
+        
+        async def bulk_write(*args, **kwargs):
+            await self._collection.update_one({"application_id": "app_0"}, {"$set": {"status": "rejected"}})
+            return await attr(*args, **kwargs)
+        return bulk_write
+
+
+def test_bulk_status_update_skips_applications_changed_concurrently(db):
+    async def run():
+        await _seed_bulk(db)
+        racing_db = _Proxy(db, applications=_ChangedBeforeWrite(db.applications))
+        result = await ApplicationController(racing_db).bulk_update_application_status(
+            "founder_1",
+            ApplicationBulkUpdate(application_ids=["app_0", "app_2"], status=ApplicationStatus.WITHDRAWN)
+        )
+        app = await db.applications.find_one({"application_id": "app_0"})
+        return result, app["status"], await _applications_counts(db)
+    
+    result, status, counts = asyncio.run(run())
+    
+    assert (result.updated, result.unchanged, result.skipped) == (["app_2"], [], ["app_0"])
+    # The concurrent rejection is kept, and role_1 is recounted rather than decremented twice
+    assert status == "rejected"
+    assert counts["role_1"] == 1
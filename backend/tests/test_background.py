@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+from services.background import CoalescingWorker
+
+
+class _Recorder(CoalescingWorker):
+    """Records batches; fails the first `failures` calls, or blocks each call until release is set"""
+    
+    kinds = ("a", "b")
+    
+    def __init__(self, batch_size: int = 2, flush_interval: float = 60, failures: int = 0, block: bool = False):
+        super().__init__(batch_size, flush_interval)
+        self.batches = []
+        self.failures = failures
+        self.entered = asyncio.Event()
+        self.release = asyncio.Event()
+        if not block:
+            self.release.set()
+    
+    async def process(self, kind, ids):
+        self.entered.set()
+        await self.release.wait()
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("write failed")
+        self.batches.append((kind, ids))
+        return len(ids)
+
+
+def test_flush_dedupes_and_batches_per_kind():
+    async def run():
+        worker = _Recorder(batch_size=2)
+        for kind, doc_id in [("a", "1"), ("a", "2"), ("a", "1"), ("a", "3"), ("b", "9")]:
+            worker.schedule(kind, doc_id)
+        return await worker.flush(), worker.batches, worker.pending_count
+    
+    processed, batches, pending = asyncio.run(run())
+    
+    assert processed == 4
+    assert batches == [("a", ["1", "2"]), ("b", ["9"]), ("a", ["3"])]
+    assert pending == 0
+
+
+def test_failed_batch_is_requeued_for_the_next_flush():
+    async def run():
+        worker = _Recorder(batch_size=5, failures=1)
+        worker.schedule("a", "1")
+        worker.schedule("a", "2")
+        with pytest.raises(RuntimeError):
+            await worker.flush()
+        requeued = worker.pending_count
+        await worker.flush()
+        return requeued, worker.batches
+    
+    assert asyncio.run(run()) == (2, [("a", ["1", "2"])])
+
+
+def test_cancelled_batch_is_requeued():
+    async def run():
+        worker = _Recorder(batch_size=5, block=True)
+        worker.schedule("a", "1")
+        flush = asyncio.create_task(worker.flush())
+        await worker.entered.wait()
+        flush.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await flush
+        return worker.pending_count
+    
+    assert asyncio.run(run()) == 1
+
+
+def test_full_batch_wakes_the_worker():
+    async def run():
+        worker = _Recorder(batch_size=2)
+        worker.start()
+        worker.schedule("a", "1")
+        worker.schedule("a", "2")
+        await asyncio.wait_for(worker.entered.wait(), timeout=1)
+        await worker.stop()
+        return worker.batches
+    
+    assert asyncio.run(run()) == [("a", ["1", "2"])]
+
+
+def test_stop_finishes_the_batch_in_progress_and_flushes_the_rest():
+    async def run():
+        worker = _Recorder(batch_size=1, block=True)
+        worker.start()
+        worker.schedule("a", "1")
+        await asyncio.wait_for(worker.entered.wait(), timeout=1)
+        # Queued while the first batch is inside process()
+        worker.schedule("b", "2")
+        stopping = asyncio.create_task(worker.stop())
+        await asyncio.sleep(0)
+        worker.release.set()
+        await stopping
+        return worker.batches, worker.pending_count
+    
+    assert asyncio.run(run()) == ([("a", ["1"]), ("b", ["2"])], 0)
+
+
+def test_workers_must_implement_process():
+    class _Incomplete(CoalescingWorker):
+        kinds = ("a",)
+    
+    with pytest.raises(TypeError):
+        _Incomplete(batch_size=1, flush_interval=1)
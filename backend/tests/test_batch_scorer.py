@@ -0,0 +1,64 @@
+import random
+
+from services.batch_scorer import EXPERIENCE_RANGES, EngineerBatch, RoleBatch
+from services.matching_service import MatchingService
+
+SKILLS = ["Python", "python", "Go", "React", "SQL", "Kubernetes", "rust"]
+LOCATIONS = ["Berlin", "berlin", "London", "NYC", "Remote"]
+LEVELS = [*EXPERIENCE_RANGES, "staff"]
+PREFERENCES = ["any", "remote", "onsite", "hybrid", "flexible"]
+
+
+def _engineer(rng: random.Random, i: int) -> dict:
+    engineer = {
+        "user_id": f"engineer_{i}",
+        "skills": rng.sample(SKILLS, rng.randint(0, 4)),
+        "preferred_locations": rng.sample(LOCATIONS, rng.randint(0, 2)),
+        "work_preference": rng.choice(PREFERENCES)
+    }
+    # Missing experience counts as none
+    if rng.random() < 0.9:
+        engineer["experience_years"] = rng.choice([0, 1, 1.5, 2, 4, 5, 8, 12, 20, 35])
+    return engineer
+
+
+def _role(rng: random.Random, i: int) -> dict:
+    return {
+        "role_id": f"role_{i}",
+        "skills_required": rng.sample(SKILLS, rng.randint(0, 4)),
+        "experience_level": rng.choice(LEVELS),
+        "remote_allowed": rng.random() < 0.5,
+        "location": rng.choice(LOCATIONS)
+    }
+
+
+def _profiles(seed: int = 7):
+    rng = random.Random(seed)
+    return [_engineer(rng, i) for i in range(60)], [_role(rng, i) for i in range(40)]
+
+
+def test_engineer_batch_matches_rule_based_score(db):
+    matching = MatchingService(db)
+    engineers, roles = _profiles()
+    batch = EngineerBatch(engineers)
+    
+    for role in roles:
+        expected = [matching._rule_based_match_score(engineer, role) for engineer in engineers]
+        assert batch.score_role(role).tolist() == expected
+
+
+def test_role_batch_matches_rule_based_score(db):
+    matching = MatchingService(db)
+    engineers, roles = _profiles()
+    batch = RoleBatch(roles)
+    
+    for engineer in engineers:
+        expected = [matching._rule_based_match_score(engineer, role) for role in roles]
+        assert batch.score_engineer(engineer).tolist() == expected
+
+
+def test_empty_batches_score_nothing():
+    engineers, roles = _profiles()
+    
+    assert EngineerBatch([]).score_role(roles[0]).tolist() == []
+    assert RoleBatch([]).score_engineer(engineers[0]).tolist() == []
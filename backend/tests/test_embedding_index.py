@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from services.embedding_index import VectorIndex
+
+
+def _random_vectors(count: int, dim: int = 32, seed: int = 1) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal((count, dim)).astype(np.float32)
+
+
+def _clustered_vectors(count: int, clusters: int = 40, dim: int = 32, seed: int = 1) -> np.ndarray:
+    """Points around a few topics, like real profile and role embeddings"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim))
+    points = centers[rng.integers(clusters, size=count)] + 0.3 * rng.standard_normal((count, dim))
+    return points.astype(np.float32)
+
+
+def test_search_returns_most_similar_first():
+    index = VectorIndex()
+    index.upsert(["a", "b", "c"], [[1, 0, 0], [0.8, 0.6, 0], [0, 0, 1]])
+    
+    hits = index.search([1, 0, 0], k=2)
+    
+    assert [doc_id for doc_id, _ in hits] == ["a", "b"]
+    assert hits[0][1] == np.float32(1.0)
+    assert round(hits[1][1], 4) == 0.8
+
+
+def test_upsert_replaces_and_remove_compacts():
+    index = VectorIndex()
+    index.upsert(["a", "b", "c"], [[1, 0], [0, 1], [-1, 0]])
+    index.upsert(["a"], [[0, -1]])
+    index.remove(["b", "missing"])
+    
+    assert len(index) == 2
+    assert "b" not in index
+    assert index.search([0, -1], k=1)[0][0] == "a"
+    assert index.search([-1, 0], k=1)[0][0] == "c"
+
+
+def test_rejects_mismatched_dimensions():
+    index = VectorIndex()
+    index.upsert(["a"], [[1, 0, 0]])
+    
+    with pytest.raises(ValueError):
+        index.upsert(["b"], [[1, 0]])
+
+
+def test_ivf_recall_against_exact_search():
+    vectors, queries = np.split(_clustered_vectors(4050), [4000])
+    ids = [f"doc{i}" for i in range(len(vectors))]
+    exact = VectorIndex(ivf_threshold=len(vectors) + 1)
+    exact.upsert(ids, vectors)
+    ivf = VectorIndex(ivf_threshold=1000, n_probe=16)
+    ivf.upsert(ids, vectors)
+    ivf.build_ivf()
+    assert ivf.centroids is not None
+    
+    k = 10
+    found = 0
+    for query in queries:
+        expected = {doc_id for doc_id, _ in exact.search(query, k)}
+        found += len(expected & {doc_id for doc_id, _ in ivf.search(query, k)})
+    
+    assert found / (len(queries) * k) >= 0.9
+
+
+def test_ivf_assigns_rows_added_after_build():
+    vectors = _random_vectors(2000)
+    index = VectorIndex(ivf_threshold=1000, n_probe=4)
+    index.upsert([f"doc{i}" for i in range(len(vectors))], vectors)
+    index.build_ivf()
+    
+    query = _random_vectors(1, seed=3)[0]
+    index.upsert(["new"], [query])
+    
+    assert index.search(query, k=1)[0][0] == "new"
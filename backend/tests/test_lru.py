@@ -0,0 +1,58 @@
+from services import lru
+from services.lru import LRUCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUCache(2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    
+    assert cache.keys() == ["a", "c"]
+    assert cache.get("b") is None
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(lru.time, "monotonic", clock)
+    cache = LRUCache(10, ttl=5)
+    cache.set("a", 1)
+    clock.now = 3
+    cache.set("b", 2)
+    clock.now = 6
+    
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert cache.keys() == ["b"]
+
+
+def test_replace_keeps_the_expiry(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(lru.time, "monotonic", clock)
+    cache = LRUCache(10, ttl=5)
+    cache.set("a", 1)
+    clock.now = 4
+    
+    assert cache.replace("a", 2)
+    assert not cache.replace("missing", 1)
+    assert cache.get("a") == 2
+    clock.now = 5
+    assert cache.get("a") is None
+
+
+def test_discard_where_drops_matching_values():
+    cache = LRUCache(10)
+    for key, role_id in [("a", "r1"), ("b", "r2"), ("c", "r1")]:
+        cache.set(key, {"role_id": role_id})
+    cache.discard_where(lambda entry: entry["role_id"] == "r1")
+    
+    assert cache.keys() == ["b"]
@@ -0,0 +1,52 @@
+import asyncio
+
+from services.lru import LRUCache
+from services.match_cache import MatchScoreCache
+from services.matching_service import MatchingService
+
+
+class _CountingMatching(MatchingService):
+    """Scores a pair by its engineer's index and tracks LLM calls in flight"""
+    
+    def __init__(self, db, **kwargs):
+        super().__init__(db, match_cache=MatchScoreCache(db, LRUCache(100)), **kwargs)
+        self.in_flight = 0
+        self.peak = 0
+        self.scored = []
+    
+    async def _ai_match_score(self, engineer, role):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01 * (5 - engineer["i"] % 5))
+        self.in_flight -= 1
+        self.scored.append(engineer["user_id"])
+        return engineer["i"] / 10
+
+
+def _pairs(n: int):
+    role = {"role_id": "role_1", "skills_required": ["Python"]}
+    return [({"user_id": f"engineer_{i}", "i": i, "experience_years": i}, role) for i in range(n)]
+
+
+def test_ai_score_pairs_keeps_order_within_the_concurrency_limit(db):
+    async def run():
+        matching = _CountingMatching(db, ai_concurrency=2)
+        return await matching.ai_score_pairs(_pairs(6)), matching.peak
+    
+    scores, peak = asyncio.run(run())
+    
+    assert scores == [0.0, 0.1, 0.2, 0.3, 0.4, 0.5]
+    assert peak == 2
+
+
+def test_ai_score_pairs_skips_the_llm_for_cached_scores(db):
+    async def run():
+        matching = _CountingMatching(db)
+        pairs = _pairs(3)
+        await matching.cache.set(*pairs[1], 0.9)
+        return await matching.ai_score_pairs(pairs), matching.scored
+    
+    scores, scored = asyncio.run(run())
+    
+    assert scores == [0.0, 0.9, 0.2]
+    assert sorted(scored) == ["engineer_0", "engineer_2"]
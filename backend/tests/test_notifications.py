@@ -0,0 +1,109 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from services.notification_digest import NotificationDigestBuilder
+from services.notification_service import NotificationService, UnreadCounter
+
+
+class _Merging:
+    """Notifications proxy that runs a trailing $merge stage itself; mongomock has none"""
+    
+    def __init__(self, db):
+        self._db = db
+        self._collection = db.notifications
+    
+    def aggregate(self, pipeline, **kwargs):
+        if "$merge" not in pipeline[-1]:
+            return self._collection.aggregate(pipeline, **kwargs)
+        merge = pipeline[-1]["$merge"]
+        rows = self._collection.aggregate(pipeline[:-1], **kwargs)
+        target = self._db[merge["into"]]
+        
+        class _Cursor:
+            async def to_list(self, length=None):
+                for row in await rows.to_list(None):
+                    await target.replace_one({merge["on"]: row[merge["on"]]}, row, upsert=True)
+                return []
+        
+        return _Cursor()
+    
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+
+class _Proxy:
+    def __init__(self, db, **collections):
+        self._db = db
+        self._collections = collections
+    
+    def __getattr__(self, name):
+        return self._collections.get(name) or getattr(self._db, name)
+    
+    def __getitem__(self, name):
+        return self._collections.get(name) or self._db[name]
+
+
+async def _message(notifications: NotificationService, key: str = "new_message:conn_1"):
+    return await notifications.create_notification(
+        "user_1", "new_message", "New message", "You have a new message", coalesce_key=key
+    )
+
+
+def test_coalesced_events_update_one_unread_notification(db):
+    async def run():
+        notifications = NotificationService(db, unread=UnreadCounter())
+        first = await _message(notifications)
+        await _message(notifications)
+        last = await _message(notifications)
+        other = await _message(notifications, "new_message:conn_2")
+        return first, last, other, await notifications.get_unread_count("user_1")
+    
+    first, last, other, unread = asyncio.run(run())
+    
+    assert last["notification_id"] == first["notification_id"]
+    assert last["count"] == 3
+    assert last["first_at"] == first["first_at"]
+    assert last["created_at"] == last["last_at"] >= first["created_at"]
+    assert other["notification_id"] != first["notification_id"]
+    assert unread == 2
+
+
+def test_read_coalesced_notification_starts_a_new_one(db):
+    async def run():
+        notifications = NotificationService(db, unread=UnreadCounter())
+        first = await _message(notifications)
+        await notifications.mark_as_read(first["notification_id"], "user_1")
+        second = await _message(notifications)
+        return first, second, await notifications.get_unread_count("user_1")
+    
+    first, second, unread = asyncio.run(run())
+    
+    assert second["notification_id"] != first["notification_id"]
+    assert second["count"] == 1
+    assert unread == 1
+
+
+def test_digest_counts_only_events_since_the_last_digest(db):
+    async def run():
+        notifications = NotificationService(db, unread=UnreadCounter())
+        digests = NotificationDigestBuilder(_Proxy(db, notifications=_Merging(db)))
+        now = datetime.now(timezone.utc)
+        
+        for _ in range(3):
+            await _message(notifications)
+        first = await digests.build(now + timedelta(minutes=1))
+        # Bumping a digested notification puts it back in the next digest
+        await _message(notifications)
+        await notifications.create_notification("user_1", "system", "Welcome", "Hello")
+        second = await digests.build(now + timedelta(minutes=2))
+        
+        return [
+            await db.notification_digests.find_one({"period": period}, {"_id": 0})
+            for period in (first, second)
+        ]
+    
+    first, second = asyncio.run(run())
+    
+    assert first["total"] == 3
+    assert second["total"] == 2
+    assert {t["type"]: t["count"] for t in second["types"]} == {"new_message": 1, "system": 1}
@@ -0,0 +1,153 @@
+import asyncio
+
+from controllers.role_controller import RoleController
+from controllers.startup_controller import StartupController
+from schemas.role import RoleCreate
+
+ROLE = RoleCreate(
+    title="Backend engineer",
+    description="Build the API",
+    experience_level="mid",
+    employment_type="full_time",
+    location="Remote"
+)
+
+
+async def _seed(db, open_roles: int = 1):
+    await db.startups.insert_one({
+        "startup_id": "startup_1",
+        "founder_id": "founder_1",
+        "name": "Acme",
+        "open_roles_count": open_roles
+    })
+    await db.roles.insert_many([
+        {"role_id": f"role_{i}", "startup_id": "startup_1", "status": "active"}
+        for i in range(open_roles)
+    ])
+
+
+async def _open_roles_count(db) -> int:
+    startup = await db.startups.find_one({"startup_id": "startup_1"})
+    return startup["open_roles_count"]
+
+
+class _WaitingCursor:
+    """Cursor that only runs its query once gate is set"""
+    
+    def __init__(self, gate, run):
+        self._gate = gate
+        self._run = run
+    
+    async def to_list(self, length=None):
+        await self._gate.wait()
+        return await self._run().to_list(length)
+    
+    async def _rows(self):
+        for row in await self.to_list():
+            yield row
+    
+    def __aiter__(self):
+        return self._rows()
+
+
+class _Gated:
+    """Collection proxy: method's cursor waits for wait_for, or method sets then_set and waits for then_wait"""
+    
+    def __init__(self, collection, method, wait_for=None, then_set=None, then_wait=None):
+        self._collection = collection
+        self._method = method
+        self._wait_for = wait_for
+        self._then_set = then_set
+        self._then_wait = then_wait
+    
+    def __getattr__(self, name):
+        attr = getattr(self._collection, name)
+        if name != self._method:
+            return attr
+        if self._wait_for:
+            return lambda *args, **kwargs: _WaitingCursor(self._wait_for, lambda: attr(*args, **kwargs))
+        
+        async def call(*args, **kwargs):
+            result = await attr(*args, **kwargs)
+            self._then_set.set()
+            await self._then_wait.wait()
+            return result
+        return call
+
+
+class _Proxy:
+    def __init__(self, db, **collections):
+        self._db = db
+        self._collections = collections
+    
+    def __getattr__(self, name):
+        return self._collections.get(name) or getattr(self._db, name)
+
+
+def test_reconcile_repairs_drift(db):
+    async def run():
+        await _seed(db)
+        await db.startups.update_one({"startup_id": "startup_1"}, {"$set": {"open_roles_count": 4}})
+        repaired = await StartupController(db).reconcile_open_roles_counts()
+        return repaired, await _open_roles_count(db)
+    
+    assert asyncio.run(run()) == (1, 1)
+
+
+def test_reconcile_during_role_write_keeps_the_pending_inc(db):
+    async def run():
+        await _seed(db)
+        roles = RoleController(db)
+        
+        async def insert_then_reconcile():
+            await db.roles.insert_one({"role_id": "role_new", "startup_id": "startup_1", "status": "active"})
+            # Lands between the role insert and its counter $inc
+            await StartupController(db).reconcile_open_roles_counts()
+            return None, "active"
+        
+        await roles._write_role_status("startup_1", insert_then_reconcile)
+        return await _open_roles_count(db)
+    
+    assert asyncio.run(run()) == 2
+
+
+def test_reconcile_read_before_create_role_does_not_double_count(db):
+    async def run():
+        await _seed(db)
+        inserted, reconciled = asyncio.Event(), asyncio.Event()
+        
+        # reconcile reads the counter, then recounts only once the role is inserted
+        reconcile_db = _Proxy(db, roles=_Gated(db.roles, "aggregate", wait_for=inserted))
+        # create_role inserts, then holds its $inc until reconcile has written
+        role_db = _Proxy(
+            db, roles=_Gated(db.roles, "insert_one", then_set=inserted, then_wait=reconciled)
+        )
+        
+        async def reconcile():
+            await StartupController(reconcile_db).reconcile_open_roles_counts()
+            reconciled.set()
+        
+        await asyncio.gather(reconcile(), RoleController(role_db).create_role("founder_1", ROLE))
+        return await _open_roles_count(db)
+    
+    assert asyncio.run(run()) == 2
+
+
+def test_reconcile_recovers_an_abandoned_write(db):
+    async def run():
+        await _seed(db)
+        await db.startups.update_one(
+            {"startup_id": "startup_1"},
+            {"$set": {
+                "open_roles_count": 3,
+                "open_roles_pending": 1,
+                "open_roles_pending_at": "2000-01-01T00:00:00+00:00"
+            }}
+        )
+        await StartupController(db).reconcile_open_roles_counts()
+        return await db.startups.find_one({"startup_id": "startup_1"}, {"_id": 0})
+    
+    startup = asyncio.run(run())
+    
+    assert startup["open_roles_count"] == 1
+    assert startup["open_roles_pending"] == 0
@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+from pymongo import ASCENDING, DESCENDING
+
+from services.pagination import CountCache, count_total
+from services.query_builder import ListSpec
+
+# Ties on the sort value and documents without one
+DOCS = [
+    {"item_id": f"item_{i}", "rank": rank}
+    for i, rank in enumerate([3, None, 1, 3, None, 2, 1, 3])
+]
+
+
+def _in_sort_order(direction: int):
+    # MongoDB orders null/missing below every other value
+    key = lambda doc: (doc["rank"] is not None, doc["rank"] or 0, doc["item_id"])
+    return [doc["item_id"] for doc in sorted(DOCS, key=key, reverse=direction == DESCENDING)]
+
+
+async def _walk(db, spec: ListSpec, page_size: int):
+    seen, after = [], None
+    # A broken filter can repeat pages forever; never walk past one page per document
+    for _ in DOCS:
+        docs, has_more, after = await spec.fetch(db, {}, page_size=page_size, after=after)
+        seen.extend(doc["item_id"] for doc in docs)
+        if not has_more:
+            break
+    return seen
+
+
+@pytest.mark.parametrize("direction", [DESCENDING, ASCENDING])
+@pytest.mark.parametrize("page_size", [1, 2, 3])
+def test_keyset_pages_cover_ties_and_nulls_once(db, direction, page_size):
+    spec = ListSpec("items", "rank", "item_id", direction=direction)
+    
+    async def run():
+        await db.items.insert_many([dict(doc) for doc in DOCS])
+        return await _walk(db, spec, page_size)
+    
+    assert asyncio.run(run()) == _in_sort_order(direction)
+
+
+@pytest.mark.parametrize("page_size", [0, -1])
+def test_fetch_rejects_empty_pages(db, page_size):
+    spec = ListSpec("items", "rank", "item_id")
+    
+    with pytest.raises(ValueError, match="page_size"):
+        asyncio.run(spec.fetch(db, {}, page_size=page_size))
+
+
+async def _seed_items(db, n: int = 5):
+    await db.items.insert_many([{"item_id": f"item_{i}", "rank": i % 2} for i in range(n)])
+
+
+def test_count_total_modes(db):
+    async def run():
+        await _seed_items(db)
+        query = {"rank": 1}
+        return (
+            await count_total(db.items, query, "exact"),
+            await count_total(db.items, query, "estimated", CountCache()),
+            await count_total(db.items, query, "none")
+        )
+    
+    assert asyncio.run(run()) == ((2, True), (2, True), (None, False))
+
+
+def test_count_total_rejects_unknown_modes(db):
+    with pytest.raises(ValueError, match="count_mode"):
+        asyncio.run(count_total(db.items, {}, "approximate"))
+
+
+def test_estimated_count_is_cached_until_the_ttl_expires(db):
+    async def run():
+        await _seed_items(db)
+        cache = CountCache(ttl=60)
+        first = await count_total(db.items, {}, "estimated", cache)
+        await _seed_items(db, 3)
+        cached = await count_total(db.items, {}, "estimated", cache)
+        exact = await count_total(db.items, {}, "exact", cache)
+        
+        cache.ttl = -1
+        cache.set(cache.key(db.items, {}), cached[0])
+        refreshed = await count_total(db.items, {}, "estimated", cache)
+        return first, cached, exact, refreshed
+    
+    # Unfiltered totals come from metadata, so are never reported exact
+    assert asyncio.run(run()) == ((5, False), (5, False), (8, True), (8, False))
+
+
+def test_estimated_counts_are_cached_per_filter(db):
+    async def run():
+        await _seed_items(db)
+        cache = CountCache(ttl=60)
+        return [
+            await count_total(db.items, query, "estimated", cache)
+            for query in ({"rank": 0}, {"rank": 1}, {"rank": 0}, {"rank": 1})
+        ]
+    
+    # Fresh filtered counts are exact; cached ones may be stale
+    assert asyncio.run(run()) == [(3, True), (2, True), (3, False), (2, False)]
@@ -0,0 +1,78 @@
+import asyncio
+import os
+import uuid
+
+import pytest
+
+from controllers.engineer_controller import ENGINEER_LIST
+from controllers.role_controller import ROLE_LIST
+from controllers.startup_controller import STARTUP_LIST
+from services.indexes import INDEXES, available_indexes, ensure_indexes
+from services.query_audit import LIST_QUERY_SAMPLES
+from services.query_builder import plan_stages
+
+# Explain plans need a real MongoDB, e.g. TEST_MONGO_URL=mongodb://localhost:27017
+TEST_MONGO_URL = os.environ.get("TEST_MONGO_URL")
+
+
+@pytest.fixture
+def all_indexes_available(monkeypatch):
+    for collection, models in INDEXES.items():
+        monkeypatch.setitem(
+            available_indexes, collection, {model.document["name"] for model in models}
+        )
+
+
+def test_range_filter_uses_sort_index(all_indexes_available):
+    query = {"availability": {"$ne": "not_looking"}, "skills": {"$in": ["python"]}}
+    
+    assert ENGINEER_LIST.hint_for(query) == "updated_at_-1_user_id_-1"
+
+
+def test_equality_filter_uses_compound_index(all_indexes_available):
+    query = {"availability": "actively_looking", "work_preference": "remote"}
+    
+    assert ENGINEER_LIST.hint_for(query) == "availability_1_updated_at_-1_user_id_-1"
+
+
+def test_filter_on_hint_fields_first(all_indexes_available):
+    assert ROLE_LIST.hint_for({"status": "active", "startup_id": "s1"}) == (
+        "startup_id_1_created_at_-1_role_id_-1"
+    )
+    assert STARTUP_LIST.hint_for({"industry": "fintech", "funding_stage": "seed"}) == (
+        "industry_1_created_at_-1_startup_id_-1"
+    )
+
+
+def test_undeclared_filter_shape_is_not_hinted(all_indexes_available):
+    assert STARTUP_LIST.hint_for({"founder_id": "user_1"}) is None
+
+
+def test_missing_index_is_not_hinted(monkeypatch):
+    monkeypatch.setitem(available_indexes, "startups", set())
+    
+    assert STARTUP_LIST.hint_for({}) is None
+
+
+@pytest.mark.skipif(not TEST_MONGO_URL, reason="TEST_MONGO_URL not set")
+@pytest.mark.parametrize("name", sorted(LIST_QUERY_SAMPLES))
+def test_list_query_walks_an_index_in_sort_order(name, all_indexes_available):
+    from motor.motor_asyncio import AsyncIOMotorClient
+    
+    spec, query = LIST_QUERY_SAMPLES[name]
+    
+    async def explain():
+        client = AsyncIOMotorClient(TEST_MONGO_URL, serverSelectionTimeoutMS=2000)
+        db = client[f"test_query_plans_{uuid.uuid4().hex[:8]}"]
+        try:
+            await ensure_indexes(db)
+            return plan_stages(await spec.explain(db, query))
+        finally:
+            await client.drop_database(db.name)
+            client.close()
+    
+    stages = asyncio.run(explain())
+    
+    assert "COLLSCAN" not in stages, f"{name} scans the whole collection: {stages}"
+    assert "SORT" not in stages, f"{name} sorts in memory: {stages}"
+    assert "IXSCAN" in stages, f"{name} does not use an index: {stages}"
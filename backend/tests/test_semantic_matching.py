@@ -0,0 +1,111 @@
+import asyncio
+
+from llm import LLMService, AnthropicProvider, HashingEmbedder
+from services.embedding_index import SemanticIndex
+from services.matching_service import MatchingService
+
+ENGINEERS = [
+    {
+        "user_id": "eng_ml",
+        "headline": "Machine learning engineer",
+        "skills": ["Python", "PyTorch", "Machine Learning"],
+        "availability": "actively_looking"
+    },
+    {
+        "user_id": "eng_web",
+        "headline": "Frontend developer",
+        "skills": ["React", "TypeScript", "CSS"],
+        "availability": "open_to_offers"
+    },
+    {
+        "user_id": "eng_away",
+        "headline": "Machine learning researcher",
+        "skills": ["Python", "PyTorch", "Machine Learning"],
+        "availability": "not_looking"
+    }
+]
+
+ROLES = [
+    {
+        "role_id": "role_ml",
+        "startup_id": "startup_1",
+        "title": "Machine learning engineer",
+        "skills_required": ["Python", "PyTorch", "Machine Learning"],
+        "status": "active"
+    },
+    {
+        "role_id": "role_web",
+        "startup_id": "startup_1",
+        "title": "Frontend developer",
+        "skills_required": ["React", "TypeScript"],
+        "status": "active"
+    },
+    {
+        "role_id": "role_closed",
+        "startup_id": "startup_1",
+        "title": "Machine learning engineer",
+        "skills_required": ["Python", "PyTorch", "Machine Learning"],
+        "status": "closed"
+    }
+]
+
+
+def _matching(db) -> MatchingService:
+    return MatchingService(db, embedder=HashingEmbedder(), semantic_index=SemanticIndex())
+
+
+async def _seed(db):
+    await db.engineer_profiles.insert_many([dict(doc) for doc in ENGINEERS])
+    await db.roles.insert_many([dict(doc) for doc in ROLES])
+    await db.startups.insert_one({"startup_id": "startup_1", "name": "Acme"})
+
+
+def test_find_similar_candidates_ranks_by_similarity(db):
+    async def run():
+        await _seed(db)
+        matching = _matching(db)
+        await matching.rebuild_embeddings()
+        return await matching.find_similar_candidates("role_ml")
+    
+    candidates = asyncio.run(run())
+    
+    assert [c["user_id"] for c in candidates] == ["eng_ml", "eng_web"]
+    assert candidates[0]["match_score"] > candidates[1]["match_score"]
+
+
+def test_find_similar_roles_skips_inactive_roles(db):
+    async def run():
+        await _seed(db)
+        matching = _matching(db)
+        await matching.rebuild_embeddings()
+        return await matching.find_similar_roles("eng_web")
+    
+    roles = asyncio.run(run())
+    
+    assert [r["role_id"] for r in roles] == ["role_web", "role_ml"]
+    assert roles[0]["startup_name"] == "Acme"
+
+
+def test_find_similar_embeds_unindexed_documents(db):
+    async def run():
+        await _seed(db)
+        matching = _matching(db)
+        await matching.load_embedding_index()
+        roles = await matching.find_similar_roles("eng_ml")
+        stored = await db.match_embeddings.count_documents({"kind": "engineer"})
+        return roles, stored
+    
+    roles, stored = asyncio.run(run())
+    
+    # Nothing was indexed yet, so there are no roles to return, but the
+    # query profile itself was embedded and stored
+    assert roles == []
+    assert stored == 1
+
+
+def test_provider_without_embeddings_falls_back_to_hashing(db):
+    provider = AnthropicProvider.__new__(AnthropicProvider)
+    
+    matching = MatchingService(db, LLMService(provider), semantic_index=SemanticIndex())
+    
+    assert isinstance(matching.embedder, HashingEmbedder)